@@ -0,0 +1,43 @@
+"""
+Helpers for generating large designs for benchmarks
+"""
+import copy
+import glob
+import os
+
+from formation.formats import XMLFormat
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "..", "formation", "tests", "samples")
+
+
+def count(node):
+    return 1 + sum(count(child) for child in node)
+
+
+def sample_nodes():
+    return [XMLFormat(path=path).load() for path in sorted(glob.glob(os.path.join(SAMPLES, "*.xml")))]
+
+
+def scaled_node(size):
+    """
+    Build a design of about ``size`` nodes by repeating the sample designs
+    under a single root frame
+    """
+    from formation.formats import Node
+    root = Node(None, "tkinter.Frame", {"name": "root", "attr": {"layout": "place"}})
+    samples = sample_nodes()
+    total = 1
+    i = 0
+    while total < size:
+        sample = copy.deepcopy(samples[i % len(samples)])
+        sample.parent = root
+        root.append_child(sample)
+        total += count(sample)
+        i += 1
+    return root
+
+
+def scaled_xml(size, path):
+    with open(path, "w") as file:
+        file.write(XMLFormat(node=scaled_node(size)).generate())
+    return path
@@ -0,0 +1,39 @@
+"""
+Compare cold (parse and resolve) and warm (compiled cache) load times of
+design files. Widget construction is excluded so no display is required.
+
+    python benchmarks/bench_compiled_cache.py [design files...]
+"""
+import glob
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formation import cache  # noqa
+from formation.formats import infer_format  # noqa
+from formation.loader import resolve_design  # noqa
+
+REPEAT = 50
+
+
+def main(paths):
+    cache.set_cache_dir(tempfile.mkdtemp())
+    print("{:<25}{:>12}{:>12}{:>10}".format("design", "cold (ms)", "warm (ms)", "speedup"))
+    for path in paths:
+        cold = timeit.timeit(
+            lambda: resolve_design(infer_format(path)(path=path).load()), number=REPEAT
+        ) / REPEAT
+        cache.load(path, resolve_design)
+        warm = timeit.timeit(lambda: cache.load(path, resolve_design), number=REPEAT) / REPEAT
+        print("{:<25}{:>12.3f}{:>12.3f}{:>9.1f}x".format(
+            os.path.basename(path), cold * 1000, warm * 1000, cold / warm
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob(
+        os.path.join(os.path.dirname(__file__), "..", "formation", "tests", "samples", "*.xml")
+    )))
@@ -0,0 +1,33 @@
+"""
+Compare load times of the design formats on a large design.
+
+    python benchmarks/bench_formats.py [node count]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import scaled_node  # noqa
+from formation.formats import FORMATS  # noqa
+
+REPEAT = 5
+
+
+def main(size):
+    node = scaled_node(size)
+    directory = tempfile.mkdtemp()
+    print("{:<16}{:>12}{:>12}".format("format", "size (KiB)", "load (ms)"))
+    for format_ in FORMATS:
+        path = os.path.join(directory, "design." + format_.extensions[0])
+        content = format_(node=node).generate()
+        with open(path, "wb" if format_.binary else "w") as file:
+            file.write(content)
+        elapsed = timeit.timeit(lambda: format_(path=path).load(), number=REPEAT) / REPEAT
+        print("{:<16}{:>12.1f}{:>12.2f}".format(format_.name, os.path.getsize(path) / 1024, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
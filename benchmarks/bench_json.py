@@ -0,0 +1,57 @@
+"""
+Measure JSON design generate and load throughput on a large design with
+each of the available json libraries.
+
+    python benchmarks/bench_json.py [node count]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import count, scaled_node  # noqa
+from formation.formats import JSONFormat  # noqa
+from formation.formats import _json  # noqa
+
+REPEAT = 5
+
+
+def backends():
+    available = [("json", json.loads, None, None)]
+    if _json.ujson is not None:
+        available.append(("ujson", _json.ujson.loads, None, _json.ujson))
+    if _json.orjson is not None:
+        available.append(("orjson", _json.orjson.loads, _json.orjson, None))
+    return available
+
+
+def measure(action, nodes):
+    elapsed = timeit.timeit(action, number=REPEAT) / REPEAT
+    return elapsed * 1000, nodes / elapsed / 1000
+
+
+def main(size):
+    node = scaled_node(size)
+    nodes = count(node)
+    data = JSONFormat(node=node).generate()
+    print("design of {} nodes".format(nodes))
+    print("{:<10}{:<18}{:>12}{:>16}".format("library", "operation", "time (ms)", "k nodes / s"))
+    saved = _json._loads, _json.orjson, _json.ujson
+    try:
+        for name, loads, orjson, ujson in backends():
+            _json._loads, _json.orjson, _json.ujson = loads, orjson, ujson
+            operations = (
+                ("load", lambda: JSONFormat(data=data).load()),
+                ("generate", lambda: JSONFormat(node=node).generate()),
+                ("generate compact", lambda: JSONFormat(node=node).generate(compact=True)),
+            )
+            for operation, action in operations:
+                print("{:<10}{:<18}{:>12.2f}{:>16.1f}".format(name, operation, *measure(action, nodes)))
+    finally:
+        _json._loads, _json.orjson, _json.ujson = saved
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,38 @@
+"""
+Measure design tree comparison with cached structural hashes.
+
+    python benchmarks/bench_node_equality.py [node count]
+"""
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import count, scaled_node  # noqa
+
+
+def timed(label, action):
+    start = time.perf_counter()
+    result = action()
+    print("{:<28}{:>12.3f}".format(label, (time.perf_counter() - start) * 1000))
+    return result
+
+
+def main(size):
+    first = scaled_node(size)
+    second = copy.deepcopy(first)
+    print("design of {} nodes".format(count(first)))
+    print("{:<28}{:>12}".format("comparison", "time (ms)"))
+    timed("first", lambda: first == second)
+    timed("unchanged", lambda: first == second)
+    leaf = second
+    while leaf.children:
+        leaf = leaf.children[-1]
+    leaf["attr"]["text"] = "changed"
+    assert timed("after leaf change", lambda: first != second)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,49 @@
+"""
+Measure memory held by design trees loaded from each format with and without
+shared namespaces using tracemalloc.
+
+    python benchmarks/bench_node_memory.py [node count]
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import count, scaled_node  # noqa
+from formation.formats import FORMATS  # noqa
+
+
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    node = load()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return node, current, peak
+
+
+def main(size):
+    node = scaled_node(size)
+    directory = tempfile.mkdtemp()
+    print("design of {} nodes".format(count(node)))
+    print("{:<24}{:>14}{:>14}{:>16}".format("format", "tree (MiB)", "peak (MiB)", "bytes / node"))
+    for format_ in FORMATS:
+        path = os.path.join(directory, "design." + format_.extensions[0])
+        content = format_(node=node).generate()
+        with open(path, "wb" if format_.binary else "w") as file:
+            file.write(content)
+        for shared in (False, True):
+            loaded, current, peak = measure(lambda: format_(path=path, shared=shared).load())
+            print("{:<24}{:>14.2f}{:>14.2f}{:>16.0f}".format(
+                format_.name + (" (shared)" if shared else ""),
+                current / 2 ** 20, peak / 2 ** 20, current / count(loaded)
+            ))
+            del loaded
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,56 @@
+"""
+Compare peak memory and time of writing a design by generating the entire
+output first against streaming it to file.
+
+    python benchmarks/bench_stream_write.py [node count]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import count, scaled_node  # noqa
+from formation.formats import JSONFormat, XMLFormat  # noqa
+
+
+def generate(format_, node, path):
+    content = format_(node=node).generate()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def stream(format_, node, path):
+    with open(path, "w", encoding="utf-8") as file:
+        format_(node=node).stream(file)
+
+
+def measure(write, *args):
+    gc.collect()
+    tracemalloc.start()
+    write(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    start = time.perf_counter()
+    write(*args)
+    return peak, time.perf_counter() - start
+
+
+def main(size):
+    node = scaled_node(size)
+    directory = tempfile.mkdtemp()
+    print("design of {} nodes".format(count(node)))
+    print("{:<8}{:<10}{:>14}{:>12}".format("format", "writer", "peak (MiB)", "time (s)"))
+    for format_ in (XMLFormat, JSONFormat):
+        path = os.path.join(directory, "design." + format_.extensions[0])
+        for writer in (generate, stream):
+            peak, elapsed = measure(writer, format_, node, path)
+            print("{:<8}{:<10}{:>14.2f}{:>12.3f}".format(format_.name, writer.__name__, peak / 2 ** 20, elapsed))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
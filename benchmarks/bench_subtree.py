@@ -0,0 +1,38 @@
+"""
+Compare loading a single named subtree from a large design against
+loading the entire design.
+
+    python benchmarks/bench_subtree.py [node count]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import count, scaled_node  # noqa
+from formation.formats import BinaryFormat, IndexedFormat, XMLFormat  # noqa
+
+REPEAT = 5
+
+
+def main(size):
+    node = scaled_node(size)
+    # the subtree of interest is the last one in the document
+    node.children[-1]["name"] = "dialog"
+    directory = tempfile.mkdtemp()
+    print("design of {} nodes, subtree of {} nodes".format(count(node), count(node.children[-1])))
+    print("{:<16}{:>16}{:>16}".format("format", "full (ms)", "subtree (ms)"))
+    for format_ in (XMLFormat, BinaryFormat, IndexedFormat):
+        path = os.path.join(directory, "design." + format_.extensions[0])
+        content = format_(node=node).generate()
+        with open(path, "wb" if format_.binary else "w") as file:
+            file.write(content)
+        full = timeit.timeit(lambda: format_(path=path).load(), number=REPEAT) / REPEAT
+        subtree = timeit.timeit(lambda: format_(path=path).load_subtree("dialog"), number=REPEAT) / REPEAT
+        print("{:<16}{:>16.2f}{:>16.2f}".format(format_.name, full * 1000, subtree * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
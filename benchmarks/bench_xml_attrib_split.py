@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of splitting namespaced XML attribute keys while loading,
+comparing the previous regex based split with the memoized partition used
+by XMLFormat. The sample designs are scaled to about 10k nodes.
+
+    python benchmarks/bench_xml_attrib_split.py [node count]
+"""
+import os
+import re
+import sys
+import tempfile
+import timeit
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import scaled_xml  # noqa
+from formation.formats import XMLFormat  # noqa
+from formation.formats._xml import etree, _reversed_namespaces  # noqa
+
+REPEAT = 10
+_attr_rgx = re.compile(r"{(?P<namespace>.+)}(?P<attr>.+)")
+
+
+def regex_group(attrib):
+    # implementation prior to memoization
+    grouped = defaultdict(dict)
+    for attr in attrib:
+        match = _attr_rgx.search(attr)
+        if match:
+            group = _reversed_namespaces.get(match.group("namespace"))
+            grouped[group][match.group("attr")] = attrib.get(attr)
+        else:
+            grouped[attr] = attrib.get(attr)
+    return grouped
+
+
+def main(size):
+    path = scaled_xml(size, os.path.join(tempfile.mkdtemp(), "design.xml"))
+    with open(path, "rb") as file:
+        attribs = [dict(e.attrib) for e in etree.parse(file).iter()]
+
+    fmt = XMLFormat(path=path)
+    fmt._key_cache = {}
+    assert all(regex_group(a) == fmt._group_attrib(a) for a in attribs)
+
+    def memoized():
+        # fresh memo for each run as is done per load
+        fmt._key_cache = {}
+        for a in attribs:
+            fmt._group_attrib(a)
+
+    regex = timeit.timeit(lambda: [regex_group(a) for a in attribs], number=REPEAT) / REPEAT
+    memo = timeit.timeit(memoized, number=REPEAT) / REPEAT
+    print("{} elements, {} attributes".format(len(attribs), sum(map(len, attribs))))
+    print("regex     {:>8.2f} ms".format(regex * 1000))
+    print("memoized  {:>8.2f} ms ({:.1f}x)".format(memo * 1000, regex / memo))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
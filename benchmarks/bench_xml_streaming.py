@@ -0,0 +1,48 @@
+"""
+Compare peak memory and time of loading a large XML design through a full
+element tree against the streaming loader.
+
+    python benchmarks/bench_xml_streaming.py [node count]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._designs import scaled_xml  # noqa
+from formation.formats import XMLFormat  # noqa
+from formation.formats._xml import etree  # noqa
+
+
+def tree_load(path):
+    fmt = XMLFormat(path=path)
+    with open(path, "rb") as file:
+        return fmt._load_node(None, etree.parse(file).getroot())
+
+
+def stream_load(path):
+    return XMLFormat(path=path).load()
+
+
+def measure(func, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size):
+    path = scaled_xml(size, os.path.join(tempfile.mkdtemp(), "design.xml"))
+    for name, func in (("element tree", tree_load), ("streaming", stream_load)):
+        elapsed, peak = measure(func, path)
+        print("{:<15}{:>10.1f} ms{:>10.1f} MiB peak".format(name, elapsed * 1000, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
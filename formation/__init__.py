@@ -1,3 +1,4 @@
 __version__ = "0.6.2"
 
 from .loader import Builder, AppBuilder  # noqa
+from .template import Template  # noqa
@@ -0,0 +1,205 @@
+"""
+On-disk compiled cache of design files. A design is stored as a flat list of
+instructions, one for each node, holding the attributes of the node already
+split by namespace along with the widget class, handlers and layout function
+resolved for it. The instructions are replayed into a
+:py:class:`~formation.formats.Node` tree on later loads without going through
+the format parsers and the builder uses the resolved references instead of
+resolving them again
+"""
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+import formation
+from formation.formats import Node, infer_format
+from formation.handlers import get_namespaces
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the layout of the compiled instructions changes
+_COMPILER_VERSION = 2
+
+_cache_dir = None
+
+
+def get_cache_dir():
+    """
+    Get the directory where compiled designs are stored. Defaults to the user
+    cache directory for formation
+
+    :return: path to cache directory
+    """
+    global _cache_dir
+    if _cache_dir is None:
+        import platformdirs
+        _cache_dir = os.path.join(
+            platformdirs.user_cache_dir(appname="formation", appauthor="hoverset"),
+            "compiled"
+        )
+    return _cache_dir
+
+
+def set_cache_dir(path):
+    """
+    Set the directory where compiled designs are to be stored
+
+    :param path: path to cache directory, it will be created if it does not exist
+    """
+    global _cache_dir
+    _cache_dir = path
+
+
+def _plain(attrib):
+    # convert (default)dicts to plain dicts for compact pickling
+    return {k: _plain(v) if isinstance(v, dict) else v for k, v in attrib.items()}
+
+
+def compile_node(root, resolved=None):
+    """
+    Flatten a node tree into a list of instructions in pre-order. Each
+    instruction is a tuple of the form
+    ``(parent_index, type, attrib, source_line, resolution)`` where
+    ``parent_index`` is the position of the parent instruction or -1 for the
+    root and ``resolution`` is the entry of the node in resolved if any
+
+    :param root: :py:class:`~formation.formats.Node` to compile
+    :param resolved: dict mapping ids of nodes to the classes and functions
+        resolved for them as returned by
+        :py:func:`~formation.loader.resolve_design`. The references are
+        stored by name and have to be importable
+    :return: list of instructions
+    """
+    resolved = resolved or {}
+    instructions = []
+    stack = [(root, -1)]
+    while stack:
+        node, parent_index = stack.pop()
+        index = len(instructions)
+        instructions.append((
+            parent_index, node.type, _plain(node.attrib), node.source_line, resolved.get(id(node))
+        ))
+        # reversed so children are popped in document order
+        stack.extend((child, index) for child in reversed(node))
+    return instructions
+
+
+def replay(instructions):
+    """
+    Rebuild a node tree from a list of instructions generated by :py:func:`compile_node`
+
+    :param instructions: list of instructions
+    :return: tuple of the root :py:class:`~formation.formats.Node` and a
+        dict mapping ids of the replayed nodes to their resolved entries
+    """
+    nodes = []
+    resolved = {}
+    for parent_index, node_type, attrib, source_line, resolution in instructions:
+        parent = nodes[parent_index] if parent_index >= 0 else None
+        node = Node(parent, node_type, attrib)
+        node.source_line = source_line
+        if resolution is not None:
+            resolved[id(node)] = resolution
+        nodes.append(node)
+    return (nodes[0] if nodes else None), resolved
+
+
+def _cache_path(path):
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_dir(), digest + ".fcache")
+
+
+def _cache_key(path):
+    stat = os.stat(path)
+    return (
+        _COMPILER_VERSION,
+        formation.__version__,
+        os.path.abspath(path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        # handlers are stored by namespace
+        get_namespaces(),
+    )
+
+
+def _read(path, key):
+    try:
+        with open(_cache_path(path), "rb") as file:
+            if pickle.load(file) != key:
+                return None
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, ImportError, AttributeError):
+        # resolved classes may have been moved or removed since
+        return None
+
+
+def _write(path, key, instructions):
+    cache_path = _cache_path(path)
+    try:
+        # pickled first since classes that cannot be imported by name fail
+        data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL) + pickle.dumps(instructions, pickle.HIGHEST_PROTOCOL)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # write to a temporary file first so readers never see partial files
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp, cache_path)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError) as e:
+        logger.debug("Could not write compiled design for %s: %s", path, e)
+
+
+def load(path, resolve=None):
+    """
+    Load a design file as a :py:class:`~formation.formats.Node` using the
+    compiled cache where possible. The cache is keyed by the path,
+    modification time, size of the file, the formation version and the
+    namespaces with handlers so stale entries are recompiled automatically
+
+    :param path: path to design file
+    :param resolve: function returning the classes and functions resolved
+        for the nodes of a design to be compiled along with it such as
+        :py:func:`~formation.loader.resolve_design`
+    :return: tuple of root node, dict mapping ids of nodes to their
+        resolved entries and a boolean which is ``True`` if the node was
+        obtained from the cache
+    """
+    key = _cache_key(path)
+    instructions = _read(path, key)
+    if instructions is not None:
+        root, resolved = replay(instructions)
+        return root, resolved, True
+
+    root = infer_format(path)(path=path).load()
+    resolved = resolve(root) if resolve is not None else {}
+    _write(path, key, compile_node(root, resolved))
+    return root, resolved, False
+
+
+def invalidate(path=None):
+    """
+    Remove compiled entries from the cache
+
+    :param path: path to the design file whose entry is to be removed.
+        If not provided all entries are removed
+    """
+    if path is not None:
+        targets = [_cache_path(path)]
+    elif os.path.isdir(get_cache_dir()):
+        targets = [
+            os.path.join(get_cache_dir(), f)
+            for f in os.listdir(get_cache_dir()) if f.endswith(".fcache")
+        ]
+    else:
+        targets = []
+
+    for target in targets:
+        try:
+            os.remove(target)
+        except OSError:
+            pass
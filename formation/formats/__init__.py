@@ -5,10 +5,14 @@
 from formation.formats._base import *
 from formation.formats._xml import XMLFormat
 from formation.formats._json import JSONFormat
+from formation.formats._binary import BinaryFormat
+from formation.formats._indexed import IndexedFormat
 
 FORMATS = (
     XMLFormat,
-    JSONFormat
+    JSONFormat,
+    BinaryFormat,
+    IndexedFormat,
 )
 
 
@@ -32,3 +36,22 @@ def infer_format(path):
             return format_
 
     raise ValueError(f"No matching formats found for extension '{extension}'")
+
+
+def convert(source, destination, **kw):
+    """
+    Convert a design file from one format to another. The formats are
+    inferred from the file extensions
+
+    :param source: path to design file to be converted
+    :param destination: path to write the converted design to
+    :param kw: options passed to the generate method of the destination format
+    """
+    node = infer_format(source)(path=source).load()
+    format_ = infer_format(destination)
+    if format_.binary:
+        with open(destination, "wb") as file:
+            format_(node=node).stream(file, **kw)
+    else:
+        with open(destination, "w", encoding="utf-8") as file:
+            format_(node=node).stream(file, **kw)
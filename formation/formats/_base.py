@@ -7,7 +7,8 @@ Base output and input format abstractions
 
 import abc
 import re
-from collections import defaultdict
+import sys
+import weakref
 
 
 _tag_rgx = re.compile(r"(.+)\.([^.]+)")
@@ -17,21 +18,283 @@ _var_rgx = re.compile(r".+Var$")
 __all__ = ("Node", "BaseAdapter", "BaseFormat")
 
 
-class Node:
+def _observed(method):
+    # wrap a container method so the owning node is invalidated after it runs
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._changed()
+        return result
+
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+def _owned(cls, node, *args):
+    # create an observed container owned by node
+    container = cls(*args)
+    container._node = node
+    return container
+
+
+class _Namespace(dict):
+    # attribute dictionary which invalidates the hash of its node on mutation
+
+    __slots__ = ("_node",)
+
+    def __reduce__(self):
+        return _owned, (self.__class__, self._node, dict(self))
+
+    def _changed(self):
+        self._node._invalidate()
+
+    __setitem__ = _observed(dict.__setitem__)
+    __delitem__ = _observed(dict.__delitem__)
+    clear = _observed(dict.clear)
+    pop = _observed(dict.pop)
+    popitem = _observed(dict.popitem)
+    setdefault = _observed(dict.setdefault)
+    update = _observed(dict.update)
+
+
+class _SharedNamespace(_Namespace):
+    # read only namespace shared by all nodes with identical namespace
+    # contents. Nodes replace it with a private copy before it is modified
+
+    __slots__ = ("_frozen", "__weakref__")
+
+    def __reduce__(self):
+        return _share, (dict(self),)
+
+    def _read_only(self, *_, **__):
+        raise TypeError("Shared attribute namespaces are read only, access them through the node to modify")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+
+# namespace contents mapped to weak references to the shared namespace
+_shared_namespaces = {}
+
+
+def _discard_shared(ref):
+    if _shared_namespaces.get(ref.key) is ref:
+        del _shared_namespaces[ref.key]
+
+
+def _share(namespace):
+    # get the shared namespace with the given contents which must be strings
+    frozen = frozenset(namespace.items())
+    ref = _shared_namespaces.get(frozen)
+    shared = None if ref is None else ref()
+    if shared is None:
+        shared = _SharedNamespace(namespace)
+        shared._node = None
+        shared._frozen = frozen
+        _shared_namespaces[frozen] = weakref.KeyedRef(shared, _discard_shared, frozen)
+    return shared
+
+
+def _share_attrib(attrib):
+    # share the namespaces of plain strings in attrib, used by the formats
+    for key, value in attrib.items():
+        if value.__class__ is str or not isinstance(value, dict):
+            continue
+        try:
+            # fails for values other than strings
+            "".join(value.values())
+        except TypeError:
+            continue
+        attrib[key] = _share(value)
+    return attrib
+
+
+class _Attrib(_Namespace):
+    # top level attributes, namespaces such as attr and layout are created
+    # on first access and dictionaries assigned are copied into namespaces
+    # so their mutation can also be observed
 
-    __slots__ = ("parent", "attrib", "source_line", "children", "type")
+    __slots__ = ()
+
+    def _wrap(self, value):
+        if value.__class__ is _SharedNamespace:
+            # copied on write
+            return value
+        if isinstance(value, dict) and not (isinstance(value, _Namespace) and value._node is self._node):
+            return _owned(_Namespace, self._node, value)
+        return value
+
+    def __missing__(self, key):
+        value = _owned(_Namespace, self._node)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if value.__class__ is _SharedNamespace:
+            # copy on write, items accessed by key may be modified
+            value = _owned(_Namespace, self._node, value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+
+class _Children(list):
+    # child list which invalidates the hash of its node on mutation
+
+    __slots__ = ("_node",)
+
+    def __reduce__(self):
+        return _owned, (self.__class__, self._node, list(self))
+
+    _changed = _Namespace._changed
+
+    __setitem__ = _observed(list.__setitem__)
+    __delitem__ = _observed(list.__delitem__)
+    __iadd__ = _observed(list.__iadd__)
+    __imul__ = _observed(list.__imul__)
+    append = _observed(list.append)
+    extend = _observed(list.extend)
+    insert = _observed(list.insert)
+    remove = _observed(list.remove)
+    pop = _observed(list.pop)
+    clear = _observed(list.clear)
+    sort = _observed(list.sort)
+    reverse = _observed(list.reverse)
+
+
+class Node:
+    """
+    Node in a design tree. Each node caches a hash of its type, attributes
+    and the hashes of its children which is computed on demand and
+    invalidated together with those of its ancestors whenever the node is
+    modified. Nodes with different hashes are unequal so comparing
+    differing trees is constant time, equal hashes are confirmed by
+    comparing the subtrees.
+
+    To keep large trees compact, types are interned and the child list is
+    only created when the first child is added. Formats created with
+    ``shared=True`` also share namespaces with identical contents between
+    the nodes they load. A shared namespace is read only and is replaced
+    with a private copy when accessed by key for instance ``node["layout"]``
+    or ``node.attrib["layout"]``. Namespaces obtained through
+    ``node.attrib.get`` or while iterating raise :class:`TypeError` when
+    modified hence sharing is only meant for trees that are read.
+
+    .. note::
+        Only modifications made through the node, its :attr:`attrib` and
+        namespace dictionaries such as ``node["attr"]`` and its
+        :attr:`children` list are detected. Namespace dictionaries in the
+        attrib passed to the constructor or assigned to the node are copied,
+        hence modifying the original dictionaries afterwards does not
+        affect the node
+    """
+
+    __slots__ = ("parent", "_attrib", "source_line", "_children", "_type", "_hash")
 
     def __init__(self, parent, node_type, attrib=None):
         self.parent = parent
         self.source_line = None
-        self.attrib = defaultdict(dict)
-        self.attrib.update(attrib or {})
-        self.children = []
-        self.type = node_type
+        self._hash = None
+        self._attrib = _owned(_Attrib, self)
+        if attrib:
+            # namespaces are copied
+            self._attrib.update(attrib)
+        # created when the first child is added
+        self._children = None
+        self._type = sys.intern(node_type)
 
         if isinstance(parent, Node):
             parent.append_child(self)
 
+    @property
+    def attrib(self):
+        return self._attrib
+
+    @attrib.setter
+    def attrib(self, value):
+        self._attrib = _owned(_Attrib, self)
+        self._attrib.update(value)
+
+    @property
+    def children(self):
+        if self._children is None:
+            self._children = _owned(_Children, self)
+        return self._children
+
+    @children.setter
+    def children(self, value):
+        self._children = _owned(_Children, self, value)
+        self._invalidate()
+
+    @property
+    def type(self):
+        return self._type
+
+    @type.setter
+    def type(self, value):
+        self._type = sys.intern(value)
+        self._invalidate()
+
+    def _invalidate(self):
+        node = self
+        # ancestors of a node without a hash do not have one either
+        while node is not None and node._hash is not None:
+            node._hash = None
+            node = node.parent
+
+    def _freeze_attrib(self):
+        # values are compared as strings and empty namespaces are ignored
+        items = []
+        for key, value in self._attrib.items():
+            if value.__class__ is str:
+                items.append((key, value))
+            elif isinstance(value, dict):
+                if not value:
+                    continue
+                if value.__class__ is _SharedNamespace:
+                    items.append((key, value._frozen))
+                    continue
+                # namespaces are flat in all formats
+                items.append((key, frozenset(zip(value, map(str, value.values())))))
+            else:
+                items.append((key, str(value)))
+        return frozenset(items)
+
+    def structural_hash(self):
+        """
+        Get a hash of the node type, attributes and children. The hashes of
+        all nodes in the subtree are cached so only nodes modified since
+        the last call are rehashed. Nodes with different hashes are not
+        equal
+
+        :return: integer hash
+        """
+        stack = [(self, False)]
+        while stack:
+            node, ready = stack.pop()
+            if node._hash is not None:
+                continue
+            if ready:
+                node._hash = hash((
+                    node._type, node._freeze_attrib(), tuple(child._hash for child in node._children or ())
+                ))
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node._children or ())
+        return self._hash
+
     def is_var(self):
         return _var_rgx.match(self.type)
 
@@ -43,7 +306,30 @@ class Node:
             self.attrib[namespace].pop(attrib)
 
     def append_child(self, child):
-        self.children.append(child)
+        children = self._children
+        if children is None:
+            children = self._children = _owned(_Children, self)
+        list.append(children, child)
+        if self._hash is not None:
+            self._invalidate()
+
+    def iter_events(self):
+        """
+        Walk the subtree in document order without recursion
+
+        :return: iterator of ``("start", node)`` and ``("end", node)`` pairs
+        """
+        yield "start", self
+        stack = [(self, iter(self))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield "end", node
+                continue
+            yield "start", child
+            stack.append((child, iter(child)))
 
     def get_mod_impl(self):
         match = _tag_rgx.search(self.type)
@@ -58,37 +344,35 @@ class Node:
         self.attrib[key] = value
 
     def __len__(self):
-        return len(self.children)
+        return len(self._children or ())
 
     def __iter__(self):
-        return iter(self.children)
+        return iter(self._children or ())
+
+    def __reversed__(self):
+        return reversed(self._children or ())
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Node):
             return False
-
-        tag_eq = self.type == other.type
-        attrib_eq = self._flatten(self.attrib) == self._flatten(other.attrib)
-        child_eq = len(self) == len(other)
-        # if any of the above is false no need to even check further
-        if child_eq and tag_eq and attrib_eq:
-            for sub_node1, sub_node2 in zip(self, other):
-                child_eq = sub_node1 == sub_node2
-                # if the equality check fails break immediately
-                if sub_node1 != sub_node2:
-                    return False
-        return tag_eq and attrib_eq and child_eq
-
-    def _flatten(self, dictionary):
-        if isinstance(dictionary, dict):
-            for k in list(dictionary):
-                # skip empty dictionary values
-                if isinstance(dictionary[k], dict) and not dictionary[k]:
-                    dictionary.pop(k)
-                    continue
-                dictionary[k] = self._flatten(dictionary[k])
-            return dict(dictionary)
-        return str(dictionary)
+        if self.structural_hash() != other.structural_hash():
+            return False
+        # hashes may collide so equal hashes are confirmed structurally,
+        # the hashes of all the nodes in both subtrees are cached by now
+        stack = [(self, other)]
+        while stack:
+            node, other = stack.pop()
+            if node is other:
+                continue
+            if node._hash != other._hash or node._type != other._type or len(node) != len(other):
+                return False
+            # values are compared as strings only if they differ otherwise
+            if node._attrib != other._attrib and node._freeze_attrib() != other._freeze_attrib():
+                return False
+            stack.extend(zip(node, other))
+        return True
 
 
 class BaseAdapter(abc.ABC):
@@ -105,11 +389,18 @@ class BaseFormat(abc.ABC):
 
     extensions = []
     name = None
+    # whether generate returns bytes instead of a string
+    binary = False
+    # whether stream writes each node as soon as it starts. Other formats
+    # need the entire tree to be built before anything is written
+    incremental = False
 
-    def __init__(self, data=None, path=None, node=None):
+    def __init__(self, data=None, path=None, node=None, shared=False):
         self.data = data
         self.path = path
         self.root = node
+        # share namespaces with identical contents between loaded nodes
+        self.shared = shared
         if (path, data, node) == (None, None, None):
             raise ValueError("You must provide an input file, string or node")
 
@@ -123,6 +414,75 @@ class BaseFormat(abc.ABC):
     def load(self):
         pass
 
+    def load_subtree(self, name):
+        """
+        Load only the subtree rooted at the node with the given name.
+        Variables and meta nodes of the design root are included as
+        children of the returned node. Formats with random access override
+        this to avoid loading the entire design
+
+        :param name: name of the root node of the subtree
+        :return: root :py:class:`Node` of the subtree
+        :raises KeyError: if no node has the given name
+        """
+        self.root = self.extract(self.load(), name)
+        return self.root
+
+    @staticmethod
+    def extract(root, name):
+        """
+        Detach the subtree rooted at the node with the given name from a
+        loaded design as described in :py:meth:`load_subtree`
+
+        :param root: root :py:class:`Node` of the design
+        :param name: name of the root node of the subtree
+        :return: root :py:class:`Node` of the subtree
+        :raises KeyError: if no node has the given name
+        """
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.attrib.get("name") == name and not (node.is_var() or node.type == "meta"):
+                break
+            stack.extend(reversed(node.children))
+        else:
+            raise KeyError(name)
+
+        if node is root:
+            return root
+        node.parent.children.remove(node)
+        node.parent = None
+        for child in list(root.children):
+            if child.is_var() or child.type == "meta":
+                root.children.remove(child)
+                child.parent = node
+                node.append_child(child)
+        return node
+
     @abc.abstractmethod
     def generate(self, **kw):
         pass
+
+    def stream(self, file, events=None, **kw):
+        """
+        Write the design to a file as it is generated. Text formats
+        override this to write each node as soon as it starts instead of
+        building the entire output in memory first and set
+        :py:attr:`incremental`
+
+        :param file: file object opened in binary mode for :py:attr:`binary`
+            formats and in text mode otherwise
+        :param events: iterable of ``("start", node)`` and ``("end", node)``
+            pairs in document order as returned by :py:meth:`Node.iter_events`.
+            The attributes of a node have to be complete when it starts and
+            nodes have to be added to their parents. Defaults to the events
+            of :py:attr:`root`
+        :param kw: same options as :py:meth:`generate`
+        """
+        if events is not None:
+            root = None
+            for _, node in events:
+                if root is None:
+                    root = node
+            self.root = root
+        file.write(self.generate(**kw))
@@ -0,0 +1,187 @@
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import array
+import sys
+
+from formation.formats._base import BaseFormat, Node, _share
+
+_MAGIC = b"FMB"
+_VERSION = 1
+
+# typecodes for the structure stream by item width in bytes
+_typecodes = {1: "B", 2: "H", 4: "I"}
+
+
+def _write_varint(buffer, value):
+    while value > 0x7f:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class BinaryFormat(BaseFormat):
+    """
+    Compact binary design format. All type names, attribute keys and values
+    are interned in a string table stored with varint lengths. The tree is
+    stored in pre-order as a stream of fixed width string indices and counts
+    whose width is the smallest that fits the largest item. Values are
+    stringified just like in the XML format.
+
+    Layout::
+
+        magic "FMB" | version (1 byte) | item width (1 byte)
+        string count (varint) | (length (varint) | utf-8 bytes) ...
+        item count (varint) | items ...
+
+    Each node is encoded as::
+
+        type | attrib count | (key | value) ... | child count
+
+    where value is ``0`` followed by a count and key/value pairs for
+    namespaces such as ``attr`` and ``layout`` otherwise it is the index of
+    the value string plus one.
+    """
+
+    extensions = ("fmb",)
+    name = "Binary"
+    binary = True
+
+    def _encode(self, root, visit=None):
+        strings = {}
+        items = []
+
+        def intern(value):
+            value = str(value)
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            attrib = node.attrib
+            if visit is not None:
+                # report the position of the node in the item stream
+                visit(node, len(items), intern)
+            items.append(intern(node.type))
+            items.append(len(attrib))
+            for key, value in attrib.items():
+                items.append(intern(key))
+                if isinstance(value, dict):
+                    items.append(0)
+                    items.append(len(value))
+                    for sub_key, sub_value in value.items():
+                        items.append(intern(sub_key))
+                        items.append(intern(sub_value) + 1)
+                else:
+                    items.append(intern(value) + 1)
+            items.append(len(node))
+            stack.extend(reversed(node))
+        return list(strings), items
+
+    def _decode(self, strings, items, pos=0):
+        # decodes the subtree starting at pos
+        # stack of [node, number of children remaining]
+        stack = []
+        root = None
+        # namespace items mapped to their decoded namespace
+        namespaces = {}
+        while True:
+            attrib = {}
+            node_type = strings[items[pos]]
+            count = items[pos + 1]
+            pos += 2
+            for _ in range(count):
+                key = strings[items[pos]]
+                value = items[pos + 1]
+                pos += 2
+                if value:
+                    attrib[key] = strings[value - 1]
+                    continue
+                size = items[pos]
+                pos += 1
+                end = pos + size * 2
+                namespace_items = tuple(items[pos:end])
+                namespace = namespaces.get(namespace_items)
+                if namespace is None:
+                    namespace = {strings[items[i]]: strings[items[i + 1] - 1] for i in range(pos, end, 2)}
+                    if self.shared:
+                        namespace = _share(namespace)
+                    # unshared namespaces are copied by the nodes
+                    namespaces[namespace_items] = namespace
+                attrib[key] = namespace
+                pos = end
+            parent = stack[-1][0] if stack else None
+            node = Node(parent, node_type, attrib)
+            if root is None:
+                root = node
+            if stack:
+                stack[-1][1] -= 1
+            children = items[pos]
+            pos += 1
+            if children:
+                stack.append([node, children])
+                continue
+            # pop completed parents
+            while stack and not stack[-1][1]:
+                stack.pop()
+            if not stack:
+                return root
+
+    def load(self):
+        data = self.data
+        if self.path:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        if data[:3] != _MAGIC:
+            raise ValueError("Not a binary formation design")
+        if data[3] > _VERSION:
+            raise ValueError("Unsupported binary design version {}".format(data[3]))
+        width = data[4]
+        pos = 5
+        count, pos = _read_varint(data, pos)
+        strings = []
+        for _ in range(count):
+            length, pos = _read_varint(data, pos)
+            strings.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+        count, pos = _read_varint(data, pos)
+        items = array.array(_typecodes[width])
+        items.frombytes(data[pos:pos + count * width])
+        if sys.byteorder != "little":
+            items.byteswap()
+        self.root = self._decode(strings, items.tolist())
+        return self.root
+
+    def generate(self, **kw):
+        strings, items = self._encode(self.root)
+        largest = max(items)
+        width = 1 if largest < 1 << 8 else 2 if largest < 1 << 16 else 4
+        buffer = bytearray(_MAGIC)
+        buffer.append(_VERSION)
+        buffer.append(width)
+        _write_varint(buffer, len(strings))
+        for string in strings:
+            encoded = string.encode("utf-8")
+            _write_varint(buffer, len(encoded))
+            buffer.extend(encoded)
+        _write_varint(buffer, len(items))
+        items = array.array(_typecodes[width], items)
+        if sys.byteorder != "little":
+            items.byteswap()
+        buffer.extend(items.tobytes())
+        return bytes(buffer)
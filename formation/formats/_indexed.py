@@ -0,0 +1,205 @@
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import array
+import mmap
+import struct
+import sys
+
+from formation.formats._binary import BinaryFormat, _typecodes
+
+_MAGIC = b"FMI"
+_VERSION = 1
+# magic, version, item width, string count, item count, index count, globals count
+_header = struct.Struct("<3sBBIIII")
+_little = sys.byteorder == "little"
+
+
+def _view(buffer, typecode, start, count):
+    # random access view over a section of the buffer, copied only on
+    # big endian hosts since the file is little endian
+    size = array.array(typecode).itemsize
+    section = buffer[start:start + count * size]
+    if _little:
+        return section.cast(typecode)
+    items = array.array(typecode)
+    items.frombytes(section)
+    items.byteswap()
+    return items
+
+
+class _StringTable:
+    # decodes strings from the table on demand
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+        self._strings = {}
+
+    def __getitem__(self, index):
+        string = self._strings.get(index)
+        if string is None:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            string = self._strings[index] = str(self._blob[start:end], "utf-8")
+        return string
+
+    def decode_all(self):
+        offsets = self._offsets.tolist()
+        blob = bytes(self._blob)
+        return [blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+    def release(self):
+        for view in (self._offsets, self._blob):
+            if isinstance(view, memoryview):
+                view.release()
+
+
+class IndexedFormat(BinaryFormat):
+    """
+    Random access variant of :py:class:`BinaryFormat`. The file carries an
+    index of named nodes and their offsets in the item stream as well as a
+    table of string offsets. This allows :py:meth:`load_subtree` to memory
+    map the file and decode only the subtree rooted at a given widget name
+    without touching the rest of the document.
+
+    Layout (little endian)::
+
+        magic "FMI" | version (1 byte) | item width (1 byte)
+        string count | item count | index count | globals count (4 bytes each)
+        string offsets (4 bytes each, string count + 1) | utf-8 string data
+        items (item width bytes each)
+        index: (name string | item offset) (4 bytes each) ...
+        globals: item offset (4 bytes each) ...
+
+    Items are encoded exactly like in :py:class:`BinaryFormat`. Index
+    entries are sorted by name so a subtree is located with a binary search
+    which only decodes the names it compares. Globals are
+    the variable and meta nodes directly under the root which are included
+    in every subtree.
+    """
+
+    extensions = ("fmi",)
+    name = "Indexed binary"
+
+    def _sections(self, buffer):
+        if len(buffer) < _header.size:
+            raise ValueError("Not an indexed formation design")
+        magic, version, width, string_count, item_count, index_count, globals_count = _header.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError("Not an indexed formation design")
+        if version > _VERSION:
+            raise ValueError("Unsupported indexed design version {}".format(version))
+        pos = _header.size
+        offsets = _view(buffer, "I", pos, string_count + 1)
+        pos += (string_count + 1) * 4
+        blob = buffer[pos:pos + offsets[string_count]]
+        pos += offsets[string_count]
+        items = _view(buffer, _typecodes[width], pos, item_count)
+        pos += item_count * width
+        index = _view(buffer, "I", pos, index_count * 2 + globals_count)
+        return _StringTable(offsets, blob), items, index, index_count
+
+    def _read(self, loader):
+        # call loader with the sections of the design, mapping the file if required
+        if self.path is None:
+            buffer = memoryview(self.data)
+            try:
+                return loader(*self._sections(buffer))
+            finally:
+                buffer.release()
+        with open(self.path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                buffer = memoryview(mapped)
+                sections = ()
+                try:
+                    sections = self._sections(buffer)
+                    return loader(*sections)
+                finally:
+                    # views have to be released before the map can be closed
+                    for section in sections:
+                        if isinstance(section, memoryview):
+                            section.release()
+                    if sections:
+                        sections[0].release()
+                    buffer.release()
+
+    def load(self):
+        def loader(strings, items, _, __):
+            return self._decode(strings.decode_all(), items.tolist())
+
+        self.root = self._read(loader)
+        return self.root
+
+    def names(self):
+        """
+        Get the names of all the indexed nodes without decoding the design
+
+        :return: sorted list of names
+        """
+        def loader(strings, _, index, count):
+            return [strings[index[i]] for i in range(0, count * 2, 2)]
+
+        return self._read(loader)
+
+    def load_subtree(self, name):
+        def loader(strings, items, index, count):
+            # binary search for the first entry with the name
+            low, high = 0, count
+            while low < high:
+                mid = (low + high) // 2
+                if strings[index[mid * 2]] < name:
+                    low = mid + 1
+                else:
+                    high = mid
+            i = low * 2
+            if low == count or strings[index[i]] != name:
+                raise KeyError(name)
+            node = self._decode(strings, items, index[i + 1])
+            if index[i + 1]:
+                # the root already contains the globals
+                for pos in index[count * 2:]:
+                    node.append_child(self._decode(strings, items, pos))
+            return node
+
+        self.root = self._read(loader)
+        return self.root
+
+    def generate(self, **kw):
+        index = []
+        global_nodes = []
+
+        def visit(node, pos, intern):
+            name = node.attrib.get("name")
+            if node.parent is self.root and (node.is_var() or node.type == "meta"):
+                global_nodes.append(pos)
+            elif isinstance(name, str):
+                index.append((intern(name), pos))
+
+        strings, items = self._encode(self.root, visit)
+        # sorted by name for lookup, duplicate names resolve to the first in document order
+        index.sort(key=lambda entry: (strings[entry[0]], entry[1]))
+        largest = max(items)
+        width = 1 if largest < 1 << 8 else 2 if largest < 1 << 16 else 4
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = [0]
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+
+        sections = [
+            array.array("I", offsets),
+            array.array(_typecodes[width], items),
+            array.array("I", [value for entry in index for value in entry] + global_nodes),
+        ]
+        if not _little:
+            for section in sections:
+                section.byteswap()
+        offsets, items, index_section = sections
+        buffer = bytearray(_header.pack(
+            _MAGIC, _VERSION, width, len(strings), len(items), len(index), len(global_nodes)
+        ))
+        buffer.extend(offsets.tobytes())
+        buffer.extend(b"".join(encoded))
+        buffer.extend(items.tobytes())
+        buffer.extend(index_section.tobytes())
+        return bytes(buffer)
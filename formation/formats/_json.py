@@ -1,54 +1,123 @@
 import json
 
-from formation.formats._base import BaseFormat, Node
+try:
+    import orjson
+except ModuleNotFoundError:
+    # fallback to ujson or the default json library
+    orjson = None
+
+try:
+    import ujson
+except ModuleNotFoundError:
+    ujson = None
+
+from formation.formats._base import BaseFormat, Node, _share_attrib
+
+if orjson is not None:
+    _loads = orjson.loads
+elif ujson is not None:
+    _loads = ujson.loads
+else:
+    _loads = json.loads
+
+_plain_types = (int, float, bool, type(None))
+# pending output is written to file in chunks of this many pieces
+_chunk_size = 1024
+
+
+def _load_json(data):
+    try:
+        return _loads(data)
+    except (ValueError, RecursionError):
+        if _loads is json.loads:
+            raise
+        # the faster libraries limit nesting depth which deep designs may exceed
+        return json.loads(data)
+
+
+def _dumps_compact(data, sort_keys):
+    # compact output is the only layout all the libraries agree on
+    try:
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode("utf-8")
+        if ujson is not None:
+            return ujson.dumps(data, sort_keys=sort_keys, ensure_ascii=False, escape_forward_slashes=False)
+    except (TypeError, ValueError, OverflowError, RecursionError):
+        # nesting depth limit exceeded, use the default library instead
+        pass
+    return json.dumps(data, separators=(",", ":"), sort_keys=sort_keys)
 
 
 class JSONFormat(BaseFormat):
     extensions = ["json"]
     name = "JSON"
+    incremental = True
 
-    def __init__(self, data=None, path=None, node=None):
-        super(JSONFormat, self).__init__(data, path, node)
+    def __init__(self, data=None, path=None, node=None, shared=False):
+        super(JSONFormat, self).__init__(data, path, node, shared)
         self._use_strings = True
 
     def _load_node(self, parent, data: dict) -> Node:
-        node = Node(parent, data["type"], data.get("attrib"))
-        for child in data.get("children", {}):
-            self._load_node(node, child)
-        return node
+        root = None
+        share = _share_attrib if self.shared else None
+        stack = [(parent, data)]
+        while stack:
+            parent, data = stack.pop()
+            attrib = data.get("attrib")
+            if attrib and share:
+                attrib = share(attrib)
+            node = Node(parent, data["type"], attrib)
+            if root is None:
+                root = node
+            children = data.get("children")
+            if children:
+                # reversed so children are created in document order
+                stack.extend((node, child) for child in reversed(children))
+        return root
 
     def _normalize(self, attrib, stringify=False):
-        for key in attrib:
-            if isinstance(attrib[key], dict):
-                attrib[key] = self._normalize(attrib[key], stringify)
-            else:
-                if stringify or not isinstance(attrib[key], (int, float, bool, type(None))):
-                    attrib[key] = str(attrib[key])
-        return attrib
+        # returns a normalized copy, the node attributes are left untouched
+        normalized = dict(attrib)
+        for key, value in attrib.items():
+            if value.__class__ is str:
+                # most values are already strings
+                continue
+            if isinstance(value, dict):
+                normalized[key] = self._normalize(value, stringify)
+            elif stringify or not isinstance(value, _plain_types):
+                normalized[key] = str(value)
+        return normalized
 
     def _to_dict(self, node: Node) -> dict:
-        attrib = self._normalize(node.attrib, self._use_strings)
-        obj = {
-            "type": node.type,
-            "attrib": attrib,
-        }
-        if node.children:
-            obj["children"] = list(map(self._to_dict, node.children))
-        return obj
+        root = []
+        stack = [(node, root)]
+        while stack:
+            node, siblings = stack.pop()
+            obj = {
+                "type": node.type,
+                "attrib": self._normalize(node.attrib, self._use_strings),
+            }
+            siblings.append(obj)
+            if len(node):
+                obj["children"] = []
+                stack.extend((child, obj["children"]) for child in reversed(node))
+        return root[0]
 
     def load(self):
         if self.path:
             with open(self.path, "rb") as file:
-                json_dat = json.load(file)
+                json_dat = _load_json(file.read())
         else:
-            json_dat = json.loads(self.data)
-        self._root = self._load_node(None, json_dat)
-        return self._root
+            json_dat = _load_json(self.data)
+        self.root = self._load_node(None, json_dat)
+        return self.root
 
     def generate(self, **kw):
         self._use_strings = kw.get("stringify_values", True)
         dict_data = self._to_dict(self.root)
         compact = kw.get("compact", False)
+        if compact and not kw.get("pretty_print"):
+            return _dumps_compact(dict_data, kw.get("sort_keys", True))
         opt = {
             "separators": (",", ":") if compact else (", ", ": "),
             "sort_keys": kw.get("sort_keys", True)
@@ -57,3 +126,68 @@ class JSONFormat(BaseFormat):
             indent = kw.get("indent", "")
             opt["indent"] = kw.get("indent_count", 4) if indent == "" else indent
         return json.dumps(dict_data, **opt)
+
+    def stream(self, file, events=None, **kw):
+        # writes the same output as the default json library would for generate
+        if events is None:
+            events = self.root.iter_events()
+        self._use_strings = kw.get("stringify_values", True)
+        sort_keys = kw.get("sort_keys", True)
+        item_separator, key_separator = (",", ":") if kw.get("compact", False) else (", ", ": ")
+        indent = None
+        if kw.get("pretty_print"):
+            indent = kw.get("indent", "")
+            indent = kw.get("indent_count", 4) if indent == "" else indent
+            if not isinstance(indent, str):
+                indent = " " * indent
+        # line breaks by nesting level
+        newlines = [] if indent is None else ["\n"]
+
+        def newline(level):
+            if indent is None:
+                return ""
+            while level >= len(newlines):
+                newlines.append(newlines[-1] + indent)
+            return newlines[level]
+
+        type_key = '"type"' + key_separator
+        attrib_key = '"attrib"' + key_separator
+        children_key = '"children"' + key_separator + "["
+        out = []
+        write = out.append
+        # whether each of the open nodes has children written
+        has_children = []
+        for event, node in events:
+            # a node is nested two levels below its parent, in its
+            # parent object and then the children list
+            level = len(has_children) * 2
+            if event == "start":
+                if has_children:
+                    if not has_children[-1]:
+                        write(item_separator + newline(level - 1) + children_key)
+                        has_children[-1] = True
+                    else:
+                        write(item_separator)
+                    write(newline(level))
+                attrib = json.dumps(
+                    self._normalize(node.attrib, self._use_strings),
+                    separators=(item_separator, key_separator), sort_keys=sort_keys, indent=indent
+                )
+                if indent is not None and "\n" in attrib:
+                    attrib = attrib.replace("\n", newline(level + 1))
+                write("{" + newline(level + 1))
+                if not sort_keys:
+                    write(type_key + json.dumps(node.type) + item_separator + newline(level + 1))
+                write(attrib_key + attrib)
+                has_children.append(False)
+                continue
+            level -= 2
+            if has_children.pop():
+                write(newline(level + 1) + "]")
+            if sort_keys:
+                write(item_separator + newline(level + 1) + type_key + json.dumps(node.type))
+            write(newline(level) + "}")
+            if len(out) > _chunk_size:
+                file.write("".join(out))
+                out.clear()
+        file.write("".join(out))
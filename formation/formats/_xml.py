@@ -2,7 +2,6 @@
 # Copyright (C) 2021 Hoverset Group.                                      #
 # ======================================================================= #
 
-import re
 from collections import defaultdict
 
 try:
@@ -15,7 +14,7 @@ except ModuleNotFoundError:
     element_class = etree.Element
     _using_lxml = False
 
-from formation.formats._base import BaseFormat, Node
+from formation.formats._base import BaseFormat, Node, _share
 
 namespaces = {
     "layout": "http://www.hoversetformationstudio.com/layouts/",
@@ -24,7 +23,12 @@ namespaces = {
     "scroll": "http://www.hoversetformationstudio.com/scroll",
 }
 _reversed_namespaces = dict(zip(namespaces.values(), namespaces.keys()))
-_attr_rgx = re.compile(r"{(?P<namespace>.+)}(?P<attr>.+)")
+_attrib_escapes = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+    "\n": "&#10;", "\r": "&#13;", "\t": "&#09;",
+})
+# pending output is written to file in chunks of this many pieces
+_chunk_size = 1024
 
 
 def _register_namespaces():
@@ -39,19 +43,44 @@ class XMLFormat(BaseFormat):
 
     extensions = ("xml", )
     name = "XML"
+    incremental = True
+
+    def __init__(self, data=None, path=None, node=None, shared=False):
+        super().__init__(data, path, node, shared)
+        self._key_cache = {}
+
+    def _split_key(self, key):
+        # split {namespace}attr keys into (group, attr) or (False, key)
+        # for keys without a namespace, group is None for unknown
+        # namespaces. The result is memoized per instance since the same
+        # keys are repeated all over a design
+        split = self._key_cache.get(key)
+        if split is None:
+            if key[:1] == "{":
+                namespace, _, attr = key[1:].partition("}")
+                split = (_reversed_namespaces.get(namespace), attr)
+            else:
+                split = (False, key)
+            self._key_cache[key] = split
+        return split
 
-    def _load_node(self, parent, x_node: element_class):
+    def _group_attrib(self, attrib):
         grouped = defaultdict(dict)
         # add required fields
-        for attr in x_node.attrib:
-            match = _attr_rgx.search(attr)
-            if match:
-                group = _reversed_namespaces.get(match.group("namespace"))
-                grouped[group][match.group("attr")] = x_node.attrib.get(attr)
+        for key, value in attrib.items():
+            group, attr = self._split_key(key)
+            if group is False:
+                grouped[attr] = value
             else:
-                grouped[attr] = x_node.attrib.get(attr)
+                grouped[group][attr] = value
+        if self.shared:
+            for key, value in grouped.items():
+                if isinstance(value, dict):
+                    grouped[key] = _share(value)
+        return grouped
 
-        node = Node(parent, x_node.tag, grouped)
+    def _load_node(self, parent, x_node: element_class):
+        node = Node(parent, x_node.tag, self._group_attrib(x_node.attrib))
         if hasattr(x_node, "sourceline"):
             node.source_line = x_node.sourceline
         for sub_node in x_node:
@@ -59,20 +88,44 @@ class XMLFormat(BaseFormat):
 
         return node
 
+    def _stream(self, file):
+        # Nodes are created as soon as elements start since the attributes
+        # are already available. Elements are discarded once they end so
+        # only the node tree is fully held in memory
+        nodes = []
+        x_nodes = []
+        root = None
+        for event, x_node in etree.iterparse(file, events=("start", "end")):
+            if event == "start":
+                node = Node(nodes[-1] if nodes else None, x_node.tag, self._group_attrib(x_node.attrib))
+                if hasattr(x_node, "sourceline"):
+                    node.source_line = x_node.sourceline
+                if root is None:
+                    root = node
+                nodes.append(node)
+                x_nodes.append(x_node)
+                continue
+            nodes.pop()
+            x_nodes.pop()
+            x_node.clear()
+            if x_nodes:
+                # all earlier siblings are already removed so this is cheap
+                x_nodes[-1].remove(x_node)
+        return root
+
     def _generate_node(self, parent, node: Node):
         if parent is None:
             x_node = etree.Element(node.type)
         else:
             x_node = etree.SubElement(parent, node.type)
 
-        for key in node.attrib:
-            if isinstance(node.attrib[key], dict):
-                ns = node.attrib[key]
-                for attrib in ns:
+        for key, value in node.attrib.items():
+            if isinstance(value, dict):
+                for attrib in value:
                     attr = "{{{}}}{}".format(namespaces.get(key), attrib)
-                    x_node.attrib[attr] = str(ns[attrib])
+                    x_node.attrib[attr] = str(value[attrib])
             else:
-                x_node.attrib[key] = str(node.attrib[key])
+                x_node.attrib[key] = str(value)
 
         for sub_node in node:
             self._generate_node(x_node, sub_node)
@@ -80,12 +133,12 @@ class XMLFormat(BaseFormat):
         return x_node
 
     def load(self):
+        self._key_cache = {}
         if self.path:
             with open(self.path, "rb") as file:
-                x_node = etree.parse(file).getroot()
+                self.root = self._stream(file)
         else:
-            x_node = etree.fromstring(self.data)
-        self.root = self._load_node(None, x_node)
+            self.root = self._load_node(None, etree.fromstring(self.data))
         return self.root
 
     def generate(self, **kw):
@@ -101,6 +154,56 @@ class XMLFormat(BaseFormat):
             x_node, encoding="utf-8", xml_declaration=kw.get("xml_declaration", True)
         ).decode("utf-8")
 
+    def stream(self, file, events=None, **kw):
+        if events is None:
+            events = self.root.iter_events()
+        pretty_print = kw.get("pretty_print", True)
+        out = []
+        write = out.append
+        if kw.get("xml_declaration", True):
+            write("<?xml version='1.0' encoding='utf-8'?>\n")
+        indents = ["\n"]
+        depth = 0
+        # whether the start tag of the current element is yet to be closed
+        open_tag = False
+        for event, node in events:
+            if event == "start":
+                if open_tag:
+                    write(">")
+                if pretty_print and depth:
+                    if depth == len(indents):
+                        indents.append(indents[-1] + "  ")
+                    write(indents[depth])
+                write("<" + node.type)
+                if not depth:
+                    for prefix, uri in namespaces.items():
+                        write(' xmlns:{}="{}"'.format(prefix, uri))
+                for key, value in node.attrib.items():
+                    if not isinstance(value, dict):
+                        write(' {}="{}"'.format(key, str(value).translate(_attrib_escapes)))
+                        continue
+                    if value and key not in namespaces:
+                        write(' xmlns:{0}="{0}"'.format(key))
+                    for attr, sub_value in value.items():
+                        write(' {}:{}="{}"'.format(key, attr, str(sub_value).translate(_attrib_escapes)))
+                open_tag = True
+                depth += 1
+                continue
+            depth -= 1
+            if open_tag:
+                write("/>")
+                open_tag = False
+            else:
+                if pretty_print:
+                    write(indents[depth])
+                write("</{}>".format(node.type))
+            if len(out) > _chunk_size:
+                file.write("".join(out))
+                out.clear()
+        if pretty_print:
+            write("\n")
+        file.write("".join(out))
+
 
 if __name__ == "__main__":
     x = XMLFormat(path="formation/tests/samples/all_legacy.xml")
@@ -1,4 +1,5 @@
 from formation.handlers import layout, image, misc, scroll
+from formation.handlers.batch import OptionBatch
 
 _namespace_handlers = {
     "attr": misc.AttrHandler,
@@ -13,22 +14,33 @@ _handlers = {
 }
 
 
-def parse_arg(value, type_=None):
+def get_arg_converter(type_):
+    """
+    Resolve the function :func:`parse_arg` uses to convert values of a type
+    so it can be looked up once and applied to many values
+
+    :param type_: type name or callable
+    :return: callable converting a value or ``None`` if values of the type are used as is
+    """
     if type_ is None:
-        return value
+        return None
 
     if type_ in _handlers:
-        return _handlers[type_](value)
+        return _handlers[type_]
 
     if isinstance(type_, str):
         builtin = getattr(__builtins__, type_, None)
     else:
         builtin = type_
 
-    if builtin:
-        return builtin(value)
+    return builtin or None
 
-    return value
+
+def parse_arg(value, type_=None):
+    convert = get_arg_converter(type_)
+    if convert is None:
+        return value
+    return convert(value)
 
 
 def add_namespace_handler(handler):
@@ -42,8 +54,41 @@ def add_handler(typ, handler):
     _handlers[typ] = handler
 
 
-def dispatch_to_handlers(widget, config, **kwargs):
+def get_handlers(config):
     # collect only handlers that are needed for this particular config
-    handlers = [_namespace_handlers[n] for n in _namespace_handlers if n in config]
+    return [_namespace_handlers[n] for n in _namespace_handlers if n in config]
+
+
+def get_namespaces(config=None):
+    """
+    Get the namespaces that have handlers. Unlike the handlers themselves
+    namespaces can be stored for instance by :py:mod:`formation.cache`
+
+    :param config: only namespaces present in this config are returned if provided
+    :return: tuple of namespaces in the order their handlers are dispatched
+    """
+    return tuple(n for n in _namespace_handlers if config is None or n in config)
+
+
+def get_namespace_handlers(namespaces):
+    """
+    Get the handlers of namespaces obtained from :func:`get_namespaces`
+
+    :param namespaces: iterable of namespaces
+    :return: list of handlers
+    """
+    return [_namespace_handlers[n] for n in namespaces]
+
+
+def dispatch_to_handlers(widget, config, handlers=None, **kwargs):
+    if handlers is None:
+        handlers = get_handlers(config)
+    method = kwargs.get("handle_method", getattr(widget, "config", None))
+    batch = None
+    if method is not None:
+        # options for the widget from all the handlers are applied at once
+        batch = kwargs["option_batch"] = OptionBatch(method, kwargs.get("builder"))
     for handler in handlers:
         handler.handle(widget, config, **kwargs)
+    if batch is not None:
+        batch.apply()
@@ -0,0 +1,47 @@
+class OptionBatch:
+    """
+    Accumulates options meant for a handle method so they can be applied
+    in a single call. Handlers for commands and animated images keep the
+    handle method for later use hence options received after the batch is
+    applied are passed to the handle method immediately.
+
+    :param method: handle method to which the options are passed
+    :param builder: optional builder whose ``_tcl_calls`` counter is
+        incremented when the batch is applied
+    """
+
+    def __init__(self, method, builder=None):
+        self.method = method
+        self.builder = builder
+        self._pending = {}
+
+    def __call__(self, **options):
+        if self._pending is None:
+            return self._call(options)
+        self._pending.update(options)
+
+    def _call(self, options):
+        if self.builder is not None:
+            self.builder._tcl_calls += 1
+        return self.method(**options)
+
+    def flush(self):
+        """
+        Apply the options accumulated so far and keep accumulating
+        options received afterwards
+        """
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self._call(pending)
+
+    def apply(self, always=False):
+        """
+        Apply the accumulated options
+
+        :param always: call the handle method even if there are no options
+        """
+        pending, self._pending = self._pending, None
+        if pending or always:
+            self._call(pending)
+        # later calls are not part of the load, also avoids keeping the builder alive
+        self.builder = None
@@ -12,11 +12,7 @@ command_props = (
 def handle(widget, config, **kwargs):
     props = dict(kwargs.get("extra_config", {}))
     builder = kwargs.get("builder")
-    # add the command name and value to command map for deferred
+    # index the command name and value for deferred
     # connection to the actual methods
     for prop in props:
-        builder._command_map.append((
-            prop,
-            props[prop],
-            kwargs.get("handle_method")
-        ))
+        builder._index_callback(props[prop], ("config", prop, kwargs.get("handle_method")))
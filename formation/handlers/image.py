@@ -1,10 +1,16 @@
-import itertools
 import math
 import os
 import pathlib
+import time
+import tkinter
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import ImageTk, Image
 
+from hoverset.ui.clock import FrameClock
+
 
 image_props = (
     "image",
@@ -22,6 +28,139 @@ def _resolve_path(path, base=None):
     return path
 
 
+def _get_master(master):
+    if master is None:
+        return getattr(tkinter, "_default_root", None)
+    return master
+
+
+_executor = None
+
+
+class ImageCache:
+    """
+    Process wide cache of tk images shared by all builders. Images are keyed
+    by resolved path, modification time, requested size and tk interpreter so
+    the same file is converted to a tk image only once per interpreter.
+    Images of an interpreter are dropped once its root window is destroyed.
+    Each builder holds a reference to the images it uses until it is
+    garbage collected. When the estimated memory used exceeds the limit,
+    least recently used images with no references are evicted.
+
+    :param limit: memory limit in bytes
+    """
+
+    def __init__(self, limit=64 * 1024 * 1024):
+        self.limit = limit
+        self.memory = 0
+        # key -> [tk image, estimated memory, reference count]
+        self._entries = OrderedDict()
+        # owner -> keys referenced
+        self._owners = weakref.WeakKeyDictionary()
+        # ids of the interpreters whose root windows are watched
+        self._interps = set()
+
+    def _interp(self, master):
+        master = _get_master(master)
+        if master is None:
+            return None
+        # the id is used so the cache does not keep the interpreter alive
+        interp = id(master.tk)
+        if interp not in self._interps:
+            self._interps.add(interp)
+            root = master._root()
+
+            def on_destroy(event):
+                # events of all the widgets in the root window are received
+                if event.widget is root:
+                    self._drop(interp)
+
+            root.bind("<Destroy>", on_destroy, add=True)
+        return interp
+
+    def _key(self, path, master, size, mtime=None):
+        if mtime is None:
+            mtime = os.stat(path).st_mtime_ns
+        return str(path), mtime, size, self._interp(master)
+
+    def _drop(self, interp):
+        self._interps.discard(interp)
+        for key in [k for k in self._entries if k[3] == interp]:
+            self.memory -= self._entries.pop(key)[1]
+
+    def get(self, path, master=None, size=None, owner=None, loader=Image.open, mtime=None):
+        """
+        Get a tk image for the image file at path creating it if necessary
+
+        :param path: resolved path to the image
+        :param master: widget whose interpreter the image is to be created in
+        :param size: optional tuple of maximum width and height of the image
+        :param owner: object holding a reference to the image. The reference
+            is released when the owner is garbage collected
+        :param loader: callable used to obtain a PIL image from the path on a miss
+        :param mtime: modification time of the file in nanoseconds if already known
+        :return: the tk image, or the PIL image for animated images which
+            are not cached
+        """
+        key = self._key(path, master, size, mtime)
+        entry = self._entries.get(key)
+        if entry is None:
+            image = loader(path)
+            if getattr(image, "is_animated", False):
+                return image
+            if size is not None:
+                image = image.copy()
+                image.thumbnail(size)
+            tk_image = ImageTk.PhotoImage(image, master=master)
+            entry = self._entries[key] = [tk_image, image.width * image.height * 4, 0]
+            self.memory += entry[1]
+        self._entries.move_to_end(key)
+        if owner is not None:
+            self._acquire(key, owner)
+        self._evict()
+        return entry[0]
+
+    def _acquire(self, key, owner):
+        keys = self._owners.get(owner)
+        if keys is None:
+            keys = self._owners[owner] = set()
+            # keys is not tied to the owner so it is available after collection
+            weakref.finalize(owner, self._release, keys)
+        if key not in keys:
+            keys.add(key)
+            self._entries[key][2] += 1
+
+    def _release(self, keys):
+        for key in keys:
+            if key in self._entries:
+                self._entries[key][2] -= 1
+        self._evict()
+
+    def _evict(self):
+        if self.memory <= self.limit:
+            return
+        for key in [k for k, e in self._entries.items() if not e[2]]:
+            self.memory -= self._entries.pop(key)[1]
+            if self.memory <= self.limit:
+                break
+
+    def cached_paths(self):
+        """
+        :return: set of paths with images in the cache
+        """
+        return {key[0] for key in self._entries}
+
+    def clear(self):
+        """
+        Remove all images without references from the cache
+        """
+        for key in [k for k, e in self._entries.items() if not e[2]]:
+            self.memory -= self._entries.pop(key)[1]
+
+
+image_cache = ImageCache()
+
+
 def parse_image(path, master=None, base_path=None):
     path = _resolve_path(path, base_path)
 
@@ -30,6 +169,57 @@ def parse_image(path, master=None, base_path=None):
     return image
 
 
+def collect_images(node, base_path=None):
+    """
+    Collect the paths of all images referenced in a node tree
+
+    :param node: root :py:class:`~formation.formats.Node` of the tree
+    :param base_path: path to the design file used to resolve relative paths
+    :return: set of resolved image paths as strings
+    """
+    paths = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        stack.extend(node)
+        if node.type == "arg":
+            # image arguments to methods
+            if node.attrib.get("type") == "image" and node.attrib.get("value"):
+                paths.add(str(_resolve_path(node.attrib["value"], base_path)))
+            continue
+        for namespace in ("attr", "menu", "layout"):
+            config = node.attrib.get(namespace)
+            if not isinstance(config, dict):
+                continue
+            for prop in image_props:
+                if config.get(prop):
+                    paths.add(str(_resolve_path(config[prop], base_path)))
+    return paths
+
+
+def _decode(path):
+    image = Image.open(path)
+    # force decoding in the worker thread, Image.open is lazy
+    image.load()
+    return image
+
+
+def decode_images(paths):
+    """
+    Decode images in a thread pool. Only the decoding is done in the
+    worker threads, conversion to tk images has to be done in the main thread
+
+    :param paths: iterable of image paths
+    :return: dictionary of image paths to futures whose result is the decoded PIL image
+    """
+    global _executor
+    if not paths:
+        return {}
+    if _executor is None:
+        _executor = ThreadPoolExecutor(thread_name_prefix="formation-image")
+    return {path: _executor.submit(_decode, path) for path in paths}
+
+
 def to_tk_image(image, widget=None):
     root = None
     if widget:
@@ -37,24 +227,112 @@ def to_tk_image(image, widget=None):
     return ImageTk.PhotoImage(image, master=root)
 
 
-def get_frames(image, widget=None):
-    # Get all frames present in an image
-    frames = [to_tk_image(image, widget)]
-    try:
-        while True:
-            image.seek(image.tell() + 1)
-            frames.append(to_tk_image(image, widget))
-    except EOFError:
-        pass
-    return frames
+class FrameStrip:
+    """
+    Frames of an animated image converted to tk images on demand. Only a
+    bounded window of the most recently used frames is kept in memory.
+    Strips are shared by all widgets displaying the same image.
+
+    :param image: animated PIL image
+    :param master: widget whose interpreter the frames are to be created in
+    :param window: maximum number of converted frames to keep
+    """
+
+    def __init__(self, image, master=None, window=16):
+        self.image = image
+        self.master = master
+        self.window = window
+        self.count = getattr(image, "n_frames", 1)
+        self.loop = image.info.get("loop", 0)
+        self._durations = {}
+        self._frames = OrderedDict()
+
+    def frame(self, index):
+        """
+        Get the frame at a given index
+
+        :param index: index of the frame
+        :return: tuple of the tk image and the duration of the frame in milliseconds
+        """
+        if index in self._frames:
+            self._frames.move_to_end(index)
+        else:
+            self.image.seek(index)
+            self._durations[index] = self.image.info.get("duration", 100) or 100
+            self._frames[index] = ImageTk.PhotoImage(self.image, master=self.master)
+            if len(self._frames) > self.window:
+                self._frames.popitem(last=False)
+        return self._frames[index], self._durations[index]
 
 
-def load_image_to_widget(widget, image, prop, builder, handle_method=None):
-    # cancel any animate cycles present
+# (key, interpreter) -> frame strip
+_strips = weakref.WeakValueDictionary()
+
+
+def get_frame_strip(image, master=None, key=None):
+    """
+    Get a frame strip for an animated image, reusing a strip for the same
+    key and interpreter if one is still in use
+
+    :param image: animated PIL image
+    :param master: widget whose interpreter the frames are to be created in
+    :param key: hashable identifying the image for instance its path and
+        modification time. If not provided the strip is not shared
+    :return: :py:class:`FrameStrip`
+    """
+    if key is None:
+        return FrameStrip(image, master)
+    key = (key, getattr(_get_master(master), "tk", None))
+    strip = _strips.get(key)
+    if strip is None:
+        strip = _strips[key] = FrameStrip(image, master)
+    return strip
+
+
+class Animation:
+    """
+    Displays the frames of a :py:class:`FrameStrip` through a handle method.
+    Animations are driven by the :py:class:`~hoverset.ui.clock.FrameClock` of
+    their interpreter and are paused while their widget is unmapped
+    """
+
+    def __init__(self, strip, handle_method, prop):
+        self.strip = strip
+        self.handle_method = handle_method
+        self.prop = prop
+        self.index = 0
+        self.current = None
+        self.clock = None
+        loop = strip.loop
+        self._remaining = math.inf if loop == 0 else loop * strip.count
+
+    def step(self, now):
+        self.current, duration = self.strip.frame(self.index)
+        self.handle_method(**{self.prop: self.current})
+        self.index = (self.index + 1) % self.strip.count
+        self._remaining -= 1
+        if self._remaining <= 0:
+            return None
+        return now + duration / 1000
+
+    def start(self, widget=None):
+        # display the first frame right away
+        due = self.step(time.monotonic())
+        if due is not None:
+            self.clock = FrameClock.get(widget)
+            self.clock.subscribe(self.step, widget, due)
+
+    def stop(self):
+        if self.clock is not None:
+            self.clock.unsubscribe(self.step)
+
+
+def load_image_to_widget(widget, image, prop, builder, handle_method=None, key=None):
+    # stop any animations present
     cycle_attr = '_{}_cycle'.format(prop)
     handle_method = widget.config if handle_method is None else handle_method
     if hasattr(widget, cycle_attr):
-        widget.after_cancel(getattr(widget, cycle_attr))
+        getattr(widget, cycle_attr).stop()
     if not isinstance(image, Image.Image):
         # load non PIL image values
         handle_method(**{prop: image})
@@ -67,29 +345,19 @@ def load_image_to_widget(widget, image, prop, builder, handle_method=None):
         # store a reference to shield from garbage collection
         builder._image_cache.append(image)
         return
-    # Animate the image only if there are more than one frames
-    frames = get_frames(image, widget)
-    frame_count = len(frames)
-    if frame_count == 1:
-        handle_method(**{prop: frames[0]})
+    strip = get_frame_strip(image, widget, key)
+    if strip.count == 1:
+        frame, _ = strip.frame(0)
+        handle_method(**{prop: frame})
+        builder._image_cache.append(frame)
         return
 
-    # an infinite iterator to loop through the frames continuously
-    cycle = itertools.cycle(frames)
-    loop = image.info.get("loop", 0)
-    loop = math.inf if loop == 0 else loop
-    loop_count = 0
-
-    def cycle_frames():
-        nonlocal loop_count
-        handle_method(**{prop: next(cycle)})
-        loop_count += 1
-        if loop_count // frame_count >= loop:
-            return
-        setattr(widget, cycle_attr, widget.after(image.info.get("duration", 100), cycle_frames))
-
-    # begin animation
-    cycle_frames()
+    animation = Animation(strip, handle_method, prop)
+    # the animation holds the strip and the frame currently displayed
+    builder._image_cache.append(animation)
+    if widget is not None:
+        setattr(widget, cycle_attr, animation)
+    animation.start(widget)
 
 
 def handle(widget, config, **kwargs):
@@ -101,5 +369,7 @@ def handle(widget, config, **kwargs):
             # ignore empty values
             continue
         path = _resolve_path(props[prop], builder.path)
-        image = Image.open(path)
-        load_image_to_widget(widget, image, prop, builder, handle_method)
+        mtime = os.stat(path).st_mtime_ns
+        image = image_cache.get(path, widget, owner=builder, loader=builder._open_image, mtime=mtime)
+        key = (str(path), mtime)
+        load_image_to_widget(widget, image, prop, builder, handle_method, key)
@@ -2,6 +2,7 @@ import tkinter as tk
 import tkinter.ttk as ttk
 
 from formation.handlers import image
+from formation.handlers.batch import OptionBatch
 
 namespaces = {
     "layout": "http://www.hoversetformationstudio.com/layouts/",
@@ -12,17 +13,22 @@ _redirect = {
 }
 
 
+def _pop_size(options):
+    # width and height are widget options for these layouts
+    return {opt: options.pop(opt) for opt in ("width", "height") if opt in options}
+
+
 def set_grid(widget, _=None, **options):
-    for opt in list(options):
-        if opt in ("width", "height"):
-            widget[opt] = options.pop(opt)
+    size = _pop_size(options)
+    if size:
+        widget.configure(**size)
     widget.grid(**options)
 
 
 def set_pack(widget, _=None, **options):
-    for opt in list(options):
-        if opt in ("width", "height"):
-            widget[opt] = options.pop(opt)
+    size = _pop_size(options)
+    if size:
+        widget.configure(**size)
     widget.pack(**options)
 
 
@@ -56,15 +62,77 @@ _layout_handlers = {
 }
 
 
+# geometry managers whose calls can be deferred until the end of a load
+_managers = {
+    set_grid: "grid",
+    set_pack: "pack",
+    set_place: "place",
+}
+
+# runs a list of geometry commands in order
+_apply_geometry_script = ("specs", "foreach spec $specs {{*}$spec}")
+
+
+def _describe(node):
+    if node is None:
+        return ""
+    name = node.attrib.get("name")
+    return "{}{}{}: ".format(
+        node.get_source_line_info(), node.type, " '{}'".format(name) if name else ""
+    )
+
+
+def apply_geometry(queue):
+    """
+    Apply deferred geometry in a single call to tcl. Tk then lays out each
+    container once instead of after every child is added. If the call fails
+    the commands are run one by one so the others are still applied, the
+    first failure is then raised along with the node it belongs to
+
+    :param queue: list of tuples of a widget, the geometry command to be run
+        for it and the node it was loaded from for instance
+        ``(button, ("grid", "configure", ".f.button", "-row", "0"), node)``
+    """
+    if not queue:
+        return
+    tk_app = queue[0][0].tk
+    try:
+        tk_app.call("apply", _apply_geometry_script, tuple(spec for _, spec, _ in queue))
+        return
+    except tk.TclError:
+        pass
+    error = None
+    for _, spec, node in queue:
+        try:
+            tk_app.call(spec)
+        except tk.TclError as e:
+            if error is None:
+                error = tk.TclError("{}{}".format(_describe(node), e))
+    if error is not None:
+        raise error
+
+
 def get_layout_handler(parent_node, parent):
-    layout = None if parent_node is None else parent_node["attr"].get("layout")
+    return resolve_layout_handler(parent_node, parent.__class__)
+
+
+def resolve_layout_handler(parent_node, parent_class):
+    """
+    Get the function used to add widgets to a parent from the class of the
+    parent so it can be resolved before the parent is created
+
+    :param parent_node: node of the parent
+    :param parent_class: class of the parent widget
+    :return: layout function or ``None`` if the parent has no layout
+    """
+    layout = None if parent_node is None else parent_node.attrib.get("attr", {}).get("layout")
     if layout is not None:
         return _layout_handlers.get(layout)
-    if parent.__class__ == ttk.Notebook:
+    if parent_class == ttk.Notebook:
         return set_tab
-    if parent.__class__ == tk.PanedWindow:
+    if parent_class == tk.PanedWindow:
         return set_pane
-    if parent.__class__ == ttk.PanedWindow:
+    if parent_class == ttk.PanedWindow:
         return set_pane
 
 
@@ -73,13 +141,38 @@ def handle(widget, config, **kwargs):
     if parent is None or isinstance(widget, (tk.Tk, tk.Toplevel)):
         return
     parent_node = kwargs.get("parent_node")
-    layout = get_layout_handler(parent_node, parent)
+    builder = kwargs.get("builder")
+    node = kwargs.get("node")
+    # builders may have resolved layouts in advance
+    resolve = getattr(builder, "_get_layout_handler", None)
+    if resolve is None:
+        layout = get_layout_handler(parent_node, parent)
+    else:
+        layout = resolve(node, parent_node, parent)
     if layout is None:
         return
 
-    def handle_method(**kw):
-        layout(widget, parent, **kw)
-
+    option_batch = kwargs.get("option_batch")
+    queue = getattr(builder, "_geometry_queue", None)
+    manager = _managers.get(layout)
+    if queue is not None and manager is not None:
+        def set_layout(**kw):
+            size = {} if layout == set_place else _pop_size(kw)
+            if size:
+                widget.configure(**size)
+            queue.append((widget, (manager, "configure", widget._w, *widget._options(kw)), node))
+
+        # the builder counts the call when the queue is applied
+        builder = None
+    else:
+        def set_layout(**kw):
+            if option_batch is not None:
+                # options such as size must be set before the widget is added
+                option_batch.flush()
+            layout(widget, parent, **kw)
+
+    # redirected and direct options are applied in a single geometry call
+    handle_method = OptionBatch(set_layout, builder)
     cnf = kwargs.get("extra_config", config.get("layout", {}))
     direct_config = {}
     for prop in cnf:
@@ -89,4 +182,8 @@ def handle(widget, config, **kwargs):
             continue
         # accumulate config that can be handled directly
         direct_config[prop] = cnf[prop]
+    if option_batch is not None and layout in (set_grid, set_pack):
+        # apply the size along with the other widget options
+        option_batch(**_pop_size(direct_config))
     handle_method(**direct_config)
+    handle_method.apply(always=True)
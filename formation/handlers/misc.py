@@ -1,4 +1,5 @@
 from formation.handlers import image, command
+from formation.handlers.batch import OptionBatch
 
 
 class VariableHandler:
@@ -45,9 +46,10 @@ class MenuHandler:
             return
         attributes = config.get("menu", {})
 
-        def handle_method(**conf):
+        def entry_configure(**conf):
             menu.entryconfigure(index, **conf)
 
+        handle_method = OptionBatch(entry_configure, kwargs.get("builder"))
         for attr in attributes:
             if attr in cls._redirect:
                 extra = {
@@ -57,6 +59,7 @@ class MenuHandler:
                 cls._redirect[attr].handle(None, config, **kwargs, **extra)
                 continue
             handle_method(**{attr: attributes[attr]})
+        handle_method.apply()
 
 
 class AttrHandler:
@@ -73,7 +76,8 @@ class AttrHandler:
     @classmethod
     def handle(cls, widget, config, **kwargs):
         attributes = config.get("attr", {})
-        handle_method = kwargs.get("handle_method", widget.config)
+        # options are applied along with those of the other handlers if possible
+        handle_method = kwargs.get("option_batch") or kwargs.get("handle_method", widget.config)
         # update handle method just in case it was missing
         kwargs.update(handle_method=handle_method)
         direct_config = {}
@@ -84,4 +88,5 @@ class AttrHandler:
                 cls._redirect[attr].handle(widget, config, **kwargs, extra_config={attr: attributes[attr]})
                 continue
             direct_config[attr] = attributes[attr]
-        handle_method(**direct_config)
+        if direct_config:
+            handle_method(**direct_config)
@@ -6,17 +6,22 @@ Contains classes that load formation design files and generate user interfaces
 # ======================================================================= #
 import logging
 import os
+import time
 import warnings
 from collections import defaultdict
 from importlib import import_module
 import tkinter as tk
 import tkinter.ttk as ttk
 
-from formation.formats import Node, BaseAdapter, infer_format
-from formation.handlers import dispatch_to_handlers, parse_arg
+from PIL import Image, ImageTk
+
+from formation.formats import Node, BaseAdapter, BaseFormat, infer_format
+from formation.handlers import dispatch_to_handlers, parse_arg, get_namespaces, get_namespace_handlers
 from formation.meth import Meth
-from formation.handlers.image import parse_image
+from formation.handlers.image import collect_images, decode_images, image_cache, _resolve_path
+from formation.handlers.layout import apply_geometry, get_layout_handler, resolve_layout_handler
 from formation.handlers.scroll import apply_scroll_config
+from formation import cache
 import formation
 
 logger = logging.getLogger(__name__)
@@ -64,6 +69,31 @@ _ignore_tags = (
 )
 
 
+# type string -> class cache shared by all builders
+_class_cache = {}
+
+
+def clear_class_cache(module=None):
+    """
+    Invalidate resolved classes cached by the loader. Call this after
+    reloading or replacing custom widget modules so the new classes are
+    picked up on subsequent loads
+
+    :param module: name of module whose classes are to be invalidated for
+        instance ``"custom.widgets"``, as used in the types of design nodes.
+        Classes of its submodules are invalidated too. If not provided all
+        resolved classes are invalidated
+    """
+    if module is None:
+        _class_cache.clear()
+        return
+    for type_ in list(_class_cache):
+        # the class may be defined elsewhere hence the module in the type is used
+        type_module = type_.rpartition(".")[0]
+        if type_module == module or type_module.startswith(module + "."):
+            _class_cache.pop(type_)
+
+
 class BaseLoaderAdapter(BaseAdapter):
     required_fields = ["layout"]
 
@@ -75,6 +105,13 @@ class BaseLoaderAdapter(BaseAdapter):
 
     @classmethod
     def _get_class(cls, node):
+        obj_class = _class_cache.get(node.type)
+        if obj_class is None:
+            obj_class = _class_cache[node.type] = cls._resolve_class(node)
+        return obj_class
+
+    @classmethod
+    def _resolve_class(cls, node):
         module, impl = node.get_mod_impl()
         if module in _preloaded:
             module = _preloaded[module]
@@ -87,16 +124,22 @@ class BaseLoaderAdapter(BaseAdapter):
 
     @classmethod
     def load(cls, node, builder, parent):
-        obj_class = cls._get_class(node)
+        obj_class = builder._get_class(node)
         cls._load_required_fields(node)
         config = node.attrib
+        options = {}
+        name = builder._widget_name(node)
+        if name:
+            options["name"] = name
         if obj_class == ttk.PanedWindow and "orient" in config.get("attr", {}):
+            # copy to avoid altering the node which may be loaded again
+            config = dict(config, attr=dict(config.get("attr")))
             orient = config["attr"].pop("orient")
-            obj = obj_class(parent, orient=orient)
+            obj = obj_class(parent, orient=orient, **options)
         elif obj_class == tk.Tk:
             obj = obj_class()
         else:
-            obj = obj_class(parent)
+            obj = obj_class(parent, **options)
         parent_node = node.parent
         kwargs = {
             "parent_node": parent_node,
@@ -104,21 +147,23 @@ class BaseLoaderAdapter(BaseAdapter):
             "node": node,
             "builder": builder,
         }
-        dispatch_to_handlers(obj, config, **kwargs)
+        dispatch_to_handlers(obj, config, handlers=builder._get_handlers(node), **kwargs)
         name = node.attrib.get("name")
         if name:
             # if name attribute is missing calling setattr will raise errors
             setattr(builder, name, obj)
         for sub_node in node:
             if sub_node.type == "event":
-                builder._event_map[obj].append(dict(sub_node.attrib))
+                attrib = sub_node.attrib
+                builder._index_callback(attrib.get("handler"), ("bind", obj, attrib.get("sequence"), attrib.get("add")))
             elif sub_node.type == "grid":
-                if sub_node.attrib.get("column"):
-                    column = sub_node.attrib.pop("column")
-                    obj.columnconfigure(column, **sub_node.attrib)
-                elif sub_node.attrib.get("row"):
-                    row = sub_node.attrib.pop("row")
-                    obj.rowconfigure(row, **sub_node.attrib)
+                grid_conf = dict(sub_node.attrib)
+                if grid_conf.get("column"):
+                    column = grid_conf.pop("column")
+                    obj.columnconfigure(column, **grid_conf)
+                elif grid_conf.get("row"):
+                    row = grid_conf.pop("row")
+                    obj.rowconfigure(row, **grid_conf)
             elif sub_node.type == "meth":
                 meth = Meth.from_node(sub_node)
                 meth.call(
@@ -157,8 +202,8 @@ class MenuLoaderAdapter(BaseLoaderAdapter):
                 menu.add(sub_node.type)
                 index = menu.index(tk.END)
                 dispatch_to_handlers(menu, attrib, **kwargs, menu=menu, index=index)
-            elif cls._get_class(sub_node) == tk.Menu:
-                obj_class = cls._get_class(sub_node)
+            elif builder._get_class(sub_node) == tk.Menu:
+                obj_class = builder._get_class(sub_node)
                 menu_obj = obj_class(widget)
                 if widget:
                     widget.configure(menu=menu_obj)
@@ -176,8 +221,8 @@ class VariableLoaderAdapter(BaseLoaderAdapter):
 
     @classmethod
     def load(cls, node, builder, __=None):
-        obj_class = cls._get_class(node)
-        attributes = node.attrib.get("attr", {})
+        obj_class = builder._get_class(node)
+        attributes = dict(node.attrib.get("attr", {}))
         _id = attributes.pop("name")
         if not hasattr(builder, "_var_cache"):
             builder._var_cache = {}
@@ -200,20 +245,72 @@ class CanvasLoaderAdapter(BaseLoaderAdapter):
                 "builder": builder,
             }
 
-            _id = sub_node.attrib.pop("name", None)
-            coords = sub_node.attrib.pop("coords", "").split(",")
+            # copy to avoid altering the node which may be loaded again
+            attrib = dict(sub_node.attrib)
+            _id = attrib.pop("name", None)
+            coords = attrib.pop("coords", "").split(",")
             item_id = canvas._create(sub_node.type.lower(), coords, {})
 
             def handle(**config):
                 canvas.itemconfig(item_id, config)
 
-            dispatch_to_handlers(canvas, sub_node.attrib, **kwargs, handle_method=handle)
+            dispatch_to_handlers(canvas, attrib, **kwargs, handle_method=handle)
             if _id:
                 setattr(builder, _id, item_id)
 
         return canvas
 
 
+def resolve_design(root):
+    """
+    Resolve the classes, handlers and layout functions required to load a
+    design so they can be compiled by :py:mod:`formation.cache`. Nodes whose
+    classes cannot be resolved are left out, loading them reports the error
+
+    :param root: root :py:class:`~formation.formats.Node` of the design
+    :return: dict mapping ids of nodes to tuples of the form
+        ``(class, namespaces, layout)`` where namespaces are those returned
+        by :py:func:`~formation.handlers.get_namespaces` for the node and
+        layout is the function adding the widget to its parent or ``None``
+    """
+    resolved = {}
+    stack = [(root, None)]
+    while stack:
+        node, parent_class = stack.pop()
+        if node.type in _ignore_tags:
+            continue
+        try:
+            obj_class = BaseLoaderAdapter._get_class(node)
+        except (ImportError, AttributeError, SyntaxError):
+            continue
+        if node.is_var():
+            resolved[id(node)] = (obj_class, (), None)
+            continue
+        BaseLoaderAdapter._load_required_fields(node)
+        layout = None
+        if parent_class is not None:
+            layout = resolve_layout_handler(node.parent, parent_class)
+        resolved[id(node)] = (obj_class, get_namespaces(node.attrib), layout)
+        if obj_class in _containers:
+            stack.extend((child, obj_class) for child in node)
+        elif node is root:
+            # variables may still be defined under a non-container root
+            stack.extend((child, None) for child in node if child.is_var())
+        if Builder._adapter_map.get(obj_class) == MenuLoaderAdapter:
+            # only the classes of menus are used by the adapter
+            menus = [child for child in node if not child.is_var()]
+            while menus:
+                sub_node = menus.pop()
+                if sub_node.type in _ignore_tags:
+                    continue
+                try:
+                    resolved[id(sub_node)] = (BaseLoaderAdapter._get_class(sub_node), (), None)
+                except (ImportError, AttributeError, SyntaxError):
+                    continue
+                menus.extend(sub_node)
+    return resolved
+
+
 class Builder:
     """
     Load design file into a GUI with all components accessible as attributes
@@ -226,6 +323,17 @@ class Builder:
         * **node**: an instance of :py:class:`~formation.formats.Node` from which to load the design directly
         * **format**: an instance of :py:class:`~formation.formats.BaseFormat` to be used in loading the string
         contents provided by the **string** option
+        * **cache**: set to ``True`` to load designs from **path** that were loaded
+        before from the compiled cache in :py:mod:`formation.cache`. Both parsing and
+        resolving classes, handlers and layouts are skipped. Defaults to ``False``
+        * **lazy**: set to ``True`` to defer creation of the contents of
+        notebook tabs other than the first, hidden or collapsed paned window panes
+        and withdrawn or iconified nested toplevels until they are first mapped. Accessing a deferred widget
+        as an attribute of the builder creates it immediately. Defaults to ``False``
+        * **subtree**: name of a widget in the design at **path**. Only the widget and
+        its children are loaded along with the variables defined in the design. Designs in the
+        :py:class:`~formation.formats.IndexedFormat` are memory mapped and only the required
+        subtree is decoded
 
     .. note::
         if the **string** option is used, not providing the **format** option will
@@ -247,14 +355,42 @@ class Builder:
         self._image_cache = (
             []
         )  # Cache for images to shield them from garbage collection
-        # stores event binding for deferred connection to methods
-        self._event_map = defaultdict(list)
-        # stores command names for deferred connection to methods
-        self._command_map = []
+        # callback names mapped to the event bindings and command options
+        # where they are to be connected
+        self._callback_index = defaultdict(list)
+        # sites indexed while lazily loaded widgets are being created
+        self._new_callbacks = None
         self._root = None
         path = kwargs.get("path")
         self._path = path if path is None else os.path.abspath(path)
         self._meta = {}
+        self._use_cache = kwargs.get("cache", False)
+        self._subtree = kwargs.get("subtree")
+        # timing and other information about the last load
+        self._load_stats = {}
+        # classes resolved for nodes in the current load
+        self._resolved = {}
+        # classes, handlers and layouts compiled by the cache for the nodes
+        # of the design which is kept alive so the ids remain valid
+        self._compiled = {}
+        self._compiled_root = None
+        self._class_resolutions = 0
+        # option and geometry calls made to tk by the handlers
+        self._tcl_calls = 0
+        # geometry calls deferred until all the widgets are created
+        self._geometry_queue = None
+        # method calls deferred until the geometry is settled
+        self._deferred_meths = []
+        self._lazy = kwargs.get("lazy", False)
+        # containers whose children are yet to be loaded mapped to their nodes
+        self._lazy_groups = {}
+        # names of widgets yet to be loaded mapped to their lazy container
+        self._lazy_index = {}
+        # lookup of the callbacks last connected, to be used for lazily loaded widgets
+        self._callback_lookup = None
+        self._lazy_callbacks = False
+        # images being decoded in the background mapped to their futures
+        self._decoded = {}
 
         if kwargs.get("node"):
             self.load_node(kwargs.get("node"))
@@ -270,7 +406,12 @@ class Builder:
 
     def _arg_parser(self, a, t):
         if t == "image":
-            image = parse_image(a, master=self._root, base_path=self._path)
+            image = image_cache.get(
+                _resolve_path(a, self._path), self._root, owner=self, loader=self._open_image
+            )
+            if isinstance(image, Image.Image):
+                # animated images are not cached, use the first frame
+                image = ImageTk.PhotoImage(image, master=self._root)
             self._image_cache.append(image)
             return image
         return parse_arg(a, t)
@@ -278,29 +419,108 @@ class Builder:
     def _get_adapter(self, widget_class):
         return self._adapter_map.get(widget_class, BaseLoaderAdapter)
 
+    def _get_class(self, node):
+        compiled = self._compiled.get(id(node))
+        if compiled is not None:
+            return compiled[0]
+        # nodes are kept alive throughout the load so their ids are stable
+        obj_class = self._resolved.get(id(node))
+        if obj_class is None:
+            obj_class = self._resolved[id(node)] = BaseLoaderAdapter._get_class(node)
+            self._class_resolutions += 1
+        return obj_class
+
+    def _get_handlers(self, node):
+        compiled = self._compiled.get(id(node))
+        if compiled is not None:
+            return get_namespace_handlers(compiled[1])
+        # handlers are looked up on dispatch by default
+        return None
+
+    def _get_layout_handler(self, node, parent_node, parent):
+        compiled = self._compiled.get(id(node))
+        # the root of a subtree is no longer laid out in its design parent
+        if compiled is None or parent_node is None:
+            return get_layout_handler(parent_node, parent)
+        return compiled[2]
+
+    def _release_compiled(self):
+        # compiled entries are still needed by lazy widgets
+        if not self._lazy_groups:
+            self._compiled = {}
+            self._compiled_root = None
+
+    def _widget_name(self, node):
+        # use tk generated widget names by default
+        return None
+
+    def _open_image(self, path):
+        future = self._decoded.get(str(path))
+        if future is None:
+            return Image.open(path)
+        return future.result()
+
+    def _decode_images(self, node):
+        # decode images in the background while widgets are created
+        paths = collect_images(node, self._path) - self._decoded.keys() - image_cache.cached_paths()
+        self._decoded.update(decode_images(paths))
+
     def _load_node(self, root_node):
-        # load meta and variables first
-        self._load_meta(root_node, self)
-        self._verify_version()
-        # lazy load variables
-        self._load_variables(root_node, self)
-        node = self._load_widgets(root_node, self, self._parent)
-        self._flush_var_cache()
-        if hasattr(self, "_scroll_map"):
-            apply_scroll_config(self, self._scroll_map)
-            delattr(self, "_scroll_map")
+        try:
+            self._decode_images(root_node)
+            # load meta and variables first
+            self._load_meta(root_node, self)
+            self._verify_version()
+            # lazy load variables
+            self._load_variables(root_node, self)
+            self._geometry_queue = []
+            node = self._load_widgets(root_node, self, self._parent)
+            self._place_root(node, root_node)
+            self._apply_geometry()
+            self._flush_var_cache()
+            self._apply_scroll_map()
+        finally:
+            self._geometry_queue = None
+            if not self._lazy_groups:
+                # decoded images are still needed by lazy widgets
+                self._decoded.clear()
+            self._resolved.clear()
+            self._release_compiled()
+            self._load_stats["class_resolutions"] = self._class_resolutions
+            self._class_resolutions = 0
+            self._load_stats["tcl_calls"] = self._tcl_calls
+            self._tcl_calls = 0
         return node
 
+    def _place_root(self, root, root_node):
+        # lay out the root widget before the design geometry is applied
+        pass
+
+    def _apply_geometry(self):
+        queue, self._geometry_queue = self._geometry_queue, None
+        if queue:
+            apply_geometry(queue)
+            self._tcl_calls += 1
+            # lay out all the containers at once
+            queue[0][0].update_idletasks()
+
+    def _apply_scroll_map(self):
+        # detach the map first since resolving scrollbars may load
+        # lazy widgets which add to a new scroll map
+        scroll_map = self.__dict__.pop("_scroll_map", None)
+        if scroll_map:
+            apply_scroll_config(self, scroll_map)
+
     def _load_variables(self, node, builder):
         for sub_node in node:
             if sub_node.is_var():
                 VariableLoaderAdapter.load(sub_node, builder)
 
     def _get_var(self, name):
-        if not hasattr(self, "_var_cache"):
-            return None
-        if name not in self._var_cache:
-            return None
+        if not hasattr(self, "_var_cache") or name not in self._var_cache:
+            # variables may have already been flushed for lazily loaded widgets
+            var = self.__dict__.get(name)
+            return var if isinstance(var, tk.Variable) else None
         obj_class, attributes, obj = self._var_cache[name]
         if obj is None:
             obj = obj_class(**attributes)
@@ -331,19 +551,109 @@ class Builder:
                 builder._meta[meta.pop('name')] = meta
 
     def _load_widgets(self, node, builder, parent):
-        adapter = self._get_adapter(BaseLoaderAdapter._get_class(node))
+        adapter = self._get_adapter(self._get_class(node))
         widget = adapter.load(node, builder, parent)
         if widget.__class__ not in _containers:
             # We dont need to load child tags of non-container widgets
             return widget
+        if self._lazy and self._is_lazy(node, widget, parent):
+            self._defer(node, widget)
+            return widget
+        self._load_children(node, builder, widget)
+        return widget
+
+    def _load_children(self, node, builder, widget):
         for sub_node in node:
             if sub_node.is_var() or sub_node.type in _ignore_tags:
                 # ignore variables and non widgets
                 continue
-            if BaseLoaderAdapter._get_class(sub_node) == tk.Menu:
+            if self._get_class(sub_node) == tk.Menu:
                 continue
             self._load_widgets(sub_node, builder, widget)
-        return widget
+
+    def _is_lazy(self, node, widget, parent):
+        if node.parent is None or not len(node):
+            return False
+        if isinstance(widget, tk.Toplevel):
+            # toplevels withdrawn or iconified by the design are not displayed
+            return widget.wm_state() in ("withdrawn", "iconic")
+        if parent.__class__ == ttk.Notebook:
+            # the first tab is displayed by default
+            return len(parent.tabs()) > 1
+        if parent.__class__ == tk.PanedWindow:
+            # only panes that are hidden or collapsed to nothing,
+            # panes of ttk paned windows are always displayed
+            if widget.tk.getboolean(parent.panecget(widget, "hide")):
+                return True
+            size = "width" if str(parent["orient"]) == tk.HORIZONTAL else "height"
+            return str(parent.panecget(widget, size)) == "0"
+        return False
+
+    def _defer(self, node, widget):
+        self._lazy_groups[widget] = node
+        stack = list(node)
+        while stack:
+            sub_node = stack.pop()
+            if sub_node.is_var() or sub_node.type in _ignore_tags:
+                continue
+            if sub_node.attrib.get("name"):
+                self._lazy_index[sub_node.attrib["name"]] = widget
+            stack.extend(sub_node)
+
+        def on_map(_):
+            self._materialise(widget)
+
+        # unbinding with a funcid would clear other <Map> bindings so
+        # the handler is left in place and does nothing after the first call
+        widget.bind("<Map>", on_map, add=True)
+
+    def _materialise(self, widget):
+        node = self._lazy_groups.pop(widget, None)
+        if node is None:
+            # already loaded
+            return
+        for name in [n for n, w in self._lazy_index.items() if w == widget]:
+            self._lazy_index.pop(name)
+        # widgets may be materialised while a load is in progress
+        deferring = self._geometry_queue is not None
+        indexing = self._new_callbacks is not None
+        if not indexing:
+            self._new_callbacks = defaultdict(list)
+        new_callbacks = self._new_callbacks
+        try:
+            if not deferring:
+                self._geometry_queue = []
+            self._load_children(node, self, widget)
+            if not deferring:
+                self._apply_geometry()
+            self._apply_scroll_map()
+        finally:
+            if not deferring:
+                self._geometry_queue = None
+            if not indexing:
+                self._new_callbacks = None
+            if not self._lazy_groups:
+                self._decoded.clear()
+            self._resolved.clear()
+            self._release_compiled()
+        Meth.call_deferred(self)
+        if not indexing and self._callback_lookup is not None:
+            self._connect(self._callback_lookup, new_callbacks, self._lazy_callbacks)
+
+    def _load_deferred(self):
+        """
+        Load all widgets whose creation was deferred in lazy mode
+        """
+        while self._lazy_groups:
+            self._materialise(next(iter(self._lazy_groups)))
+
+    def __getattr__(self, item):
+        # only called when item is not found normally
+        lazy_index = self.__dict__.get("_lazy_index")
+        if lazy_index and item in lazy_index:
+            self._materialise(lazy_index[item])
+            return getattr(self, item)
+        raise AttributeError("{} object has no attribute '{}'".format(self.__class__.__name__, item))
 
     @property
     def path(self):
@@ -355,7 +665,7 @@ class Builder:
         """
         return self._path
 
-    def connect_callbacks(self, object_or_dict):
+    def connect_callbacks(self, object_or_dict, lazy=False):
         """
         Connect bindings and callbacks to user defined functions and
         methods. It connects commands added through the various command
@@ -414,34 +724,60 @@ class Builder:
         :param object_or_dict: A dictionary containing function mappings
             or an object defining all the callback methods. The callback
             names have to exactly match what was entered in the studio.
+        :param lazy: set to ``True`` to look up each callback only when
+            it is first invoked instead of when connecting. Defaults to ``False``
         """
         if isinstance(object_or_dict, dict):
-            callback_map = object_or_dict
+            lookup = object_or_dict.get
         else:
-            callback_map = {
-                attr: getattr(object_or_dict, attr, None)
-                for attr in dir(object_or_dict)
-            }
-        for widget, events in self._event_map.items():
-            for event in events:
-                handler = callback_map.get(event.get("handler"))
-                if handler is not None:
-                    widget.bind(
-                        event.get("sequence"),
-                        handler,
-                        event.get("add")
-                    )
-                else:
-                    logger.warning("Callback '%s' not found", event.get("handler"))
-
-        for prop, val, handle_method in self._command_map:
-            handler = callback_map.get(val)
-            if handle_method is None:
-                raise ValueError("Handle method is None, unable to apply binding")
-            if handler is not None:
-                handle_method(**{prop: handler})
+            def lookup(name):
+                return getattr(object_or_dict, name, None)
+        # keep the lookup for widgets loaded lazily later on
+        self._callback_lookup = lookup
+        self._lazy_callbacks = lazy
+        self._connect(lookup, self._callback_index, lazy)
+
+    def _index_callback(self, name, site):
+        # site is either ("bind", widget, sequence, add) or ("config", prop, handle_method)
+        if not isinstance(name, str) or not name:
+            logger.warning("Ignoring %s of %r without a callback name", site[0], site[1])
+            return
+        self._callback_index[name].append(site)
+        if self._new_callbacks is not None:
+            self._new_callbacks[name].append(site)
+
+    @staticmethod
+    def _lazy_handler(lookup, name):
+        resolved = []
+
+        def handler(*args):
+            if not resolved:
+                resolved.append(lookup(name))
+                if resolved[0] is None:
+                    logger.warning("Callback '%s' not found", name)
+            if resolved[0] is not None:
+                return resolved[0](*args)
+
+        return handler
+
+    def _connect(self, lookup, callback_index, lazy=False):
+        # each callback is looked up only once however many places it is used
+        for name, sites in callback_index.items():
+            if lazy:
+                handler = self._lazy_handler(lookup, name)
             else:
-                logger.warning("Callback '%s' not found", val)
+                handler = lookup(name)
+                if handler is None:
+                    logger.warning("Callback '%s' not found", name)
+                    continue
+            for site in sites:
+                if site[0] == "bind":
+                    site[1].bind(site[2], handler, site[3])
+                    continue
+                handle_method = site[2]
+                if handle_method is None:
+                    raise ValueError("Handle method is None, unable to apply binding")
+                handle_method(**{site[1]: handler})
 
     def load_path(self, path):
         """
@@ -450,9 +786,30 @@ class Builder:
         :param path: Path to design file to be loaded
         :return: root widget
         """
-        tree = infer_format(path)(path=path)
-        tree.load()
-        self._root = self._load_node(tree.root)
+        start = time.perf_counter()
+        if self._use_cache:
+            root_node, self._compiled, cached = cache.load(path, resolve_design)
+            self._compiled_root = root_node
+            if self._subtree is not None:
+                root_node = BaseFormat.extract(root_node, self._subtree)
+        elif self._subtree is not None:
+            root_node, cached = infer_format(path)(path=path).load_subtree(self._subtree), False
+        else:
+            root_node, cached = infer_format(path)(path=path).load(), False
+        parsed = time.perf_counter()
+        self._root = self._load_node(root_node)
+        self._load_stats.update(
+            cached=cached,
+            parse_time=parsed - start,
+            build_time=time.perf_counter() - parsed,
+        )
+        logger.debug(
+            "Loaded %s in %.2fms (parse %.2fms%s)",
+            path,
+            (time.perf_counter() - start) * 1000,
+            self._load_stats["parse_time"] * 1000,
+            ", cached" if cached else "",
+        )
         return self._root
 
     def load_string(self, content_string, format_):
@@ -518,7 +875,7 @@ class AppBuilder(Builder):
     def _load_node(self, root_node):
         if self._app is None:
             # no external parent app provided
-            obj_class = BaseLoaderAdapter._get_class(root_node)
+            obj_class = self._get_class(root_node)
             if obj_class not in (tk.Toplevel, tk.Tk):
                 # widget is not toplevel so we spin up a toplevel parent for it
                 self._parent = self._app = tk.Tk(*self._toplevel_args)
@@ -526,10 +883,14 @@ class AppBuilder(Builder):
             # use external app as parent
             self._parent = self._app
 
-        layout = root_node.attrib.get("layout", {})
-        root = super()._load_node(root_node)
+        return super()._load_node(root_node)
+
+    def _place_root(self, root, root_node):
+        # done before the idle tasks run so the window is
+        # never mapped before it has its final size
         if not isinstance(root, (tk.Tk, tk.Toplevel)):
             # Adjust toplevel window size to that of the root widget
+            layout = root_node.attrib.get("layout", {})
             self._app.geometry(
                 "{}x{}".format(layout.get("width", 200), layout.get("height", 200))
             )
@@ -537,7 +898,6 @@ class AppBuilder(Builder):
         elif not self._app:
             # this means root is a toplevel so set it as the app and parent
             self._app = root
-        return root
 
     def mainloop(self, n: int = 0):
         """
@@ -1,7 +1,10 @@
+import logging
 from collections import defaultdict
 
 from formation.formats._base import Node
-from formation.handlers import parse_arg
+from formation.handlers import parse_arg, get_arg_converter, _handlers
+
+logger = logging.getLogger(__name__)
 
 
 def type_to_str(typ):
@@ -12,8 +15,22 @@ def type_to_str(typ):
     return str(typ)
 
 
+def _arg_resolver(value, type_):
+    # resolves the argument given the parser of the caller
+    if type_ is None:
+        return lambda parser: value
+    if type_ in _handlers:
+        # handlers such as those for images depend on the caller
+        return lambda parser: parser(value, type_)
+    convert = get_arg_converter(type_)
+    if convert is None:
+        return lambda parser: value
+    return lambda parser: convert(value)
+
+
 class Meth:
-    __slots__ = ("args", "kwargs", "name", "defer")
+    __slots__ = ("args", "kwargs", "name", "defer", "_resolvers", "_kw_resolvers")
+    # deferred calls for contexts that do not keep their own queue
     _deferred = defaultdict(list)
 
     def __init__(self, _name_, _deferred_=False, *args, **kwargs):
@@ -25,6 +42,10 @@ class Meth:
         for k, v in self.kwargs.items():
             self.kwargs[k] = self.init_arg(v)
 
+        # argument types are resolved once instead of on every call
+        self._resolvers = tuple(_arg_resolver(*arg) for arg in self.args)
+        self._kw_resolvers = {k: _arg_resolver(*v) for k, v in self.kwargs.items()}
+
     def init_arg(self, arg):
         if isinstance(arg, (tuple, list, set)):
             if len(arg) >= 2:
@@ -61,14 +82,22 @@ class Meth:
     def _call(self, func, with_name=False, parser=None):
         if parser is None:
             parser = parse_arg
+        args = [resolve(parser) for resolve in self._resolvers]
+        kwargs = {k: resolve(parser) for k, resolve in self._kw_resolvers.items()}
         if with_name:
-            func(self.name, *map(lambda v: parser(*v), self.args), **{k: parser(*v) for k, v in self.kwargs.items()})
+            func(self.name, *args, **kwargs)
         else:
-            func(*map(lambda v: parser(*v), self.args), **{k: parser(*v) for k, v in self.kwargs.items()})
+            func(*args, **kwargs)
+
+    @staticmethod
+    def _queue(context):
+        # contexts such as builders keep their own queue which is released with them
+        queue = getattr(context, "_deferred_meths", None)
+        return Meth._deferred[context] if queue is None else queue
 
     def call(self, func, with_name=False, parser=None, context=None):
         if self.defer:
-            Meth._deferred[context].append(lambda: self._call(func, with_name, parser))
+            self._queue(context).append(lambda: self._call(func, with_name, parser))
         else:
             self._call(func, with_name, parser)
 
@@ -91,5 +120,26 @@ class Meth:
 
     @classmethod
     def call_deferred(cls, context=None):
-        for meth in cls._deferred.pop(context, []):
-            meth()
+        """
+        Run all the calls deferred for a context in the order they were made.
+        A failing call does not prevent the rest from running, the first
+        error is raised once all calls are done
+
+        :param context: context passed when calling the methods
+        """
+        queue = getattr(context, "_deferred_meths", None)
+        if queue is None:
+            queue = cls._deferred.pop(context, [])
+        calls = list(queue)
+        queue.clear()
+        error = None
+        for meth in calls:
+            try:
+                meth()
+            except Exception as e:
+                if error is not None:
+                    logger.error("Deferred method call failed: %s", e)
+                    continue
+                error = e
+        if error is not None:
+            raise error
@@ -0,0 +1,239 @@
+"""
+Pools of built dialogs which are reset and shown again instead of being rebuilt
+"""
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import os
+import tkinter as tk
+import tkinter.ttk as ttk
+from collections import defaultdict
+
+from formation.handlers.command import command_props
+from formation.template import Template, TemplateBuilder
+
+
+def _get_text(widget):
+    if isinstance(widget, (tk.Entry, ttk.Entry, tk.Spinbox)):
+        return widget.get()
+    if isinstance(widget, tk.Text):
+        return widget.get("1.0", "end-1c")
+    return None
+
+
+def _set_text(widget, text):
+    if isinstance(widget, tk.Text):
+        widget.delete("1.0", tk.END)
+        widget.insert("1.0", text)
+    else:
+        widget.delete(0, tk.END)
+        widget.insert(0, text)
+
+
+def _clear_selection(widget):
+    if isinstance(widget, tk.Listbox):
+        widget.selection_clear(0, tk.END)
+    elif isinstance(widget, ttk.Treeview):
+        widget.selection_set(())
+
+
+def _options(widget):
+    # aliases such as bg are reported as 2-tuples and are skipped
+    return {
+        key: value[-1] for key, value in widget.configure().items()
+        if len(value) > 2 and key not in command_props
+    }
+
+
+class PooledBuilder(TemplateBuilder):
+    """
+    A :py:class:`~formation.template.TemplateBuilder` managed by a
+    :py:class:`BuilderPool`. The toplevel window holding the design is
+    accessible as ``_window``
+    """
+
+    def __init__(self, parent, template):
+        self._window = None
+        # widgets and variables as they were once built
+        self._snapshot = None
+        super().__init__(parent, template)
+
+    def _take_snapshot(self):
+        widgets = []
+        stack = [self._window]
+        while stack:
+            widget = stack.pop()
+            stack.extend(widget.winfo_children())
+            widgets.append((widget, _options(widget), _get_text(widget)))
+        variables = [
+            (var, var.get()) for var in self.__dict__.values()
+            if isinstance(var, tk.Variable)
+        ]
+        self._snapshot = widgets, variables
+
+    def _reset(self):
+        widgets, variables = self._snapshot
+        for widget, options, text in widgets:
+            if not widget.winfo_exists():
+                continue
+            # commands are left out so connected callbacks are kept
+            changed = {
+                key: options[key] for key, value in _options(widget).items()
+                if key in options and str(value) != str(options[key])
+            }
+            if changed:
+                widget.configure(**changed)
+            if text is not None and _get_text(widget) != text:
+                _set_text(widget, text)
+            _clear_selection(widget)
+        # variables are reset last since setting the text alters them
+        for var, value in variables:
+            var.set(value)
+
+
+class BuilderPool:
+    """
+    Keep the builders of dialogs that have been closed so they can be shown
+    again without rebuilding their widgets. Released builders are reset to
+    the state they had when they were built, that is variables, widget
+    options, text contents and selections, when they are acquired again.
+
+    Tk widgets cannot be moved to another toplevel window hence each pooled
+    builder keeps its own toplevel which is hidden when the builder is
+    released. Designs whose root is not a toplevel are placed in a toplevel
+    created by the pool.
+
+    :param parent: master of the toplevel windows
+    :param size: maximum number of released builders kept for each design
+        path. Use :py:meth:`set_size` to change it for a single path
+
+    .. code-block:: python
+
+        from formation.pool import BuilderPool
+
+        pool = BuilderPool(root, size=2)
+
+        def open_settings():
+            dialog = pool.acquire("settings.xml")
+            dialog.connect_callbacks(SettingsController(dialog, pool))
+            dialog._window.grab_set()
+
+        # in the controller, once the dialog is closed
+        pool.release(dialog)
+
+    .. note::
+        Callbacks stay connected while a builder is pooled. Connecting
+        callbacks again replaces commands and bindings except those whose
+        bindings are added to existing ones
+    """
+
+    def __init__(self, parent=None, size=1):
+        self.parent = parent
+        self.size = size
+        self._sizes = {}
+        self._templates = {}
+        # released builders by design path
+        self._idle = defaultdict(list)
+
+    def set_size(self, path, size):
+        """
+        Set the maximum number of released builders kept for a design path
+
+        :param path: path to the design file
+        :param size: maximum number of builders, extra builders are destroyed
+        """
+        path = os.path.abspath(path)
+        self._sizes[path] = size
+        idle = self._idle[path]
+        while len(idle) > size:
+            self._destroy(idle.pop())
+
+    def get_size(self, path):
+        """
+        Get the maximum number of released builders kept for a design path
+
+        :param path: path to the design file
+        :return: maximum number of builders
+        """
+        return self._sizes.get(os.path.abspath(path), self.size)
+
+    def acquire(self, path):
+        """
+        Get a builder for a design, reusing a released one if available
+
+        :param path: path to the design file
+        :return: a :py:class:`PooledBuilder` whose window is shown
+        """
+        path = os.path.abspath(path)
+        idle = self._idle[path]
+        while idle:
+            builder = idle.pop()
+            if not builder._window.winfo_exists():
+                continue
+            builder._reset()
+            builder._window.deiconify()
+            return builder
+        return self._build(path)
+
+    def release(self, builder):
+        """
+        Hide the window of a builder and keep it for reuse. The builder is
+        destroyed if the pool for its design is already full
+
+        :param builder: builder obtained from :py:meth:`acquire`
+        """
+        window = builder._window
+        if not window.winfo_exists():
+            return
+        window.grab_release()
+        window.withdraw()
+        idle = self._idle[builder.path]
+        if builder in idle:
+            return
+        if len(idle) < self.get_size(builder.path):
+            idle.append(builder)
+        else:
+            self._destroy(builder)
+
+    def clear(self, path=None):
+        """
+        Destroy released builders
+
+        :param path: path to the design file whose builders are to be
+            destroyed. If not provided all released builders are destroyed
+        """
+        paths = list(self._idle) if path is None else [os.path.abspath(path)]
+        for path in paths:
+            for builder in self._idle.pop(path, []):
+                self._destroy(builder)
+
+    def _template(self, path):
+        template = self._templates.get(path)
+        if template is None:
+            template = self._templates[path] = Template(path=path)
+        return template
+
+    def _build(self, path):
+        template = self._template(path)
+        obj_class = template._classes[id(template.node)]
+        if issubclass(obj_class, tk.Tk):
+            raise ValueError("Designs with a Tk root cannot be pooled")
+        if issubclass(obj_class, tk.Toplevel):
+            builder = PooledBuilder(self.parent, template)
+            builder._window = builder._root
+        else:
+            window = tk.Toplevel(self.parent)
+            builder = PooledBuilder(window, template)
+            builder._window = window
+            layout = template.node.attrib.get("layout", {})
+            window.geometry("{}x{}".format(layout.get("width", 200), layout.get("height", 200)))
+            builder._root.pack(fill="both", expand=True)
+        builder._take_snapshot()
+        builder._window.protocol("WM_DELETE_WINDOW", lambda: self.release(builder))
+        return builder
+
+    @staticmethod
+    def _destroy(builder):
+        if builder._window.winfo_exists():
+            builder._window.destroy()
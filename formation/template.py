@@ -0,0 +1,145 @@
+"""
+Reusable design templates which can be instantiated many times
+"""
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import os
+
+from formation.formats import infer_format
+from formation.handlers import get_handlers
+from formation.handlers.image import collect_images, decode_images
+from formation.loader import Builder, BaseLoaderAdapter, MenuLoaderAdapter, _containers, _ignore_tags
+
+
+class TemplateBuilder(Builder):
+    """
+    A :py:class:`~formation.loader.Builder` loaded from a :py:class:`Template`.
+    It reuses the analysis done by the template instead of repeating it
+    on every load.
+    """
+
+    def __init__(self, parent, template, name_prefix=None):
+        self._template = template
+        self._name_prefix = name_prefix
+        super().__init__(parent, node=template.node, path=template.path)
+
+    def _get_class(self, node):
+        obj_class = self._template._classes.get(id(node))
+        if obj_class is None:
+            obj_class = super()._get_class(node)
+        return obj_class
+
+    def _get_handlers(self, node):
+        return self._template._handlers.get(id(node))
+
+    def _widget_name(self, node):
+        name = node.attrib.get("name")
+        if self._name_prefix is None or not name:
+            return None
+        return "{}{}".format(self._name_prefix, name)
+
+    def _open_image(self, path):
+        future = self._template._images.get(str(path))
+        if future is None:
+            return super()._open_image(path)
+        return future.result()
+
+    def _decode_images(self, node):
+        # images are decoded by the template
+        pass
+
+
+class Template:
+    """
+    Analyse a design once and instantiate it as many times as required.
+    Classes, handlers and images required by the design are resolved only
+    once when the template is created. Each instance is loaded into its own
+    :py:class:`TemplateBuilder` hence names, variables and callbacks are
+    isolated between instances.
+
+    :param kwargs: Options used in loading
+        * **path**: Path to file of supported format from which to load the design
+        * **string**: String of supported format to be used in loading the design
+        * **node**: an instance of :py:class:`~formation.formats.Node` from which to load the design directly
+        * **format**: an instance of :py:class:`~formation.formats.BaseFormat` to be used in loading the string
+        contents provided by the **string** option
+
+    .. code-block:: python
+
+        from formation import Template
+
+        row = Template(path="row.xml")
+        for i, item in enumerate(items):
+            instance = row.instantiate(container, name_prefix="row{}_".format(i))
+            instance.title["text"] = item.title
+            instance.connect_callbacks(item)
+
+    .. note::
+        The template node should not be modified after the template is
+        created since the analysis will then be out of date
+    """
+
+    def __init__(self, **kwargs):
+        path = kwargs.get("path")
+        self.path = path if path is None else os.path.abspath(path)
+        if kwargs.get("node"):
+            self.node = kwargs.get("node")
+        elif kwargs.get("string"):
+            format_ = kwargs.get("format")
+            if format_ is None:
+                raise ValueError("format not provided, cannot infer format from string")
+            self.node = format_(kwargs.get("string")).load()
+        elif self.path:
+            self.node = infer_format(self.path)(path=self.path).load()
+        else:
+            raise ValueError("You must provide a path, string or node")
+
+        self._classes = {}
+        self._handlers = {}
+        self._analyse()
+        # futures of decoded images shared by all instances
+        self._images = decode_images(collect_images(self.node, self.path))
+
+    def _analyse(self):
+        stack = [self.node]
+        while stack:
+            node = stack.pop()
+            if node.type in _ignore_tags:
+                continue
+            obj_class = BaseLoaderAdapter._get_class(node)
+            self._classes[id(node)] = obj_class
+            if node.is_var():
+                continue
+            BaseLoaderAdapter._load_required_fields(node)
+            self._handlers[id(node)] = get_handlers(node.attrib)
+            if obj_class in _containers:
+                stack.extend(node)
+            elif node is self.node:
+                # variables may still be defined under a non-container root
+                stack.extend(filter(lambda n: n.is_var(), node))
+            if Builder._adapter_map.get(obj_class) == MenuLoaderAdapter:
+                self._analyse_menu(node)
+
+    def _analyse_menu(self, node):
+        stack = [n for n in node if not n.is_var()]
+        while stack:
+            sub_node = stack.pop()
+            if sub_node.type not in _ignore_tags:
+                self._classes[id(sub_node)] = BaseLoaderAdapter._get_class(sub_node)
+                stack.extend(sub_node)
+
+    def instantiate(self, parent, name_prefix=None):
+        """
+        Create a new instance of the template
+
+        :param parent: The parent widget where the instance is to be loaded
+        :param name_prefix: optional prefix used to generate the tk names of
+            named widgets for instance ``row1_`` which will result in widget
+            paths such as ``.list.row1_title``. Tk names cannot begin with
+            an uppercase letter. If not provided tk generates the names
+        :return: a :py:class:`TemplateBuilder` with all the instance widgets
+            accessible as attributes
+        """
+        return TemplateBuilder(parent, self, name_prefix)
@@ -0,0 +1,117 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+from formation.formats import BinaryFormat, IndexedFormat, JSONFormat, XMLFormat, Node, convert, infer_format
+from formation.tests.support import get_resource
+
+
+class BinaryFormatTestCase(unittest.TestCase):
+
+    def test_round_trip(self):
+        for path in glob.glob(os.path.join(os.path.dirname(get_resource("meta.xml")), "*.xml")):
+            with self.subTest(path=path):
+                node = XMLFormat(path=path).load()
+                data = BinaryFormat(node=node).generate()
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(BinaryFormat(data=data).load(), node)
+
+    def test_values_stringified(self):
+        node = Node(None, "tkinter.Frame", {"name": "frame", "layout": {"width": 40, "x": 1.5}})
+        Node(node, "tkinter.Button", {"attr": {"text": "ünïcode"}, "layout": {}})
+        loaded = BinaryFormat(data=BinaryFormat(node=node).generate()).load()
+        self.assertEqual(loaded["layout"], {"width": "40", "x": "1.5"})
+        self.assertEqual(loaded.children[0]["attr"]["text"], "ünïcode")
+        self.assertIs(loaded.children[0].parent, loaded)
+
+    def test_wide_items(self):
+        node = Node(None, "tkinter.Frame")
+        for i in range(300):
+            Node(node, "tkinter.Label", {"name": "label_{}".format(i)})
+        data = BinaryFormat(node=node).generate()
+        # more than 256 strings require 2 byte items
+        self.assertEqual(data[4], 2)
+        self.assertEqual(BinaryFormat(data=data).load(), node)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, lambda: BinaryFormat(data=b"<xml/>").load())
+
+    def test_infer(self):
+        self.assertIs(infer_format("design.fmb"), BinaryFormat)
+
+
+class IndexedFormatTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.node = XMLFormat(path=get_resource("variables.xml")).load()
+        self.path = os.path.join(self.directory, "variables.fmi")
+        with open(self.path, "wb") as file:
+            file.write(IndexedFormat(node=self.node).generate())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        self.assertEqual(IndexedFormat(path=self.path).load(), self.node)
+        data = IndexedFormat(node=self.node).generate()
+        self.assertEqual(IndexedFormat(data=data).load(), self.node)
+
+    def test_names(self):
+        names = IndexedFormat(path=self.path).names()
+        self.assertEqual(names, sorted(names))
+        self.assertIn("Frame_1", names)
+        self.assertIn("str_1", names)
+
+    def test_subtree(self):
+        for name in IndexedFormat(path=self.path).names():
+            with self.subTest(name=name):
+                subtree = IndexedFormat(path=self.path).load_subtree(name)
+                self.assertEqual(subtree, XMLFormat(path=get_resource("variables.xml")).load_subtree(name))
+                self.assertIsNone(subtree.parent)
+
+    def test_subtree_globals(self):
+        subtree = IndexedFormat(path=self.path).load_subtree("str_1")
+        self.assertEqual(subtree["name"], "str_1")
+        self.assertEqual(len(subtree.children), 4)
+        self.assertTrue(all(child.is_var() for child in subtree))
+        self.assertEqual(IndexedFormat(path=self.path).load_subtree("Frame_1"), self.node)
+
+    def test_duplicate_names(self):
+        root = Node(None, "tkinter.Frame", {"name": "root"})
+        Node(root, "tkinter.Label", {"name": "label", "attr": {"text": "first"}})
+        Node(root, "tkinter.Label", {"name": "label", "attr": {"text": "second"}})
+        data = IndexedFormat(node=root).generate()
+        self.assertEqual(IndexedFormat(data=data).load_subtree("label")["attr"]["text"], "first")
+
+    def test_missing(self):
+        self.assertRaises(KeyError, IndexedFormat(path=self.path).load_subtree, "missing")
+        self.assertRaises(KeyError, XMLFormat(path=get_resource("variables.xml")).load_subtree, "missing")
+
+
+class ConversionTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_convert(self):
+        source = get_resource("all_native.xml")
+        expected = XMLFormat(path=source).load()
+        binary = os.path.join(self.directory, "design.fmb")
+        json = os.path.join(self.directory, "design.json")
+        xml = os.path.join(self.directory, "design.xml")
+        convert(source, binary)
+        convert(binary, json)
+        convert(json, xml)
+        self.assertEqual(BinaryFormat(path=binary).load(), expected)
+        self.assertEqual(JSONFormat(path=json).load(), expected)
+        self.assertEqual(XMLFormat(path=xml).load(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
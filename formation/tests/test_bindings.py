@@ -1,6 +1,7 @@
 import unittest
 
 from formation import AppBuilder
+from formation.formats import XMLFormat
 from formation.tests.support import get_resource
 
 
@@ -71,3 +72,56 @@ class MenuCommandBindingTestCase(Binding):
         menu = self.builder.m2_m
         menu.nametowidget(menu["menu"]).invoke(0)
         self.assertTrue(self.clicked)
+
+
+class CallbackIndexTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.builder = AppBuilder(path=get_resource("bindings.xml"))
+        self.clicked = False
+
+    def tearDown(self) -> None:
+        self.builder._app.destroy()
+
+    def on_clk(self, *_):
+        self.clicked = True
+
+    def test_single_lookup(self):
+        lookups = []
+
+        class Callbacks(dict):
+            def get(self, key, default=None):
+                lookups.append(key)
+                return super().get(key, default)
+
+        self.builder.connect_callbacks(Callbacks(on_clk=self.on_clk))
+        # every bind site uses the same callback which is looked up once
+        self.assertEqual(lookups, ["on_clk"])
+        self.builder.b1.invoke()
+        self.assertTrue(self.clicked)
+
+    def test_lazy(self):
+        lookups = []
+
+        class Callbacks(dict):
+            def get(self, key, default=None):
+                lookups.append(key)
+                return super().get(key, default)
+
+        self.builder.connect_callbacks(Callbacks(on_clk=self.on_clk), lazy=True)
+        self.assertEqual(lookups, [])
+        self.builder.b1.invoke()
+        self.assertTrue(self.clicked)
+        self.builder.b2.invoke()
+        self.assertEqual(lookups, ["on_clk"])
+
+    def test_missing_handler_name(self):
+        builder = AppBuilder(string="""
+            <tkinter.Frame xmlns:layout="http://www.hoversetformationstudio.com/layouts/" name="f"
+                           layout:width="200" layout:height="200">
+              <event sequence="&lt;Button-1&gt;" add="False"/>
+            </tkinter.Frame>
+        """, format=XMLFormat)
+        self.addCleanup(builder._app.destroy)
+        self.assertNotIn(None, builder._callback_index)
+        builder.connect_callbacks(self)
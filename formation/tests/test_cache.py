@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import tkinter as tk
+
+from formation import cache
+from formation.formats import XMLFormat
+from formation.handlers.layout import set_place
+from formation.loader import resolve_design
+from formation.tests.support import get_resource
+
+
+def _entries(root, resolved):
+    # resolved entries in document order
+    return [resolved.get(id(node)) for event, node in root.iter_events() if event == "start"]
+
+
+class CompiledCacheTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self._cache_dir = tempfile.mkdtemp()
+        self._old_dir = cache._cache_dir
+        cache.set_cache_dir(self._cache_dir)
+        self.design = os.path.join(self._cache_dir, "design.xml")
+        shutil.copy(get_resource("all_legacy.xml"), self.design)
+
+    def tearDown(self) -> None:
+        cache.set_cache_dir(self._old_dir)
+        shutil.rmtree(self._cache_dir)
+
+    def test_compile_replay(self):
+        node = XMLFormat(path=get_resource("all_native.xml")).load()
+        resolved = resolve_design(node)
+        replayed, replayed_resolved = cache.replay(cache.compile_node(node, resolved))
+        self.assertEqual(node, replayed)
+        self.assertEqual(node.children[0].source_line, replayed.children[0].source_line)
+        self.assertEqual(_entries(node, resolved), _entries(replayed, replayed_resolved))
+
+    def test_cold_warm_load(self):
+        cold, cold_resolved, cached = cache.load(self.design, resolve_design)
+        self.assertFalse(cached)
+        warm, warm_resolved, cached = cache.load(self.design, resolve_design)
+        self.assertTrue(cached)
+        self.assertEqual(cold, warm)
+        self.assertEqual(_entries(cold, cold_resolved), _entries(warm, warm_resolved))
+        # classes, handlers and layouts are resolved
+        obj_class, namespaces, layout = warm_resolved[id(warm)]
+        self.assertIs(obj_class, tk.Frame)
+        self.assertIn("layout", namespaces)
+        self.assertIsNone(layout)
+        self.assertEqual(warm_resolved[id(warm.children[0])][2], set_place)
+
+    def test_unimportable_class(self):
+        class Local:
+            pass
+
+        cache.load(self.design, lambda root: {id(root): (Local, (), None)})
+        # the entry could not be written
+        _, _, cached = cache.load(self.design)
+        self.assertFalse(cached)
+
+    def test_stale_entry(self):
+        cache.load(self.design)
+        stat = os.stat(self.design)
+        os.utime(self.design, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        _, _, cached = cache.load(self.design)
+        self.assertFalse(cached)
+
+    def test_invalidate(self):
+        cache.load(self.design)
+        cache.invalidate(self.design)
+        _, _, cached = cache.load(self.design)
+        self.assertFalse(cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import gc
+import os
+import tempfile
+import unittest
+import tkinter as tk
+
+from PIL import Image
+
+from formation.formats import XMLFormat
+from formation.handlers.image import (
+    collect_images, decode_images, ImageCache, FrameStrip, get_frame_strip, load_image_to_widget
+)
+from formation.tests.support import get_resource
+from hoverset.ui.clock import FrameClock
+
+
+class ImageDecodingTestCase(unittest.TestCase):
+
+    def test_collect_images(self):
+        path = get_resource("canvas.xml")
+        paths = collect_images(XMLFormat(path=path).load(), path)
+        self.assertEqual(paths, {os.path.join(os.path.dirname(path), "images", "okestr.png")})
+
+    def test_collect_method_images(self):
+        path = get_resource("tk.xml")
+        paths = collect_images(XMLFormat(path=path).load(), path)
+        self.assertEqual(len(paths), 1)
+
+    def test_decode_images(self):
+        path = get_resource(os.path.join("images", "okestr.png"))
+        futures = decode_images([path])
+        image = futures[path].result()
+        self.assertIsInstance(image, Image.Image)
+        self.assertEqual(decode_images([]), {})
+
+    def test_decode_missing(self):
+        futures = decode_images(["missing.png"])
+        self.assertRaises(FileNotFoundError, futures["missing.png"].result)
+
+
+class ImageCacheTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.root = tk.Tk()
+        cls.path = get_resource(os.path.join("images", "okestr.png"))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.root.destroy()
+
+    def test_shared(self):
+        cache = ImageCache()
+        image1 = cache.get(self.path, self.root)
+        image2 = cache.get(self.path, self.root)
+        self.assertIs(image1, image2)
+        self.assertIsNot(image1, cache.get(self.path, self.root, size=(10, 10)))
+        self.assertLessEqual(cache.get(self.path, self.root, size=(10, 10)).width(), 10)
+
+    def test_referenced_not_evicted(self):
+        class Owner:
+            pass
+
+        cache = ImageCache(limit=0)
+        owner = Owner()
+        image = cache.get(self.path, self.root, owner=owner)
+        self.assertIs(cache.get(self.path, self.root), image)
+        del owner
+        gc.collect()
+        self.assertEqual(cache.cached_paths(), set())
+        self.assertEqual(cache.memory, 0)
+
+    def test_lru_eviction(self):
+        cache = ImageCache()
+        cache.get(self.path, self.root, size=(10, 10))
+        cache.get(self.path, self.root, size=(20, 20))
+        cache.limit = cache.memory - 1
+        cache.get(self.path, self.root, size=(20, 20))
+        keys = list(cache._entries)
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(keys[0][2], (20, 20))
+
+    def test_dropped_with_root(self):
+        cache = ImageCache()
+        root = tk.Tk()
+        cache.get(self.path, root)
+        cache.get(self.path, self.root)
+        root.destroy()
+        self.assertEqual(len(cache._entries), 1)
+        self.assertNotIn(id(root.tk), [key[3] for key in cache._entries])
+
+
+class FrameStripTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.root = tk.Tk()
+        cls.path = os.path.join(tempfile.mkdtemp(), "anim.gif")
+        frames = [Image.new("RGB", (10, 10), color) for color in ("red", "green", "blue", "white")]
+        frames[0].save(cls.path, save_all=True, append_images=frames[1:], duration=40, loop=0)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.root.destroy()
+
+    def test_bounded_window(self):
+        strip = FrameStrip(Image.open(self.path), self.root, window=2)
+        self.assertEqual(strip.count, 4)
+        for i in range(4):
+            frame, duration = strip.frame(i)
+            self.assertEqual(duration, 40)
+        self.assertEqual(list(strip._frames), [2, 3])
+
+    def test_shared_strip(self):
+        strip1 = get_frame_strip(Image.open(self.path), self.root, key=self.path)
+        strip2 = get_frame_strip(Image.open(self.path), self.root, key=self.path)
+        self.assertIs(strip1, strip2)
+        self.assertIsNot(strip1, get_frame_strip(Image.open(self.path), self.root))
+
+    def test_single_scheduler(self):
+        class Builder:
+            _image_cache = []
+
+        label1 = tk.Label(self.root)
+        label2 = tk.Label(self.root)
+        load_image_to_widget(label1, Image.open(self.path), "image", Builder, key=self.path)
+        load_image_to_widget(label2, Image.open(self.path), "image", Builder, key=self.path)
+        clock = FrameClock.get(label1)
+        animations = [callback.__self__ for callback in clock._subscribers]
+        self.assertEqual(len(animations), 2)
+        self.assertIs(animations[0].strip, animations[1].strip)
+        # replacing the image stops the animation
+        load_image_to_widget(label1, "", "image", Builder)
+        self.assertEqual(len(clock._subscribers), 1)
+        label2.destroy()
+        self.root.after(100)
+        self.root.update()
+        self.assertEqual(len(clock._subscribers), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
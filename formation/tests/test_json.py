@@ -1,6 +1,9 @@
+import io
+import itertools
+import json
 import unittest
 
-from formation.formats import JSONFormat
+from formation.formats import JSONFormat, Node
 
 
 class EqualityTestCase(unittest.TestCase):
@@ -197,5 +200,52 @@ class AttributeHandlingTestCase(unittest.TestCase):
         self.assertDictEqual(grouped.get("attr"), {"background": "#ffffff", "font": "Arial"})
 
 
+class GenerateTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.node = Node(None, "tkinter.Frame", {"name": "frame", "layout": {"width": 40, "x": 1.5}})
+        Node(self.node, "tkinter.Label", {"name": "label", "attr": {"text": "ünïcode", "wrap": True}})
+
+    def test_no_mutation(self):
+        JSONFormat(node=self.node).generate()
+        self.assertEqual(self.node["layout"]["width"], 40)
+        self.assertIs(self.node.children[0]["attr"]["wrap"], True)
+
+    def test_stringify(self):
+        data = json.loads(JSONFormat(node=self.node).generate())
+        self.assertEqual(data["attrib"]["layout"], {"width": "40", "x": "1.5"})
+        data = json.loads(JSONFormat(node=self.node).generate(stringify_values=False))
+        self.assertEqual(data["attrib"]["layout"], {"width": 40, "x": 1.5})
+        self.assertIs(data["children"][0]["attrib"]["attr"]["wrap"], True)
+
+    def test_compact(self):
+        compact = JSONFormat(node=self.node).generate(compact=True)
+        self.assertNotIn(", ", compact)
+        self.assertEqual(json.loads(compact), json.loads(JSONFormat(node=self.node).generate()))
+        self.assertEqual(JSONFormat(data=compact).load(), self.node)
+
+    def test_deep_tree(self):
+        # deeper than the nesting limits of the optional json libraries
+        root = node = Node(None, "tkinter.Frame", {"name": "frame_0"})
+        for i in range(300):
+            node = Node(node, "tkinter.Frame", {"name": "frame_{}".format(i + 1)})
+        for compact in (False, True):
+            data = JSONFormat(node=root).generate(compact=compact)
+            loaded = JSONFormat(data=data).load()
+            self.assertEqual(JSONFormat(node=loaded).generate(compact=compact), data)
+
+    def test_stream(self):
+        options = itertools.product((False, True), (False, True), (False, True), ({}, {"indent": "\t"}))
+        for pretty_print, compact, sort_keys, indent in options:
+            kw = dict(pretty_print=pretty_print, compact=compact, sort_keys=sort_keys, **indent)
+            with self.subTest(**kw):
+                file = io.StringIO()
+                JSONFormat(node=self.node).stream(file, **kw)
+                # streamed output matches that of the default json library
+                self.assertEqual(json.loads(file.getvalue()), json.loads(JSONFormat(node=self.node).generate(**kw)))
+                if not compact or pretty_print:
+                    self.assertEqual(file.getvalue(), JSONFormat(node=self.node).generate(**kw))
+
+
 if __name__ == '__main__':
     unittest.main()
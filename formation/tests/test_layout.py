@@ -1,6 +1,9 @@
 import unittest
 
 from formation import AppBuilder
+from formation.formats import Node
+from formation.handlers import dispatch_to_handlers
+from formation.handlers.layout import apply_geometry
 from formation.tests.support import get_resource, tk
 
 
@@ -140,6 +143,36 @@ class PackLayoutTestCase(unittest.TestCase):
         btn8native = self.builder.button_n8
         self.assertEqual(btn8native.cget("width"), 9)
 
+    def test_deferred_order(self):
+        # deferred geometry is applied in the order widgets were created
+        names = ["button_7", "button_8", "button_9", "button_n8", "button_plain"]
+        order = [getattr(self.builder, name) for name in names]
+        self.assertEqual(self.builder.pack_frame.pack_slaves(), order)
+
+    def test_geometry_settled(self):
+        # geometry is computed by the time the load is done
+        self.assertGreater(self.builder.pack_frame.winfo_reqwidth(), 1)
+
+
+class ApplyGeometryTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.interp = tk.Tcl()
+
+    def test_failure_reported(self):
+        node = Node(None, "tkinter.Button", {"name": "bad"})
+        node.source_line = 12
+        queue = [
+            (self.interp, ("set", "first", "1"), None),
+            (self.interp, ("unknown_manager", "configure"), node),
+            (self.interp, ("set", "last", "1"), None),
+        ]
+        with self.assertRaises(tk.TclError) as context:
+            apply_geometry(queue)
+        self.assertIn("Line 12: tkinter.Button 'bad'", str(context.exception))
+        # commands after the failing one are still run
+        self.assertEqual(self.interp.getvar("last"), "1")
+
 
 class OldLayoutCompatTestCase(unittest.TestCase):
 
@@ -165,3 +198,40 @@ class OldLayoutCompatTestCase(unittest.TestCase):
         info = self.builder.pack_btn.pack_info()
         self.assertEqual(info["fill"], "x")
         self.assertTrue(info["expand"])
+
+
+class ImmediateLayoutTestCase(unittest.TestCase):
+
+    class Widget:
+
+        def __init__(self, calls):
+            self.calls = calls
+
+        def config(self, **options):
+            self.calls.append(("config", options))
+
+    class Notebook(Widget):
+
+        def tabs(self):
+            return []
+
+        def add(self, widget, **options):
+            self.calls.append(("add", options))
+
+        def tab(self, widget, **options):
+            self.calls.append(("tab", options))
+
+    def test_options_before_layout(self):
+        calls = []
+        widget = self.Widget(calls)
+        parent_node = Node(None, "tkinter.ttk.Notebook", {"attr": {"layout": "TabLayout"}})
+        config = {"attr": {"text": "Tab"}, "layout": {"text": "Tab 1"}}
+        dispatch_to_handlers(
+            widget, config, parent=self.Notebook(calls), parent_node=parent_node
+        )
+        # tab layouts are not deferred, the widget options are applied first
+        self.assertEqual(calls, [
+            ("config", {"text": "Tab"}),
+            ("add", {}),
+            ("tab", {"text": "Tab 1"}),
+        ])
@@ -1,7 +1,11 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 from formation import AppBuilder
-from formation.formats import XMLFormat
+from formation.formats import XMLFormat, Node, convert
+from formation.loader import BaseLoaderAdapter, _class_cache, clear_class_cache
 from formation.tests.support import tk_supported, ttk_supported, tk, ttk, get_resource
 
 
@@ -147,5 +151,148 @@ class MetaLoadingTestCase(unittest.TestCase):
         self.assertEqual(self.builder._meta["version"]["minor"], "1")
 
 
+class ClassCacheTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        clear_class_cache()
+
+    def test_shared_resolution(self):
+        node1 = Node(None, "tkinter.ttk.Button")
+        node2 = Node(None, "tkinter.ttk.Button")
+        self.assertIs(BaseLoaderAdapter._get_class(node1), ttk.Button)
+        self.assertIn("tkinter.ttk.Button", _class_cache)
+        self.assertIs(BaseLoaderAdapter._get_class(node2), ttk.Button)
+
+    def test_clear_module(self):
+        BaseLoaderAdapter._get_class(Node(None, "tkinter.ttk.Button"))
+        BaseLoaderAdapter._get_class(Node(None, "collections.OrderedDict"))
+        clear_class_cache("collections")
+        self.assertIn("tkinter.ttk.Button", _class_cache)
+        self.assertNotIn("collections.OrderedDict", _class_cache)
+        # ttk classes are defined in tkinter.ttk but the type names the alias
+        BaseLoaderAdapter._get_class(Node(None, "ttk.Button"))
+        clear_class_cache("ttk")
+        self.assertNotIn("ttk.Button", _class_cache)
+        self.assertIn("tkinter.ttk.Button", _class_cache)
+        clear_class_cache()
+        self.assertFalse(_class_cache)
+
+    def test_resolved_once_per_load(self):
+        node = XMLFormat(path=get_resource("all_native.xml")).load()
+        builder = AppBuilder(node=node)
+        # every widget and variable node is resolved exactly once
+        resolvable = [n for n in self._walk(node) if "." in n.type]
+        self.assertEqual(builder._load_stats["class_resolutions"], len(resolvable))
+        builder._app.destroy()
+
+    def _walk(self, node):
+        yield node
+        for child in node:
+            yield from self._walk(child)
+
+
+class BatchedOptionsTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.builder = AppBuilder(path=get_resource("common_layout.xml"))
+
+    def tearDown(self) -> None:
+        self.builder._app.destroy()
+
+    def test_call_count(self):
+        node = XMLFormat(path=get_resource("common_layout.xml")).load()
+        widgets = 0
+        stack = [node]
+        while stack:
+            sub_node = stack.pop()
+            stack.extend(sub_node)
+            widgets += "." in sub_node.type and not sub_node.is_var()
+        # at most one option call and one geometry call per widget
+        self.assertLessEqual(self.builder._load_stats["tcl_calls"], widgets * 2)
+
+    def test_options_applied(self):
+        self.assertEqual(self.builder.button_6["text"], "Button_6")
+        self.assertEqual(str(self.builder.button_6["width"]), "4")
+        self.assertEqual(self.builder.button_6.winfo_manager(), "grid")
+        self.assertEqual(str(self.builder.button_8["height"]), "2")
+        self.assertEqual(self.builder.button_8.winfo_manager(), "pack")
+
+
+class LazyLoadingTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.builder = AppBuilder(path=get_resource("lazy.xml"), lazy=True)
+
+    def tearDown(self) -> None:
+        self.builder._app.destroy()
+
+    def test_deferred(self):
+        # first tab is loaded immediately
+        self.assertIn("button_1", self.builder.__dict__)
+        # other tabs are created but not their contents
+        self.assertIn("tab_2", self.builder.__dict__)
+        self.assertNotIn("button_2", self.builder.__dict__)
+        self.assertNotIn("label_2", self.builder.__dict__)
+        # only hidden panes are deferred
+        self.assertIn("pane_label", self.builder.__dict__)
+        self.assertNotIn("hidden_label", self.builder.__dict__)
+
+    def test_attribute_access(self):
+        self.assertIsInstance(self.builder.label_2, ttk.Label)
+        self.assertIsInstance(self.builder.button_2, ttk.Button)
+        self.assertEqual(self.builder.button_2.master, self.builder.tab_2)
+        self.assertNotIn("button_3", self.builder.__dict__)
+        self.assertRaises(AttributeError, lambda: self.builder.missing_widget)
+
+    def test_tab_select(self):
+        self.builder.notebook.select(self.builder.tab_3)
+        self.builder._app.update()
+        self.assertIn("button_3", self.builder.__dict__)
+
+    def test_load_deferred(self):
+        self.builder._load_deferred()
+        for name in ("button_2", "label_2", "button_3", "hidden_label"):
+            self.assertIn(name, self.builder.__dict__)
+        self.assertFalse(self.builder._lazy_index)
+
+    def test_non_lazy(self):
+        builder = AppBuilder(path=get_resource("lazy.xml"))
+        for name in ("button_2", "label_2", "button_3", "hidden_label"):
+            self.assertIn(name, builder.__dict__)
+        builder._app.destroy()
+
+
+class SubtreeLoadingTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.indexed = os.path.join(self.directory, "lazy.fmi")
+        convert(get_resource("lazy.xml"), self.indexed)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_subtree(self):
+        for path in (get_resource("lazy.xml"), self.indexed):
+            with self.subTest(path=path):
+                builder = AppBuilder(path=path, subtree="tab_2")
+                self.assertIsInstance(builder.tab_2, ttk.Frame)
+                self.assertIsInstance(builder.label_2, ttk.Label)
+                self.assertEqual(builder.button_2.master, builder.tab_2)
+                self.assertNotIn("button_1", builder.__dict__)
+                self.assertNotIn("notebook", builder.__dict__)
+                builder._app.destroy()
+
+    def test_subtree_variables(self):
+        builder = AppBuilder(path=get_resource("variables.xml"), subtree="str_1")
+        self.assertIsInstance(builder.string_var, tk.StringVar)
+        self.assertEqual(builder.str_1.get(), "Sample text")
+        self.assertNotIn("str_2", builder.__dict__)
+        builder._app.destroy()
+
+    def test_missing(self):
+        self.assertRaises(KeyError, lambda: AppBuilder(path=self.indexed, subtree="missing"))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -139,3 +139,43 @@ class MethTestCase(unittest.TestCase):
 
         self.assertEqual(expected, actual)
         self.assertEqual(actual.name, expected.name)
+
+    def test_call_deferred_context_queue(self):
+        class Context:
+            def __init__(self):
+                self._deferred_meths = []
+
+        context = Context()
+        calls = []
+        Meth("func", True, "arg1").call(calls.append, context=context)
+        # the call is held by the context and not by the class
+        self.assertEqual(len(context._deferred_meths), 1)
+        self.assertNotIn(context, Meth._deferred)
+        Meth.call_deferred(context)
+        self.assertEqual(calls, ["arg1"])
+        self.assertEqual(context._deferred_meths, [])
+
+    def test_call_deferred_error(self):
+        calls = []
+
+        def fail(_):
+            raise ValueError("failed")
+
+        Meth("func1", True, "arg1").call(fail, context="errorcontext")
+        Meth("func2", True, "arg2").call(calls.append, context="errorcontext")
+        with self.assertRaises(ValueError):
+            Meth.call_deferred("errorcontext")
+        # calls after the failing one are still made
+        self.assertEqual(calls, ["arg2"])
+
+    def test_parser(self):
+        m = Meth("func", False, ("img.png", "image"), "arg2")
+        parsed = []
+
+        def parser(value, type_):
+            parsed.append((value, type_))
+            return value
+
+        m.call(lambda *args: None, parser=parser)
+        # only arguments that depend on the caller are passed to the parser
+        self.assertEqual(parsed, [("img.png", "image")])
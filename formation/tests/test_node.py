@@ -0,0 +1,148 @@
+import copy
+import pickle
+import sys
+import unittest
+
+from formation.formats import BinaryFormat, JSONFormat, XMLFormat, Node
+from formation.tests.support import get_resource
+
+
+class StructuralHashTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.node = XMLFormat(path=get_resource("all_native.xml")).load()
+        self.other = XMLFormat(path=get_resource("all_native.xml")).load()
+
+    def test_equal(self):
+        self.assertEqual(self.node, self.other)
+        self.assertEqual(self.node.structural_hash(), self.other.structural_hash())
+
+    def test_cached(self):
+        self.node.structural_hash()
+        self.assertIsNotNone(self.node.children[0]._hash)
+        self.node.children[0]["attr"]["text"] = "changed"
+        # only the modified node and its ancestors are invalidated
+        self.assertIsNone(self.node.children[0]._hash)
+        self.assertIsNone(self.node._hash)
+        self.assertIsNotNone(self.node.children[1]._hash)
+
+    def test_attribute_changes(self):
+        self.assertEqual(self.node, self.other)
+        child = self.node.children[2]
+        child["layout"]["x"] = "1000"
+        self.assertNotEqual(self.node, self.other)
+        child["layout"]["x"] = self.other.children[2]["layout"]["x"]
+        self.assertEqual(self.node, self.other)
+        child.attrib["layout"].pop("x")
+        self.assertNotEqual(self.node, self.other)
+        child["layout"] = dict(self.other.children[2]["layout"])
+        self.assertEqual(self.node, self.other)
+        child.remove_attrib("y", "layout")
+        self.assertNotEqual(self.node, self.other)
+
+    def test_structure_changes(self):
+        self.assertEqual(self.node, self.other)
+        removed = self.node.children.pop()
+        self.assertNotEqual(self.node, self.other)
+        self.node.append_child(removed)
+        self.assertEqual(self.node, self.other)
+        self.node.children[0].type = "tkinter.Label"
+        self.assertNotEqual(self.node, self.other)
+
+    def test_equality_semantics(self):
+        self.other["layout"]["width"] = int(self.other["layout"]["width"])
+        self.other["extra"] = {}
+        self.assertEqual(self.node, self.other)
+        self.assertNotEqual(self.node, "node")
+
+    def test_copy(self):
+        self.node.structural_hash()
+        for clone in (copy.deepcopy(self.node), pickle.loads(pickle.dumps(self.node))):
+            self.assertEqual(clone, self.node)
+            clone.children[0]["attr"]["text"] = "changed"
+            self.assertNotEqual(clone, self.node)
+
+    def test_deep_tree(self):
+        roots = []
+        for _ in range(2):
+            root = node = Node(None, "tkinter.Frame")
+            for i in range(2000):
+                node = Node(node, "tkinter.Frame", {"name": "frame_{}".format(i)})
+            roots.append((root, node))
+        self.assertEqual(roots[0][0], roots[1][0])
+        roots[1][1]["name"] = "leaf"
+        self.assertNotEqual(roots[0][0], roots[1][0])
+
+    def test_hash_collision(self):
+        node = Node(None, "tkinter.Frame", {"name": "frame_1"})
+        other = Node(None, "tkinter.Frame", {"name": "frame_2"})
+        # force a collision, equal hashes are confirmed structurally
+        other._hash = node.structural_hash()
+        self.assertNotEqual(node, other)
+
+    def test_namespaces_copied(self):
+        layout = {"width": "20"}
+        node = Node(None, "tkinter.Frame", {"layout": layout})
+        hash_ = node.structural_hash()
+        layout["width"] = "40"
+        self.assertEqual(node["layout"]["width"], "20")
+        self.assertEqual(node.structural_hash(), hash_)
+
+
+class CompactNodeTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.node = XMLFormat(path=get_resource("all_native.xml"), shared=True).load()
+        self.other = XMLFormat(path=get_resource("all_native.xml"), shared=True).load()
+
+    def test_shared_namespaces(self):
+        for format_ in (XMLFormat, JSONFormat, BinaryFormat):
+            with self.subTest(format=format_.name):
+                loaded = format_(data=format_(node=self.node).generate(), shared=True).load()
+                self.assertIs(loaded.attrib.get("layout"), self.node.attrib.get("layout"))
+                self.assertIs(loaded.children[0].attrib.get("attr"), self.other.children[0].attrib.get("attr"))
+
+    def test_copy_on_write(self):
+        shared = self.other.attrib.get("layout")
+        self.node["layout"]["width"] = "1"
+        self.assertEqual(self.node["layout"]["width"], "1")
+        self.assertIsNot(self.node.attrib.get("layout"), shared)
+        self.assertNotEqual(self.other["layout"]["width"], "1")
+        self.assertRaises(TypeError, shared.__setitem__, "width", "1")
+
+    def test_not_shared_by_default(self):
+        for format_ in (XMLFormat, JSONFormat, BinaryFormat):
+            with self.subTest(format=format_.name):
+                loaded = format_(data=format_(node=self.node).generate()).load()
+                other = format_(data=format_(node=self.node).generate()).load()
+                self.assertIsNot(loaded.attrib.get("layout"), other.attrib.get("layout"))
+                # namespaces can be modified however they are obtained
+                loaded.attrib.get("layout")["width"] = "1"
+                self.assertEqual(loaded["layout"]["width"], "1")
+                self.assertNotEqual(loaded, other)
+
+    def test_unshared_values(self):
+        node = JSONFormat(data='{"type": "tkinter.Frame", "attrib": {"layout": {"width": 40}}}').load()
+        node["layout"]["width"] = 20
+        self.assertEqual(node["layout"]["width"], 20)
+
+    def test_lazy_children(self):
+        leaf = self.node.children[0]
+        self.assertEqual(len(leaf), 0)
+        self.assertEqual(list(leaf), [])
+        self.assertIsNone(leaf._children)
+        Node(leaf, "tkinter.Label")
+        self.assertEqual(len(leaf.children), 1)
+
+    def test_interned_types(self):
+        node = Node(None, "".join(["tkinter.", "Frame"]))
+        self.assertIs(node.type, sys.intern("tkinter.Frame"))
+
+    def test_pickle(self):
+        clone = pickle.loads(pickle.dumps(self.node))
+        self.assertIs(clone.attrib.get("layout"), self.node.attrib.get("layout"))
+        self.assertEqual(clone, self.node)
+
+
+if __name__ == '__main__':
+    unittest.main()
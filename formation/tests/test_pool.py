@@ -0,0 +1,77 @@
+import unittest
+
+from formation.pool import BuilderPool, PooledBuilder
+from formation.tests.support import get_resource, tk
+
+
+class BuilderPoolTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = tk.Tk()
+        self.pool = BuilderPool(self.root)
+
+    def tearDown(self) -> None:
+        self.root.destroy()
+
+    def test_reuse(self):
+        first = self.pool.acquire(get_resource("variables.xml"))
+        self.assertIsInstance(first, PooledBuilder)
+        self.pool.release(first)
+        second = self.pool.acquire(get_resource("variables.xml"))
+        self.assertIs(first, second)
+        self.assertTrue(second._window.winfo_exists())
+
+    def test_reset(self):
+        builder = self.pool.acquire(get_resource("variables.xml"))
+        builder.string_var.set("changed")
+        builder.int_var.set(5)
+        builder.bool_1.configure(text="changed")
+        self.pool.release(builder)
+        builder = self.pool.acquire(get_resource("variables.xml"))
+        self.assertEqual(builder.string_var.get(), "Sample text")
+        self.assertEqual(builder.int_var.get(), 200)
+        self.assertEqual(builder.bool_1["text"], "1")
+        self.assertEqual(builder.str_1.get(), "Sample text")
+
+    def test_reset_runtime_changes(self):
+        builder = self.pool.acquire(get_resource("pool.xml"))
+        value = builder.spinbox_1.get()
+        builder.spinbox_1.invoke("buttonup")
+        builder.entry_1.insert(0, "typed")
+        builder.button_1.configure(state="disabled")
+        self.pool.release(builder)
+        builder = self.pool.acquire(get_resource("pool.xml"))
+        # the spinbox keeps its initial value instead of being emptied
+        self.assertEqual(builder.spinbox_1.get(), value)
+        self.assertEqual(builder.entry_1.get(), "")
+        # options that are not in the design are restored too
+        self.assertEqual(str(builder.button_1["state"]), "normal")
+
+    def test_toplevel_design(self):
+        builder = self.pool.acquire(get_resource("toplevel.xml"))
+        self.assertIs(builder._window, builder.toplevel1)
+        self.pool.release(builder)
+        self.assertEqual(builder._window.state(), "withdrawn")
+
+    def test_size(self):
+        path = get_resource("variables.xml")
+        self.pool.set_size(path, 1)
+        first = self.pool.acquire(path)
+        second = self.pool.acquire(path)
+        self.assertIsNot(first, second)
+        self.pool.release(first)
+        self.pool.release(second)
+        # the pool is full so the second builder is destroyed
+        self.assertFalse(second._window.winfo_exists())
+        self.assertIs(self.pool.acquire(path), first)
+
+    def test_clear(self):
+        builder = self.pool.acquire(get_resource("variables.xml"))
+        self.pool.release(builder)
+        self.pool.clear()
+        self.assertFalse(builder._window.winfo_exists())
+        self.assertIsNot(self.pool.acquire(get_resource("variables.xml")), builder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from formation import Template
+from formation.formats import XMLFormat
+from formation.tests.support import get_resource, tk
+
+
+class TemplateAnalysisTestCase(unittest.TestCase):
+
+    def test_classes_resolved(self):
+        template = Template(path=get_resource("variables.xml"))
+        self.assertIs(template._classes[id(template.node)], tk.Frame)
+        for node in template.node:
+            self.assertIn(id(node), template._classes)
+
+    def test_node_not_altered(self):
+        node = XMLFormat(path=get_resource("all_native.xml")).load()
+        reference = XMLFormat(path=get_resource("all_native.xml")).load()
+        Template(node=node)
+        self.assertEqual(node, reference)
+
+    def test_missing_source(self):
+        self.assertRaises(ValueError, Template)
+
+
+class TemplateInstanceTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.root = tk.Tk()
+        cls.template = Template(path=get_resource("variables.xml"))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.root.destroy()
+
+    def test_isolated_instances(self):
+        first = self.template.instantiate(self.root)
+        second = self.template.instantiate(self.root)
+        self.assertIsNot(first.str_1, second.str_1)
+        self.assertIsNot(first.string_var, second.string_var)
+        first.string_var.set("changed")
+        self.assertEqual(second.string_var.get(), "Sample text")
+
+    def test_name_prefix(self):
+        instance = self.template.instantiate(self.root, name_prefix="row1_")
+        self.assertEqual(instance.str_1.winfo_name(), "row1_str_1")
+
+    def test_repeated_instantiation(self):
+        for _ in range(5):
+            instance = self.template.instantiate(self.root)
+            self.assertEqual(instance.int_var.get(), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
+import glob
+import io
+import os
 import unittest
 
-from formation.formats import XMLFormat
+from formation.formats import Node, XMLFormat
+from formation.tests.support import get_resource
 
 
 class EqualityTestCase(unittest.TestCase):
@@ -111,5 +115,55 @@ class AttributeHandlingTestCase(unittest.TestCase):
         self.assertDictEqual(grouped.get("attr"), {"background": "#ffffff", "font": "Arial"})
 
 
+class StreamingLoadTestCase(unittest.TestCase):
+
+    def test_matches_tree_load(self):
+        for path in glob.glob(os.path.join(os.path.dirname(get_resource("meta.xml")), "*.xml")):
+            with self.subTest(path=path):
+                with open(path, "rb") as file:
+                    expected = XMLFormat(data=file.read()).load()
+                self.assertEqual(XMLFormat(path=path).load(), expected)
+
+    def test_order_and_nesting(self):
+        node = XMLFormat(path=get_resource("lazy.xml")).load()
+        notebook = node.children[0]
+        self.assertEqual(notebook["name"], "notebook")
+        self.assertEqual([n["name"] for n in notebook], ["tab_1", "tab_2", "tab_3"])
+        self.assertIs(notebook.children[1].parent, notebook)
+        self.assertEqual(notebook.children[1].children[1].children[0]["name"], "label_2")
+
+
+class StreamingWriteTestCase(unittest.TestCase):
+
+    def stream(self, node, **kw):
+        file = io.StringIO()
+        XMLFormat(node=node).stream(file, **kw)
+        return file.getvalue()
+
+    def test_round_trip(self):
+        for path in glob.glob(os.path.join(os.path.dirname(get_resource("meta.xml")), "*.xml")):
+            with self.subTest(path=path):
+                node = XMLFormat(path=path).load()
+                for pretty_print in (True, False):
+                    self.assertEqual(XMLFormat(data=self.stream(node, pretty_print=pretty_print)).load(), node)
+
+    def test_escaping(self):
+        node = Node(None, "tkinter.Label", {"name": "label", "attr": {"text": 'a & <b> "c"\n\td'}})
+        self.assertEqual(XMLFormat(data=self.stream(node)).load()["attr"]["text"], 'a & <b> "c"\n\td')
+
+    def test_events(self):
+        root = Node(None, "tkinter.Frame", {"name": "root"})
+        events = [("start", root)]
+        for i in range(3):
+            child = Node(root, "tkinter.Label", {"name": "label_{}".format(i)})
+            events.extend((("start", child), ("end", child)))
+        events.append(("end", root))
+        self.assertEqual(list(root.iter_events()), events)
+        file = io.StringIO()
+        XMLFormat(path="design.xml").stream(file, iter(events), xml_declaration=False)
+        self.assertEqual(file.getvalue(), self.stream(root, xml_declaration=False))
+        self.assertEqual(XMLFormat(data=file.getvalue()).load(), root)
+
+
 if __name__ == '__main__':
     unittest.main()
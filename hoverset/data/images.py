@@ -12,12 +12,15 @@ import os
 import shelve
 import math
 import hashlib
+import time
 
 from hoverset.data.utils import get_resource_path
 from hoverset.util.color import to_rgb, luminosity
 
 from PIL import Image, ImageTk
 
+from hoverset.ui.clock import FrameClock
+
 # raw default image resources
 _primary_location = get_resource_path('hoverset.data', "image")
 # path to theme recolored and cached image resources
@@ -175,7 +178,8 @@ def load_image_to_widget(widget, image, prop, load_func=None, animate=True):
     load = widget.config if load_func is None else load_func
     # cancel any animate cycles present
     if hasattr(widget, '_animate_cycle'):
-        widget.after_cancel(widget._animate_cycle)
+        FrameClock.get(widget).unsubscribe(widget._animate_cycle)
+        del widget._animate_cycle
     if not isinstance(image, Image.Image):
         # load non PIL image values
         load(**{prop: image})
@@ -200,17 +204,21 @@ def load_image_to_widget(widget, image, prop, load_func=None, animate=True):
     loop = image.info.get("loop", 0)
     loop = math.inf if loop == 0 else loop
     loop_count = 0
+    duration = (image.info.get("duration", 100) or 100) / 1000
 
-    def cycle_frames():
+    def cycle_frames(now):
         nonlocal loop_count
         load(**{prop: next(cycle)})
         loop_count += 1
         if loop_count // frame_count >= loop:
-            return
-        widget._animate_cycle = widget.after(image.info.get("duration", 100), cycle_frames)
-
-    # begin animation
-    cycle_frames()
+            return None
+        return now + duration
+
+    # begin animation, the shared frame clock drives subsequent frames
+    due = cycle_frames(time.monotonic())
+    if due is not None:
+        widget._animate_cycle = cycle_frames
+        FrameClock.get(widget).subscribe(cycle_frames, widget, due)
 
 
 def to_tk_image(image):
@@ -0,0 +1,98 @@
+import time
+import unittest
+import tkinter as tk
+
+from hoverset.ui.clock import FrameClock
+
+
+class FrameClockTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.root = tk.Tk()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.root.destroy()
+
+    def wait(self, ms):
+        self.root.after(ms)
+        self.root.update()
+
+    def test_one_clock_per_root(self):
+        frame = tk.Frame(self.root)
+        self.assertIs(FrameClock.get(frame), FrameClock.get(self.root))
+
+    def test_subscription(self):
+        clock = FrameClock.get(self.root)
+        calls = []
+
+        def callback(now):
+            calls.append(now)
+            return now if len(calls) < 3 else None
+
+        clock.subscribe(callback)
+        for _ in range(5):
+            self.wait(50)
+        self.assertEqual(len(calls), 3)
+        self.assertNotIn(callback, clock._subscribers)
+        self.assertIsNone(clock._after_id)
+
+    def test_failing_callback(self):
+        clock = FrameClock.get(self.root)
+        calls = []
+
+        def failing(_):
+            raise ValueError("failed")
+
+        def callback(now):
+            calls.append(now)
+            return now if len(calls) < 2 else None
+
+        clock.subscribe(failing)
+        clock.subscribe(callback)
+        with self.assertLogs("hoverset.ui.clock", level="ERROR"):
+            for _ in range(4):
+                self.wait(50)
+        # the failing callback is dropped and the others keep running
+        self.assertNotIn(failing, clock._subscribers)
+        self.assertEqual(len(calls), 2)
+
+    def test_pause_when_unmapped(self):
+        clock = FrameClock.get(self.root)
+        label = tk.Label(self.root)
+        calls = []
+
+        def callback(now):
+            calls.append(now)
+            return now
+
+        clock.subscribe(callback, label)
+        self.wait(50)
+        self.assertEqual(calls, [])
+        label.pack()
+        self.root.update()
+        self.wait(int(FrameClock.pause_interval * 1000) + 50)
+        self.assertTrue(calls)
+        label.destroy()
+        self.wait(50)
+        self.assertNotIn(callback, clock._subscribers)
+
+    def test_fps(self):
+        clock = FrameClock(self.root, fps=10)
+        calls = []
+
+        def callback(now):
+            calls.append(now)
+            return now
+
+        clock.subscribe(callback)
+        start = time.monotonic()
+        while time.monotonic() - start < 0.35:
+            self.root.update()
+        clock.unsubscribe(callback)
+        self.assertLessEqual(len(calls), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,9 +2,10 @@
 Animation library for hoverset authors. Allows for animation of various properties
 using various easing functions
 """
-from threading import Thread
 import time
 
+from hoverset.ui.clock import FrameClock
+
 
 class CubicBezier:
     #  FIXME Bezier does not function with very small duration values, at least for tkinter
@@ -118,80 +119,56 @@ class Easing:
     SLING_SHOT = CubicBezier(0.7, 0, 0, 1)
 
 
-class Animate(Thread):
-    SLEEP_PRECISION = 0.001  # Average sleep function precision on WINDOWS
-    # TODO Determine sleep precision for other OS and implement accordingly
-    STEPS = 50
+class Animate:
+    """
+    Animates a value from ``initial`` to ``final`` over a duration calling
+    ``func`` with the interpolated value on every frame. Animations are
+    driven by the shared :py:class:`~hoverset.ui.clock.FrameClock` of the
+    element's interpreter so all calls to ``func`` happen in the main thread.
+
+    :param element: widget being animated
+    :param initial: initial value
+    :param final: final value
+    :param func: callable accepting the interpolated value
+    :param options: supports ``dur`` (duration in seconds, default 2),
+        ``easing`` (default :py:attr:`Easing.LINEAR`) and ``on_complete``
+    """
 
     def __init__(self, element, initial, final, func, **options):
-        super().__init__()
-        self.count = 0
         self.initial = float(initial)
         self.final = float(final)
-        self.duration = self._corrected(float(options.get("dur", 2)))
-        self.step_time = self.duration / self.STEPS
+        self.duration = float(options.get("dur", 2))
         self.range = self.final - self.initial
         self.bezier = options.get("easing", Easing.LINEAR)
         self._on_complete = options.get("on_complete")
         self.func = func
         self.element = element
-        self.start()  # Start animation in thread.
-
-    def _get(self):
-        count = self.count
-        self.count += 1
-        return self.range * self.bezier.get(count / self.STEPS) + self.initial
-
-    def _animate(self):
-        # Legacy method that utilised tkinter .after method
-        # .after method has limitations in that it has an unbound upper limit and yields unstable timing
-        # Unstable timing disrupts interpolation hence animations do not appear to follow their timing functions.
-        if self.count > self.STEPS:
-            self.count = 0
+        self._start = None
+        self._clock = FrameClock.get(element)
+        # paused while the element is unmapped
+        self._clock.subscribe(self._step, element)
+
+    def _get(self, progress):
+        return self.range * self.bezier.get(progress) + self.initial
+
+    def _step(self, now):
+        if self._start is None:
+            self._start = now
+        progress = (now - self._start) / self.duration if self.duration else 1
+        if progress >= 1:
             self.func(self.final)
-            return
-        self.element.after(int(self.step_time), self._animate)
-        value = self._get()
-        self.func(value)
-
-    def _corrected(self, duration):
-        return max(duration - self.SLEEP_PRECISION * self.STEPS, 0)
-
-    # noinspection PyBroadException
-    # @timed
-    def run(self) -> None:
-        """
-        Animation function. It runs in the thread hence does not interfere with the rest of the program thus
-        improving user experience. It is less computationally expensive compared to other animation functions defined
-        here as only :var self.STEPS number of cycles are performed with the rest of the time spent in sleep. However,
-        time.sleep is inaccurate on the upper bound hence animations may take longer than expected! This is the
-        preferred method since it's computationally cheap and hence more power efficient.
-        :return:
-        """
-        while self.count <= self.STEPS:
-            time.sleep(self.step_time)
-            self.func(self._get())
-        self.func(self.final)
-        if self._on_complete:
-            self._on_complete()
-
-    # @timed
-    def run_(self) -> None:
+            if self._on_complete:
+                self._on_complete()
+            return None
+        self.func(self._get(progress))
+        # request the next frame
+        return now
+
+    def cancel(self):
         """
-        Alternative animation function. It ensures that animations are completed within the specified duration by
-        checking time on each loop. The means that if time is up it will be able to determine and end immediately.
-        This method is computationally expensive compared to the previous one since all while loop cycles possible
-        within the animation duration are carried out each performing expensive time calculations!
-        :return:
+        Stop the animation without completing it
         """
-        bench = time.time()
-        while self.count <= self.STEPS:
-            t1 = time.time()
-            if t1 - bench > self.count*self.step_time and self.func(self._get()):
-                break
-        self.func(self.final)
-        if self._on_complete:
-            self._on_complete()
+        self._clock.unsubscribe(self._step)
 
 
 class AnimateProperty(Animate):
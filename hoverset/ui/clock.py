@@ -0,0 +1,123 @@
+"""
+Frame clock shared by the animations running in a tk interpreter
+"""
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import logging
+import time
+import tkinter
+
+logger = logging.getLogger(__name__)
+
+
+class FrameClock:
+    """
+    Drives animations within a tk interpreter from a single ``after`` loop.
+    Image animations and easing runs subscribe callbacks to the clock of
+    their root window instead of running separate timers or threads.
+    A callback is called with the current :py:func:`time.monotonic` time
+    and should return the time at which it is next to be called or ``None``
+    to unsubscribe. The clock never ticks faster than its frame rate and
+    stops completely when it has no subscribers.
+
+    .. code-block:: python
+
+        clock = FrameClock.get(widget)
+
+        def on_tick(now):
+            widget["text"] = str(now)
+            return now + 1  # call again after a second
+
+        clock.subscribe(on_tick)
+
+    Callbacks subscribed with a widget are paused while the widget is unmapped
+    and are unsubscribed once the widget is destroyed. Callbacks raising
+    exceptions are logged and unsubscribed.
+    """
+
+    #: default frame rate for new clocks
+    fps = 60
+    #: interval in seconds at which paused callbacks are checked
+    pause_interval = 0.25
+
+    def __init__(self, root, fps=None):
+        self.root = root
+        self.fps = fps or FrameClock.fps
+        # callback -> [due time, widget]
+        self._subscribers = {}
+        self._after_id = None
+
+    @classmethod
+    def get(cls, widget=None):
+        """
+        Get the clock for the interpreter of a widget, creating it if necessary
+
+        :param widget: any widget in the interpreter, if not provided the
+            default root is used
+        :return: :py:class:`FrameClock`
+        """
+        root = widget._root() if widget is not None else tkinter._default_root
+        clock = root.__dict__.get("_frame_clock")
+        if clock is None:
+            clock = root._frame_clock = cls(root)
+        return clock
+
+    def subscribe(self, callback, widget=None, due=0):
+        """
+        Subscribe a callback to the clock
+
+        :param callback: callable accepting the current time
+        :param widget: optional widget whose callbacks are paused while unmapped
+        :param due: time at which the callback is to be first called,
+            defaults to the next tick
+        """
+        self._subscribers[callback] = [due, widget]
+        self._schedule()
+
+    def unsubscribe(self, callback):
+        self._subscribers.pop(callback, None)
+        if not self._subscribers and self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        now = time.monotonic()
+        try:
+            for callback, entry in list(self._subscribers.items()):
+                if self._subscribers.get(callback) is not entry:
+                    # unsubscribed by an earlier callback
+                    continue
+                due, widget = entry
+                if due > now:
+                    continue
+                try:
+                    if widget is not None and not widget.winfo_ismapped():
+                        entry[0] = now + self.pause_interval
+                        continue
+                    due = callback(now)
+                except tkinter.TclError:
+                    # widget has been destroyed
+                    due = None
+                except Exception:
+                    # a failing callback should not stop the others
+                    logger.exception("Frame clock callback %r failed", callback)
+                    due = None
+                if due is None:
+                    self._subscribers.pop(callback, None)
+                else:
+                    entry[0] = due
+        finally:
+            self._schedule()
+
+    def _schedule(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if not self._subscribers:
+            return
+        now = time.monotonic()
+        delay = max(min(e[0] for e in self._subscribers.values()) - now, 1 / self.fps)
+        self._after_id = self.root.after(int(delay * 1000), self._tick)
@@ -9,6 +9,7 @@ from hoverset.util.execution import elevate
 from hoverset.platform import platform_is, WINDOWS
 
 import studio
+from formation import formats
 from studio.preferences import Preferences
 
 dirs = platformdirs.AppDirs(appname="formation", appauthor="hoverset")
@@ -49,6 +50,17 @@ def get_parser():
         """,
     )
 
+    parser.add_argument(
+        "-x",
+        "--convert",
+        nargs=2,
+        metavar=("SOURCE", "DESTINATION"),
+        help="""
+            Convert a design file to another format. Formats are inferred
+            from the file extensions.
+        """,
+    )
+
     parser.add_argument(
         "-u",
         "--upgrade",
@@ -157,6 +169,16 @@ def handle_config(args):
     sys.exit(1)
 
 
+def convert(args):
+    source, destination = args.convert
+    try:
+        formats.convert(source, destination)
+    except Exception as e:
+        logger.error("Could not convert %s: %s", source, e)
+        sys.exit(1)
+    logger.info("Converted %s to %s", source, destination)
+
+
 def upgrade(args):
     # elevate process to run in admin mode
     command = f"\"{sys.executable}\" -m pip install --upgrade formation-studio"
@@ -181,6 +203,9 @@ def cli(args):
     if args.config:
         handle_config(args)
 
+    if args.convert:
+        convert(args)
+
 
 def main():
     cli(sys.argv[1:])
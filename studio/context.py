@@ -71,10 +71,11 @@ class BaseContext(Frame):
     def close_other_right(self):
         self._close_contexts(self._contexts_right())
 
-    def new_action(self, action: Action):
+    def new_action(self, action: Action, widgets=None):
         """
         Register a undo redo point
         :param action: An action object implementing undo and redo methods
+        :param widgets: widgets modified by the action if known
         :return:
         """
         self._redo_stack.clear()
@@ -114,6 +115,14 @@ class BaseContext(Frame):
                 return
             self._undo_stack.remove(last)
 
+    def action_updated(self, action):
+        """
+        Notify that a registered action has been changed in place for
+        instance to merge consecutive modifications
+        :param action: the modified action
+        """
+        pass
+
     def select(self):
         if self.tab_handle:
             self.tab_view.select(self.tab_handle)
@@ -133,7 +133,10 @@ class StylePane(StylePaneFramework, Pane):
     def last_action(self):
         pass
 
-    def new_action(self, action):
+    def new_action(self, action, widgets=None):
+        pass
+
+    def action_updated(self, action):
         pass
 
     def widgets_modified(self, widgets):
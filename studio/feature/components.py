@@ -12,6 +12,8 @@ from studio.lib import legacy, native
 from studio.lib.pseudo import PseudoWidget, Container, WidgetMeta
 from studio.ui import geometry
 
+from formation.loader import clear_class_cache
+
 
 class Component(Frame):
 
@@ -307,6 +309,8 @@ class ComponentPane(BaseFeature):
                 except Exception as e:
                     errors[module] = e
                     continue
+                # classes resolved from the old module are stale
+                clear_class_cache(module.__name__)
             for attr in dir(module):
                 if type(getattr(module, attr)) == WidgetMeta:
                     self._custom_widgets.append(getattr(module, attr))
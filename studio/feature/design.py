@@ -7,6 +7,7 @@ Drag drop designer for the studio
 # ======================================================================= #
 import os.path
 import time
+import weakref
 from tkinter import filedialog, ttk, TclError
 
 from hoverset.data import actions
@@ -21,9 +22,10 @@ from hoverset.util.execution import Action, as_thread
 from studio.lib import NameGenerator
 from studio.lib.layouts import BaseLayoutStrategy, PlaceLayoutStrategy
 from studio.lib.pseudo import PseudoWidget, Container, Groups
-from studio.parsers.loader import DesignBuilder, BaseStudioAdapter
+from studio.parsers.loader import DesignBuilder, BaseStudioAdapter, BackgroundWriter
+from studio.parsers.journal import Journal
 from studio.ui import geometry
-from studio.ui.widgets import DesignPad, CoordinateIndicator
+from studio.ui.widgets import DesignPad, CoordinateIndicator, SaveIndicator
 from studio.ui.highlight import RegionHighlighter
 from studio.context import BaseContext
 from studio import __version__
@@ -111,9 +113,12 @@ class Designer(DesignPad, Container):
     RESIZE = 0x3
     WIDGET_INIT_PADDING = 20
     WIDGET_INIT_HEIGHT = 25
+    # delay in milliseconds before changes are journaled
+    JOURNAL_DELAY = 1000
     name = "Designer"
     pane = None
     _coord_indicator = None
+    _save_indicator = None
 
     def __init__(self, master, studio):
         super().__init__(master)
@@ -172,6 +177,24 @@ class Designer(DesignPad, Container):
         self._empty.set_up_context(design_menu)
         if Designer._coord_indicator is None:
             Designer._coord_indicator = self.studio.install_status_widget(CoordinateIndicator)
+        if Designer._save_indicator is None:
+            Designer._save_indicator = self.studio.install_status_widget(SaveIndicator)
+        # a fresh revision is taken on every modification and restored on
+        # undo and redo, the design has changed if it differs from the
+        # revision that was last saved
+        self._revision = 0
+        self._last_revision = 0
+        self._saved_revision = 0
+        self._saved_hash = None
+        self._writer = BackgroundWriter()
+        self._save_poll = None
+        self._journal = Journal(os.path.join(self.studio.dirs.user_cache_dir, "journals"))
+        self._journal_poll = None
+        # node of each widget in the journaled state and the widgets
+        # modified since, the entire design is journaled again if unknown
+        self._journal_nodes = {}
+        self._journal_widgets = set()
+        self._journal_all = False
         self._text_editor = Text(self, wrap='none')
         self._text_editor.on_change(self._text_change)
         self._text_editor.bind("<FocusOut>", self._text_hide)
@@ -251,18 +274,56 @@ class Designer(DesignPad, Container):
         )
         self.builder.generate()
         self.design_path = None
+        self._mark_saved(self.builder.root)
 
     @property
     def _ids(self):
         return {i.id for i in self.objects}
 
-    def has_changed(self):
-        # check if design has changed since last save or loading so we can prompt user to save changes
-        builder = self.builder
-        if self.root_obj:
-            builder = DesignBuilder(self)
-            builder.generate()
-        return builder != self.builder
+    def mark_changed(self):
+        """
+        Record a modification of the design. Should be called by everything
+        that modifies the design
+        :return: the new revision of the design
+        """
+        self._last_revision += 1
+        self._revision = self._last_revision
+        return self._revision
+
+    def restore_revision(self, revision):
+        """
+        Return to a revision the design had before, for instance when an
+        action is undone
+        :param revision: a revision returned by :py:meth:`mark_changed`
+        """
+        self._revision = revision
+
+    def _mark_saved(self, node=None):
+        self._saved_revision = self._revision
+        # structure of the saved design for exact comparisons
+        self._saved_hash = None if node is None else node.structural_hash()
+
+    def _design_hash(self):
+        if self.root_obj is None:
+            return None
+        builder = DesignBuilder(self)
+        builder.generate()
+        return builder.root.structural_hash()
+
+    def has_changed(self, exact=False):
+        """
+        Check if design has changed since last save or loading so we can
+        prompt user to save changes. Modifications reverted through undo
+        are ignored. Only the revision is checked unless exact is set
+        :param exact: Compare the structure of the design with that of the
+            saved design instead to catch modifications that were not
+            recorded. This requires serializing the entire design
+        :return: ``True`` if design has changed
+        """
+        if not exact or self._saved_revision < 0:
+            # designs whose last save failed cannot be compared
+            return self._revision != self._saved_revision
+        return self._design_hash() != self._saved_hash
 
     def open_new(self):
         # open a blank design
@@ -285,7 +346,7 @@ class Designer(DesignPad, Container):
         )
 
     def open_file(self, path=None):
-        if self.has_changed():
+        if self.has_changed(exact=True):
             save = self.save_prompt()
             if save:
                 # user opted to save
@@ -296,14 +357,18 @@ class Designer(DesignPad, Container):
             elif save is None:
                 # user made no choice or basically selected cancel
                 return
+        if not self.wait_for_save():
+            return
+        self._discard_journal()
         if path:
             self.builder = DesignBuilder(self)
+            changes = self._recover_changes(path)
             progress = MessageDialog.show_progress(
                 mode=MessageDialog.INDETERMINATE,
                 message='Loading design file to studio...',
                 parent=self.studio
             )
-            self._load_design(path, progress)
+            self._load_design(path, progress, changes)
         else:
             # if no path is supplied the default behaviour is to open a blank design
             self._open_default()
@@ -334,13 +399,24 @@ class Designer(DesignPad, Container):
                 )
 
     @as_thread
-    def _load_design(self, path, progress=None):
+    def _load_design(self, path, progress=None, changes=None):
         # Loading designs is elaborate so better do it on its own thread
         # Capture any errors that occur while loading
         # This helps the user single out syntax errors and other value errors
         try:
             self.design_path = path
-            self.root_obj = self.builder.load(path, self)
+            self.root_obj = self.builder.load(path, self, changes)
+            if changes:
+                self._mark_saved(self.builder.root)
+                # recovered changes are yet to be saved
+                self.mark_changed()
+            else:
+                # compared to the design as generated rather than as loaded
+                # since generating may format the same design differently
+                builder = DesignBuilder(self)
+                builder.generate()
+                self._mark_saved(builder.root)
+            self._start_journal()
             self.context.on_load_complete()
         except Exception as e:
             self.clear()
@@ -358,7 +434,7 @@ class Designer(DesignPad, Container):
     def reload(self, *_):
         if not self.design_path or self.studio.context != self.context:
             return
-        if self.has_changed():
+        if self.has_changed(exact=True):
             okay = MessageDialog.ask_okay_cancel(
                 title="Confirm reload",
                 message="All changes made will be lost",
@@ -367,6 +443,8 @@ class Designer(DesignPad, Container):
             if not okay:
                 # user made no choice or basically selected cancel
                 return
+        # the changes are not to be recovered on reopening
+        self._discard_journal()
         self.clear()
         self.studio.on_session_clear(self)
         self.open_file(self.design_path)
@@ -378,9 +456,175 @@ class Designer(DesignPad, Container):
             if not path:
                 return None
             self.design_path = path
-        self.builder.write(self.design_path)
+        # only the snapshot is taken here, the file is written in the background
+        self.builder.write_background(self.design_path, self._writer)
+        self._mark_saved(self.builder.root)
+        if self._save_poll is None:
+            self._poll_save()
         return self.design_path
 
+    def _poll_save(self):
+        self._save_poll = None
+        busy = self._writer.is_busy()
+        saved = self._report_save_errors()
+        progress = self._writer.progress()
+        if progress is not None:
+            path, written, total = progress
+            Designer._save_indicator.show(f"Saving {os.path.basename(path)}", written / total if total else 0)
+        if busy:
+            self._save_poll = self.after(50, self._poll_save)
+        else:
+            Designer._save_indicator.hide()
+            if saved:
+                # journal changes relative to the newly saved design
+                self._start_journal()
+
+    def _report_save_errors(self):
+        errors = self._writer.errors()
+        if errors:
+            # the design is yet to be saved
+            self._saved_revision = -1
+            self.context.update_save_status()
+        for path, error in errors:
+            MessageDialog.show_error(
+                parent=self.studio, title='Error saving design', message=f"Could not save {path}\n{error}"
+            )
+        return not errors
+
+    def wait_for_save(self):
+        """
+        Block until all background saves are complete
+        :return: ``True`` if all saves were successful
+        """
+        self._writer.wait()
+        return self._report_save_errors()
+
+    def on_design_close(self):
+        """
+        Prepare the design to be closed. Background saves are allowed to
+        complete and the journal of unsaved changes is discarded
+        :return: ``True`` if the design can be closed
+        """
+        if not self.wait_for_save():
+            return False
+        self._discard_journal()
+        return True
+
+    def _start_journal(self):
+        if not (self.design_path and self.builder.root and self.root_obj
+                and self.studio.pref.get("designer::autosave")):
+            self._journal.stop()
+            return
+        # any differences from the saved design such as recovered changes
+        # are recorded first
+        self._journal.start(self.design_path, self.builder.root, self._journal_tree())
+
+    def _journal_tree(self):
+        # serialize the entire design noting the node of each widget
+        self._journal_nodes.clear()
+        self._journal_widgets.clear()
+        self._journal_all = False
+        builder = DesignBuilder(self)
+        builder.generate()
+        self._map_journal_nodes(self.root_obj, builder.root)
+        return builder.root
+
+    def _map_journal_nodes(self, widget, node):
+        stack = [(widget, node)]
+        while stack:
+            widget, node = stack.pop()
+            self._journal_nodes[widget] = node
+            children = widget._children if isinstance(widget, Container) else ()
+            if children:
+                # nodes of child widgets come after the other child nodes
+                stack.extend(zip(children, node.children[-len(children):]))
+
+    def _journal_node(self, widget):
+        # node of widget reusing the journaled nodes of its child widgets
+        node = self.builder.to_node(widget)
+        for child in (widget._children if isinstance(widget, Container) else ()):
+            child_node = self._journal_nodes.get(child)
+            if child_node is None:
+                # newly added widget
+                child_node = self.builder.to_tree(child)
+                self._map_journal_nodes(child, child_node)
+            child_node.parent = node
+            node.children.append(child_node)
+        return node
+
+    def journal_changes(self, widgets=None):
+        """
+        Schedule changes to the design to be journaled. Changes made in
+        quick succession are journaled together
+        :param widgets: widgets modified, the entire design is journaled if
+            not provided
+        """
+        if self._journal.path is None:
+            return
+        if widgets is None:
+            self._journal_all = True
+        else:
+            self._journal_widgets.update(widgets)
+        if self._journal_poll is None:
+            self._journal_poll = self.after(self.JOURNAL_DELAY, self._record_journal)
+
+    def _widget_depth(self, widget):
+        depth = 0
+        while widget is not self and widget is not None:
+            widget = widget.layout
+            depth += 1
+        return depth
+
+    def _record_journal(self):
+        self._journal_poll = None
+        if self.root_obj is None:
+            self._journal_all = True
+            return
+        widgets = self._journal_widgets
+        self._journal_widgets = set()
+        if not self._journal_all and self.root_obj in self._journal_nodes:
+            objects = set(self.objects)
+            replacements = []
+            # containers are replaced before their children
+            for widget in sorted(widgets, key=self._widget_depth):
+                if widget not in objects:
+                    # removed widgets are journaled with their containers
+                    continue
+                if widget not in self._journal_nodes:
+                    # widgets added outside their containers are unknown
+                    break
+                node = self._journal_node(widget)
+                replacements.append((self._journal_nodes[widget], node))
+                self._journal_nodes[widget] = node
+            else:
+                try:
+                    self._journal.replace(replacements)
+                    return
+                except ValueError:
+                    pass
+        self._journal.record(self._journal_tree())
+
+    def _discard_journal(self):
+        if self._journal_poll is not None:
+            self.after_cancel(self._journal_poll)
+            self._journal_poll = None
+        self._journal.stop(discard=True)
+        self._journal.flush()
+
+    def _recover_changes(self, path):
+        if not self.studio.pref.get("designer::autosave"):
+            return None
+        changes = Journal.recover(self._journal.directory, path)
+        if not changes:
+            return None
+        recover = MessageDialog.ask_question(
+            title="Recover unsaved changes",
+            message=f"Design file \"{os.path.basename(path)}\" has unsaved changes from a previous session. "
+                    "Do you want to recover them?",
+            parent=self.studio
+        )
+        return changes if recover else None
+
     def as_node(self, widget):
         builder = self.builder
         if builder is None:
@@ -676,7 +920,7 @@ class Designer(DesignPad, Container):
                     # Delete silently to prevent adding the event to the undo/redo stack
                     lambda _: self.delete([obj], True),
                     lambda _: self.restore([obj], [restore_point], [obj.layout])
-                ))
+                ), [layout])
         elif obj.layout is None:
             # This only happens when adding the main layout. We dont need to add this action to the undo/redo stack
             # This main layout is attached directly to the designer
@@ -724,7 +968,7 @@ class Designer(DesignPad, Container):
                 # Delete silently to prevent adding the event to the undo/redo stack
                 lambda _: self.delete(objs, True),
                 lambda _: self.restore(objs, restore_points, [w.layout for w in objs])
-            ))
+            ), [w.layout for w in objs])
         return objs
 
     def select_layout(self, layout: Container):
@@ -756,7 +1000,7 @@ class Designer(DesignPad, Container):
             self.studio.new_action(Action(
                 lambda _: self.restore(widgets, restore_points, layouts),
                 lambda _: self.studio.delete(widgets, True)
-            ))
+            ), layouts)
         else:
             self.studio.delete(widgets, self)
 
@@ -844,7 +1088,7 @@ class Designer(DesignPad, Container):
                 container.restore_widget(widget, cur_restore_point)
             self.studio.widgets_layout_changed(widgets)
 
-        self.studio.new_action(Action(undo, redo))
+        self.studio.new_action(Action(undo, redo), prev_containers + containers)
 
     def _text_change(self):
         self.studio.style_pane.apply_style("text", self._text_editor.get_all())
@@ -942,7 +1186,7 @@ class Designer(DesignPad, Container):
             self.studio.new_action(Action(
                 lambda _: self._update_stacking(prev_data, True),
                 lambda _: self._update_stacking(data, True)
-            ))
+            ), [widget.layout for widget in data])
 
     def on_widgets_reorder(self, indices):
         pass
@@ -960,7 +1204,7 @@ class Designer(DesignPad, Container):
         pass
 
     def on_app_close(self):
-        if self.has_changed():
+        if self.has_changed(exact=True):
             save = self.save_prompt()
             if save:
                 save_to = self.save()
@@ -968,7 +1212,8 @@ class Designer(DesignPad, Container):
                     return False
             elif save is None:
                 return False
-        return True
+        # do not exit before designs are written
+        return self.on_design_close()
 
 
 class DesignContext(BaseContext):
@@ -981,6 +1226,9 @@ class DesignContext(BaseContext):
 
     def __init__(self, master, studio, path=None):
         super(DesignContext, self).__init__(master, studio)
+        # design revisions before and after each undo action and the
+        # widgets it modifies
+        self._records = weakref.WeakKeyDictionary()
         self.designer = Designer(self, studio)
         self.designer.pack(fill="both", expand=True)
         self.path = path
@@ -1060,25 +1308,57 @@ class DesignContext(BaseContext):
                 # re-apply selection style
                 self.tab_handle.on_select()
 
-    def new_action(self, action: Action):
-        super(DesignContext, self).new_action(action)
+    def on_design_change(self, widgets=None):
+        """
+        Called whenever the design is modified outside undo actions. The
+        design can no longer return to the revisions recorded for actions
+        :param widgets: widgets modified if known
+        """
+        for record in self._records.values():
+            record[0] = record[1] = None
+        self.designer.mark_changed()
+        self._design_updated(widgets)
+
+    def _design_updated(self, widgets):
         self.update_save_status()
+        self.designer.journal_changes(widgets)
+
+    def new_action(self, action: Action, widgets=None):
+        before = self.designer._revision
+        super(DesignContext, self).new_action(action, widgets)
+        self._records[action] = [before, self.designer.mark_changed(), widgets]
+        self._design_updated(widgets)
+
+    def action_updated(self, action):
+        record = self._records.get(action)
+        after = self.designer.mark_changed()
+        if record is not None:
+            record[1] = after
+        self._design_updated(record and record[2])
 
     def pop_last_action(self, key=None):
         super(DesignContext, self).pop_last_action(key)
-        self.update_save_status()
+        self.on_design_change()
 
-    def last_action(self):
-        self.update_save_status()
-        return super().last_action()
+    def _restore_action(self, action, index):
+        record = self._records.get(action)
+        if record is None or record[index] is None:
+            self.designer.mark_changed()
+        else:
+            self.designer.restore_revision(record[index])
+        self._design_updated(record and record[2])
 
     def undo(self):
+        action = self.last_action()
         super(DesignContext, self).undo()
-        self.update_save_status()
+        if action is not None:
+            self._restore_action(action, 0)
 
     def redo(self):
+        action = self._redo_stack[-1] if self._redo_stack else None
         super(DesignContext, self).redo()
-        self.update_save_status()
+        if action is not None:
+            self._restore_action(action, 1)
 
     def can_persist(self):
         return self.path is not None
@@ -1138,7 +1418,7 @@ class MultiSaveDialog(MessageDialog):
     def render(self, window):
         contexts = self.check_contexts if self.check_contexts is not None else self.studio.contexts
         self.contexts = [
-            i for i in contexts if isinstance(i, DesignContext) and i.designer.has_changed()
+            i for i in contexts if isinstance(i, DesignContext) and i.designer.has_changed(exact=True)
         ]
         self.geometry("500x250")
         self._message("Some files have changes. Select files to save", self.ICON_INFO)
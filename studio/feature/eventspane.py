@@ -221,18 +221,26 @@ class EventPane(BaseFeature):
             widget._event_map_[binding.id] = binding
             self._multimap[new_binding.id].append((binding.id, widget))
         self.bindings.add(new_binding)
+        self._design_changed([widget for _, widget in self._multimap[new_binding.id]])
 
     def delete_item(self, item):
         for ev_id, widget in self._multimap[item.id]:
             widget._event_map_.pop(ev_id)
-        self._multimap.pop(item.id)
+        widgets = [widget for _, widget in self._multimap.pop(item.id)]
         self.bindings.remove(item.id)
+        self._design_changed(widgets)
 
     def modify_item(self, value: EventBinding):
         if self._suppress_change:
             return
         for ev_id, widget in self._multimap[value.id]:
             widget._event_map_[ev_id] = EventBinding(ev_id, value.sequence, value.handler, value.add)
+        self._design_changed([widget for _, widget in self._multimap[value.id]])
+
+    def _design_changed(self, widgets):
+        # bindings are saved as part of the design
+        if self.studio.designer:
+            self.studio.designer.context.on_design_change(widgets)
 
     def _on_select(self, _):
         if not self.studio.selection:
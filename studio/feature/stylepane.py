@@ -228,9 +228,10 @@ class StyleGroup(CollapseFrame):
                     lambda _: self._apply_action(prop, prev_val, widgets, data),
                     lambda _: self._apply_action(prop, [value for _ in widgets], widgets, new_data),
                     key=key,
-                ))
+                ), widgets)
             else:
                 action.update_redo(lambda _: self._apply_action(prop, [value for _ in widgets], widgets, new_data))
+                self.style_pane.action_updated(action)
         except Exception as e:
             # Empty string values are too common to be useful in logger debug
             if value != '':
@@ -662,7 +663,10 @@ class StylePaneFramework:
     def last_action(self):
         raise NotImplementedError()
 
-    def new_action(self, action):
+    def new_action(self, action, widgets=None):
+        raise NotImplementedError()
+
+    def action_updated(self, action):
         raise NotImplementedError()
 
     def widgets_modified(self, widgets):
@@ -848,8 +852,11 @@ class StylePane(StylePaneFramework, BaseFeature):
     def last_action(self):
         return self.studio.last_action()
 
-    def new_action(self, action):
-        self.studio.new_action(action)
+    def new_action(self, action, widgets=None):
+        self.studio.new_action(action, widgets)
+
+    def action_updated(self, action):
+        self.studio.action_updated(action)
 
     def widgets_modified(self, widgets):
         self.studio.widgets_modified(widgets, self)
@@ -165,11 +165,22 @@ class VariablePane(BaseFeature):
         elif not self.variables:
             self.select(item)
         VariableManager.add(item)
+        self._design_changed()
         return item
 
     def delete_var(self, var):
         self._hide(var)
         VariableManager.remove(var)
+        self._design_changed()
+
+    def _design_changed(self):
+        # variables are saved as part of the design
+        if self.studio.designer:
+            self.studio.designer.context.on_design_change()
+
+    def _modify(self, value, func):
+        func(value)
+        self._design_changed()
 
     def _delete(self, *_):
         if self._selected:
@@ -238,10 +249,10 @@ class VariablePane(BaseFeature):
             self._editor = _editor
         self._editor.set(variable.value)
         self._editor.pack(side="top", fill="x")
-        self._editor.on_change(variable.set)
+        self._editor.on_change(self._modify, variable.set)
 
         self.var_name.set(variable.name)
-        self.var_name.on_change(variable.set_name)
+        self.var_name.on_change(self._modify, variable.set_name)
         self.var_type_lbl["text"] = variable.var_type_name
 
     def on_session_clear(self):
@@ -626,8 +626,8 @@ def get_resolved(prop, overrides, *property_tables):
     return {}
 
 
-def get_properties(widget, extern_overrides=None):
-    properties = widget.config()
+def get_properties(widget, extern_overrides=None, options=None):
+    properties = widget.config() if options is None else options
     resolved_properties = {}
     # use extern overrides if DEF_OVERRIDES are not found
     overrides = getattr(widget, "DEF_OVERRIDES", extern_overrides or {})
@@ -94,6 +94,23 @@ class _VariableIntercept:
         return widget[prop]
 
 
+def _get_option_table(widget, options):
+    # option defaults are the same for all widgets of a class and are
+    # therefore only queried once per tk interpreter
+    root = widget._root()
+    tables = getattr(root, "_studio_option_tables", None)
+    if tables is None:
+        tables = root._studio_option_tables = {}
+    table = tables.get(widget.__class__)
+    if table is None:
+        # second last item denotes the default value while items with a length of
+        # two are just alias definitions such as ('bd', '-borderwidth')
+        defaults = {key: value[-2] for key, value in options.items() if len(value) > 2}
+        aliases = {key: str(value[-1]).lstrip("-") for key, value in options.items() if len(value) == 2}
+        table = tables[widget.__class__] = (defaults, aliases)
+    return table
+
+
 class PseudoWidget:
     display_name = 'Widget'
     group = Groups.widget
@@ -123,7 +140,13 @@ class PseudoWidget:
         self.layout = None
         self.recent_layout_info = None
         self.last_stable_bounds = None
-        self._properties = get_properties(self)
+        options = self.configure()
+        self._option_defaults, self._option_aliases = _get_option_table(self, options)
+        # options already altered such as those passed to the constructor
+        self._touch_options(
+            key for key, value in options.items() if len(value) > 2 and str(value[-1]) != str(value[-2])
+        )
+        self._properties = get_properties(self, options=options)
         self.set_name(self.id)
         self.node = None
         self.__on_context = None
@@ -322,6 +345,7 @@ class PseudoWidget:
         return prop
 
     def configure(self, options=None, **kw):
+        self._touch_options(kw)
         for opt in list(kw.keys()):
             intercept = self._intercepts.get(opt)
             if intercept:
@@ -332,6 +356,30 @@ class PseudoWidget:
             self._handle.widget_config_changed()
         return ret
 
+    def config(self, cnf=None, **kw):
+        # bypasses the intercepts but the changes still have to be tracked
+        if isinstance(cnf, dict):
+            self._touch_options(cnf)
+        self._touch_options(kw)
+        if cnf is None:
+            return super().config(**kw)
+        return super().config(cnf, **kw)
+
+    def _touch_options(self, options):
+        # options may be configured before the widget is set up
+        touched = self.__dict__.get("_touched_options")
+        if touched is None:
+            touched = self._touched_options = set()
+        touched.update(options)
+
+    def _get_touched_options(self):
+        # resolve aliases and trailing underscores such as in 'from_'
+        touched = set()
+        for key in self.__dict__.get("_touched_options", ()):
+            key = key[:-1] if key.endswith("_") else key
+            touched.add(self._option_aliases.get(key, key))
+        return touched
+
     def bind_all(self, sequence, func=None, add=None):
         # we should be able to bind studio events
         # for complex hierarchies in custom widgets
@@ -373,18 +421,37 @@ class PseudoWidget:
         widget.configure(**self.get_altered_options())
 
     def get_altered_options(self):
-        # second last item denotes the default value
-        try:
-            defaults = self.configure()
-            defaults = {x: defaults[x][-2] for x in defaults}
-        except TypeError:
-            logging.error("options failed for" + str(self.id))
-            return {}
-        options = self.properties
-        # Get options whose values are different from their default values
-        return {
-            opt: self.get_prop(opt) for opt in options if opt in self._no_defaults or str(defaults.get(opt)) != str(self.get_prop(opt))
-        }
+        defaults = self._option_defaults
+        touched = self._get_touched_options()
+        # Get options whose values are different from their default values.
+        # Options that have never been configured still have their default values
+        altered = {}
+        for opt in self._properties:
+            if opt in self._no_defaults:
+                altered[opt] = self.get_prop(opt)
+            elif opt in touched:
+                value = self.get_prop(opt)
+                if str(defaults.get(opt)) != str(value):
+                    altered[opt] = value
+        return altered
+
+    def get_altered_config(self):
+        """
+        Get the raw values of all tk options that are different from their
+        defaults. Unlike :meth:`get_altered_options` this is not limited to
+        the properties displayed by the studio and intercepts are ignored
+
+        :return: dict of altered options
+        """
+        defaults = self._option_defaults
+        touched = self._get_touched_options()
+        altered = {}
+        for key in defaults:
+            if key in touched:
+                value = self[key]
+                if str(value) != str(defaults[key]):
+                    altered[key] = value
+        return altered
 
     def get_method_defaults(self):
         return {}
@@ -416,14 +416,15 @@ class StudioApplication(Application):
         if state == 'normal' and pos.get('geometry'):
             self.geometry(pos['geometry'])
 
-    def new_action(self, action: Action):
+    def new_action(self, action: Action, widgets=None):
         """
         Register a undo redo point
         :param action: An action object implementing undo and redo methods
+        :param widgets: widgets modified by the action if known
         :return:
         """
         if self.context:
-            self.context.new_action(action)
+            self.context.new_action(action, widgets)
 
     def undo(self):
         if self.context:
@@ -441,6 +442,10 @@ class StudioApplication(Application):
         if self.context:
             self.context.pop_last_action(key)
 
+    def action_updated(self, action):
+        if self.context:
+            self.context.action_updated(action)
+
     def install_status_widget(self, widget_class, *args, **kwargs):
         widget = widget_class(self._statusbar, *args, **kwargs)
         widget.pack(side='right', padx=2, fill='y')
@@ -792,7 +797,7 @@ class StudioApplication(Application):
     def check_unsaved_changes(self, check_contexts=None):
         check_contexts = self.contexts if check_contexts is None else check_contexts
         unsaved = [
-            i for i in check_contexts if isinstance(i, DesignContext) and i.designer.has_changed()
+            i for i in check_contexts if isinstance(i, DesignContext) and i.designer.has_changed(exact=True)
         ]
         if len(unsaved) > 1:
             contexts = MultiSaveDialog.ask_save(self, self, check_contexts)
@@ -802,10 +807,14 @@ class StudioApplication(Application):
                 if context.designer.save() is None:
                     return False
         elif unsaved:
-            return unsaved[0].designer.on_app_close()
+            if not unsaved[0].designer.on_app_close():
+                return False
         elif unsaved is None:
             return False
-        return True
+        # designs are saved in the background, ensure they are written before closing
+        return all([
+            i.designer.on_design_close() for i in check_contexts if isinstance(i, DesignContext)
+        ])
 
     def preview(self):
         if self.designer.root_obj is None:
@@ -0,0 +1,342 @@
+"""
+Append only journal of unsaved design changes for crash recovery
+"""
+# ======================================================================= #
+# Copyright (C) 2024 Hoverset Group.                                      #
+# ======================================================================= #
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+
+from formation.formats import JSONFormat
+
+logger = logging.getLogger(__name__)
+
+# bump whenever the layout of journal entries changes
+_VERSION = 1
+
+
+def _plain(attrib):
+    # attributes as compared by nodes, values as strings and without empty namespaces
+    plain = {}
+    for key, value in attrib.items():
+        if isinstance(value, dict):
+            if value:
+                plain[key] = {k: str(v) for k, v in value.items()}
+        else:
+            plain[key] = str(value)
+    return plain
+
+
+def diff_nodes(old, new):
+    """
+    Compute the changes required to transform one node tree into another.
+    Unchanged subtrees are skipped using their cached structural hashes so
+    only the modified parts of the trees are visited.
+
+    :param old: :class:`~formation.formats.Node` to be transformed
+    :param new: :class:`~formation.formats.Node` to transform to
+    :return: list of changes that can be applied with :func:`apply_changes`.
+        Each change is a list of the form ``["set", path, type, attrib]``,
+        ``["insert", path, json]`` or ``["remove", path]`` where path is the
+        list of child indices leading to the node
+    """
+    changes = []
+    stack = [(old, new, [])]
+    while stack:
+        old, new, path = stack.pop()
+        if old == new:
+            continue
+        new_attrib = _plain(new.attrib)
+        if old.type != new.type or _plain(old.attrib) != new_attrib:
+            changes.append(["set", path, new.type, new_attrib])
+        old_children, new_children = list(old), list(new)
+        # skip the unchanged children at the start and end
+        start, limit = 0, min(len(old_children), len(new_children))
+        while start < limit and old_children[start] == new_children[start]:
+            start += 1
+        end = 0
+        while end < limit - start and old_children[-1 - end] == new_children[-1 - end]:
+            end += 1
+        old_children = old_children[start:len(old_children) - end]
+        new_children = new_children[start:len(new_children) - end]
+        paired = min(len(old_children), len(new_children))
+        for _ in range(paired, len(old_children)):
+            changes.append(["remove", path + [start + paired]])
+        for i in range(paired, len(new_children)):
+            changes.append(["insert", path + [start + i], JSONFormat(node=new_children[i]).generate(compact=True)])
+        # changes to children are applied after the removals and insertions
+        # above which do not affect the positions of the paired children
+        stack.extend((old_children[i], new_children[i], path + [start + i]) for i in reversed(range(paired)))
+    return changes
+
+
+def apply_changes(root, changes):
+    """
+    Apply changes computed by :func:`diff_nodes` to a node tree in place
+
+    :param root: :class:`~formation.formats.Node` to be modified
+    :param changes: list of changes
+    :return: the modified root
+    """
+    for change in changes:
+        kind, path = change[0], change[1]
+        if kind == "set":
+            node = root
+            for index in path:
+                node = node.children[index]
+            node.type = change[2]
+            node.attrib = change[3]
+            continue
+        parent = root
+        for index in path[:-1]:
+            parent = parent.children[index]
+        if kind == "insert":
+            child = JSONFormat(data=change[2]).load()
+            child.parent = parent
+            parent.children.insert(path[-1], child)
+        elif kind == "remove":
+            parent.children.pop(path[-1]).parent = None
+        else:
+            raise ValueError("Unknown journal change {}".format(kind))
+    return root
+
+
+def _journal_path(directory, path):
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(directory, digest + ".journal")
+
+
+def _header(path):
+    stat = os.stat(path)
+    return {
+        "version": _VERSION,
+        "design": os.path.abspath(path),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+class Journal:
+    """
+    Append only log of the changes made to a design since it was last
+    saved. Only the changes from the previously recorded state are appended,
+    either by diffing an entire new state or just the nodes replaced with
+    :meth:`replace`. Entries are written and fsync'd in batches on a
+    worker thread. Once :attr:`compact_after` entries have been appended the
+    journal is rewritten with a single entry of the changes from the saved
+    design to the current state.
+
+    The journal is only valid for the saved design file it was started
+    with. :meth:`recover` ignores journals whose design file has since been
+    modified.
+    """
+
+    compact_after = 100
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = None
+        self._header = None
+        # the saved design and the last recorded state
+        self._base = None
+        self._last = None
+        self._entries = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self, path, base, current=None):
+        """
+        Start a new journal for a design replacing any previous journal
+
+        :param path: path to the saved design file
+        :param base: :class:`~formation.formats.Node` of the saved design
+        :param current: :class:`~formation.formats.Node` of the current
+            state of the design if it differs from the saved design. It is
+            modified in place by :meth:`replace` and should not be shared
+            with the saved design
+        """
+        self.path = _journal_path(self.directory, path)
+        self._header = json.dumps(_header(path)) + "\n"
+        self._base = self._last = base
+        self._entries = 0
+        self._submit("rewrite", [self._header])
+        if current is not None:
+            self.record(current)
+
+    def record(self, node):
+        """
+        Record the entire current state of the design. Nothing is written if
+        the state has not changed since it was last recorded. Use
+        :meth:`replace` to record changes limited to parts of the design
+
+        :param node: :class:`~formation.formats.Node` of the current state
+            which is modified in place by :meth:`replace` afterwards
+        """
+        if self.path is None:
+            return
+        changes = diff_nodes(self._last, node)
+        self._last = node
+        if changes:
+            self._append(changes)
+
+    def replace(self, replacements):
+        """
+        Record changes to parts of the last recorded state. Only the
+        replaced nodes are compared so the rest of the design need not be
+        serialized. The replacements are applied in order and are all
+        written as a single entry
+
+        :param replacements: list of ``(old, new)`` pairs where old is a
+            :class:`~formation.formats.Node` of the last recorded state and
+            new is the node replacing it. New nodes may reuse the children
+            of the nodes they replace
+        :raises ValueError: if a node to be replaced is not part of the
+            recorded state. Replacements before it are still recorded
+        """
+        if self.path is None:
+            return
+        changes = []
+        try:
+            for old, new in replacements:
+                path = self._path(old)
+                for change in diff_nodes(old, new):
+                    change[1] = path + change[1]
+                    changes.append(change)
+                if old.parent is None:
+                    self._last = new
+                else:
+                    old.parent.children[path[-1]] = new
+                new.parent = old.parent
+        finally:
+            if changes:
+                self._append(changes)
+
+    def _path(self, node):
+        # child indices leading from the recorded state to the node
+        path = []
+        while node.parent is not None:
+            index = next((i for i, child in enumerate(node.parent) if child is node), None)
+            if index is None:
+                break
+            path.append(index)
+            node = node.parent
+        if node is not self._last:
+            raise ValueError("Node is not part of the recorded state")
+        path.reverse()
+        return path
+
+    def _append(self, changes):
+        self._entries += 1
+        if self._entries > self.compact_after:
+            self._entries = 1
+            self._submit("rewrite", [self._header, json.dumps(diff_nodes(self._base, self._last)) + "\n"])
+        else:
+            self._submit("append", [json.dumps(changes) + "\n"])
+
+    def stop(self, discard=False):
+        """
+        Stop recording changes
+
+        :param discard: Whether to delete the journal
+        """
+        if self.path is not None and discard:
+            self._submit("discard", [])
+        self.path = self._header = self._base = self._last = None
+
+    def flush(self):
+        """
+        Block until all recorded changes are written
+        """
+        self._queue.join()
+
+    def _submit(self, action, lines):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put((action, self.path, lines))
+
+    def _run(self):
+        file = None
+        while True:
+            tasks = [self._queue.get()]
+            # write everything pending at once so it is fsync'd only once
+            with contextlib.suppress(queue.Empty):
+                while True:
+                    tasks.append(self._queue.get_nowait())
+            try:
+                for action, path, lines in tasks:
+                    if action != "append" and file is not None:
+                        file.close()
+                        file = None
+                    if action == "rewrite":
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        temp = path + ".tmp"
+                        with open(temp, "w", encoding="utf-8") as new_file:
+                            new_file.writelines(lines)
+                            new_file.flush()
+                            os.fsync(new_file.fileno())
+                        os.replace(temp, path)
+                    elif action == "discard":
+                        with contextlib.suppress(OSError):
+                            os.remove(path)
+                        continue
+                    if file is None:
+                        file = open(path, "a", encoding="utf-8")
+                    if action == "append":
+                        file.writelines(lines)
+                if file is not None:
+                    file.flush()
+                    os.fsync(file.fileno())
+            except OSError as e:
+                logger.debug("Could not write design journal: %s", e)
+                if file is not None:
+                    with contextlib.suppress(OSError):
+                        file.close()
+                    file = None
+            finally:
+                for _ in tasks:
+                    self._queue.task_done()
+
+    @staticmethod
+    def recover(directory, path):
+        """
+        Get the changes journaled for a design
+
+        :param directory: directory where journals are stored
+        :param path: path to the saved design file
+        :return: list of changes to be applied to the saved design with
+            :func:`apply_changes` or ``None`` if there is no valid journal
+        """
+        try:
+            with open(_journal_path(directory, path), encoding="utf-8") as file:
+                lines = file.readlines()
+            header = json.loads(lines[0]) if lines else None
+            if header != _header(path):
+                return None
+        except (OSError, ValueError):
+            return None
+        changes = []
+        for line in lines[1:]:
+            try:
+                changes.extend(json.loads(line))
+            except ValueError:
+                # incomplete entry that was being written during a crash
+                break
+        return changes
+
+    @staticmethod
+    def discard(directory, path):
+        """
+        Delete the journal of a design if any
+
+        :param directory: directory where journals are stored
+        :param path: path to the design file
+        """
+        with contextlib.suppress(OSError):
+            os.remove(_journal_path(directory, path))
@@ -5,6 +5,12 @@ Conversions of design to xml and back
 # Copyright (c) 2020 Hoverset Group.                                      #
 # ======================================================================= #
 
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
 import tkinter as tk
 
 from formation.formats import infer_format, BaseAdapter, Node
@@ -16,12 +22,142 @@ from studio.lib.menu import menu_config
 from studio.lib.pseudo import Container, PseudoWidget
 from studio.lib.events import make_event
 from studio.lib.layouts import GridLayoutStrategy
+from studio.parsers.journal import apply_changes
 from studio.preferences import Preferences
 from formation.loader import _ignore_tags
 from formation.meth import Meth
 from formation.handlers import parse_arg
 import studio
 
+logger = logging.getLogger(__name__)
+
+# read once since it can only be read by setting it which is not thread safe
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+@contextlib.contextmanager
+def replace_file(path, binary=False):
+    """
+    Open a temporary file which replaces the file at path once it is
+    successfully written. Readers never see a partially written file and
+    the original is left untouched if writing fails
+    :param path: Path to file to be replaced
+    :param binary: Whether to open the file in binary mode
+    :return: file object
+    """
+    path = os.path.abspath(path)
+    directory, name = os.path.split(path)
+    # unique so concurrent writes of the same path do not collide
+    fd, temp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8') as file:
+            yield file
+        if os.path.exists(path):
+            shutil.copymode(path, temp)
+        else:
+            # temporary files are only accessible to the owner
+            os.chmod(temp, 0o666 & ~_umask)
+        os.replace(temp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp)
+        raise
+
+
+class BackgroundWriter:
+    """
+    Writes design snapshots to file on a worker thread. Snapshots submitted
+    for a path that is still waiting to be written replace the waiting one
+    so rapid repeated saves result in a single write of the latest
+    snapshot. The writer never touches tk, the main thread polls
+    :meth:`progress` and :meth:`errors` instead
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        # path -> (format class, node, generate options) waiting to be written
+        self._pending = {}
+        self._errors = []
+        self._path = None
+        self._written = 0
+        self._total = 0
+
+    def submit(self, path, file_loader, node, **options):
+        """
+        Queue a snapshot to be written to path
+        :param path: Path to file to be written to
+        :param file_loader: Format class used to write the file
+        :param node: Snapshot :class:`Node` of the design. It should not be
+            modified after it is submitted
+        :param options: Options passed to the format
+        """
+        with self._lock:
+            self._pending.pop(path, None)
+            self._pending[path] = (file_loader, node, options)
+            if not self._idle.is_set():
+                # the running worker picks it up
+                return
+            self._idle.clear()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._path = None
+                    self._idle.set()
+                    return
+                path = next(iter(self._pending))
+                file_loader, node, options = self._pending.pop(path)
+                self._path, self._written, self._total = path, 0, 0
+            try:
+                self._total = sum(1 for _ in node.iter_events()) // 2
+                with replace_file(path, file_loader.binary) as file:
+                    file_loader(node=node).stream(file, self._count(node.iter_events()), **options)
+            except Exception as e:
+                with self._lock:
+                    self._errors.append((path, e))
+
+    def _count(self, events):
+        for event in events:
+            if event[0] == "end":
+                self._written += 1
+            yield event
+
+    def is_busy(self):
+        return not self._idle.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until all submitted snapshots are written
+        :param timeout: Maximum time to wait in seconds
+        :return: ``True`` if all snapshots have been written
+        """
+        return self._idle.wait(timeout)
+
+    def progress(self):
+        """
+        Progress of the current write
+        :return: tuple of path, nodes written and total nodes or ``None``
+            if nothing is being written
+        """
+        with self._lock:
+            if self._path is None:
+                return None
+            return self._path, self._written, self._total
+
+    def errors(self):
+        """
+        Get and clear the errors raised by writes since the last call
+        :return: list of (path, exception) tuples
+        """
+        with self._lock:
+            errors, self._errors = self._errors, []
+        return errors
+
 
 def get_widget_impl(widget):
     if not hasattr(widget, 'impl'):
@@ -176,6 +312,9 @@ class BaseStudioAdapter(BaseAdapter):
 
     @staticmethod
     def get_altered_options(widget):
+        if isinstance(widget, PseudoWidget):
+            # only the options configured on the widget need to be queried
+            return widget.get_altered_config()
         keys = widget.configure()
         # items with a length of two or less are just alias definitions such as 'bd' and 'borderwidth' so we ignore them
         # compare the last and 2nd last item to see whether options have been altered
@@ -196,7 +335,7 @@ class MenuStudioAdapter(BaseStudioAdapter):
     def generate(cls, widget: PseudoWidget, parent=None):
         node = BaseStudioAdapter.generate(widget, parent)
         node.remove_attrib('menu', 'attr')
-        if widget.configure().get('menu')[-1]:
+        if widget['menu']:
             menu = widget.nametowidget(widget['menu'])
             cls._menu_to_xml(node, menu)
         return node
@@ -300,22 +439,78 @@ class DesignBuilder:
         other widgets at the root level are ignored and cannot be recovered later
         :return:
         """
-        adapter = self.get_adapter(self.designer.root_obj.__class__)
-        self.root = adapter.generate(self.designer.root_obj, None)
+        for _ in self.iter_events():
+            pass
+
+    def iter_events(self, release=False):
+        """
+        Serialize the current contents of the designer widget by widget
+        as in :meth:`generate`. Each node is yielded as soon as its
+        attributes are complete so it can be written out before the rest
+        of the design is serialized.
+        :param release: Set to ``True`` to detach the node of each widget
+            from its parent once its end event is consumed so only the
+            nodes of unfinished widgets are held at a time. The root is
+            then not kept in :attr:`root`
+        :return: iterator of ``("start", node)`` and ``("end", node)`` pairs
+        """
+        root_obj = self.designer.root_obj
+        root = self.get_adapter(root_obj.__class__).generate(root_obj, None)
+        if not release:
+            self.root = root
         # load meta and variables first
-        self._meta_to_tree(self.root)
-        self._variables_to_tree(self.root)
-        self.to_tree(self.designer.root_obj, with_node=self.root)
+        self._meta_to_tree(root)
+        self._variables_to_tree(root)
+        yield from self._iter_widget(root_obj, root, release)
+
+    def _iter_widget(self, widget, node, release=False):
+        # events of node and of the nodes generated for the children of widget
+        stack = []
+        while True:
+            yield "start", node
+            # nodes such as events, menu items and variables that are not widgets
+            for sub_node in list(node):
+                yield from sub_node.iter_events()
+            stack.append((node, iter(widget._children if isinstance(widget, Container) else ())))
+            widget = None
+            while stack and widget is None:
+                node, widgets = stack[-1]
+                widget = next(widgets, None)
+                if widget is None:
+                    stack.pop()
+                    yield "end", node
+                    if release and stack:
+                        # a finished node is always the last child of its parent
+                        node.parent.children.pop()
+            if widget is None:
+                return
+            node = self.get_adapter(widget.__class__).generate(widget, node)
 
     def get_adapter(self, widget_class):
         return self._adapter_map.get(widget_class, BaseStudioAdapter)
 
-    def load(self, path, designer):
+    def load(self, path, designer, changes=None):
+        """
+        Load a design file into the designer
+        :param path: Path to design file
+        :param designer: Designer to load the design into
+        :param changes: Journaled changes to be applied to the design
+            after it is loaded. The unmodified design is still kept as the
+            saved design
+        :return: root widget
+        """
         self.root = infer_format(path)(path=path).load()
-        self._load_meta(self.root)
-        self._load_variables(self.root)
+        node = self.root
+        if changes:
+            # apply to a separate copy so the saved design is left intact
+            try:
+                node = apply_changes(infer_format(path)(path=path).load(), changes)
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                logger.error("Could not apply journaled changes to %s: %s", path, e)
+        self._load_meta(node)
+        self._load_variables(node)
         self._loaded_objs.clear()
-        root = self._load_widgets(self.root, designer, designer)
+        root = self._load_widgets(node, designer, designer)
         self._post_process(designer)
         return root
 
@@ -399,9 +594,22 @@ class DesignBuilder:
         if node is None:
             adapter = self.get_adapter(widget.__class__)
             node = adapter.generate(widget, parent)
-        if isinstance(widget, Container):
-            for child in widget._children:
-                self.to_tree(child, node)
+        for _ in self._iter_widget(widget, node):
+            pass
+        return node
+
+    def to_node(self, widget):
+        """
+        Convert a PseudoWidget widget to a node without the nodes of its
+        child widgets. Meta and variables are included for the root widget
+        as in :meth:`generate`
+        :param widget: widget to be converted to a node
+        :return: the widget converted to a :class:Node instance without a parent
+        """
+        node = self.get_adapter(widget.__class__).generate(widget, None)
+        if widget == self.designer.root_obj:
+            self._meta_to_tree(node)
+            self._variables_to_tree(node)
         return node
 
     def _variables_to_tree(self, parent):
@@ -434,15 +642,30 @@ class DesignBuilder:
         :param path: Path to file to be written to
         :return: String
         """
+        file_loader, options = self._format_options(path)
+        # nodes can only be released once written by incremental formats
+        events = self.iter_events(release=file_loader.incremental)
+        with replace_file(path, file_loader.binary) as dump:
+            file_loader(path=path).stream(dump, events, **options)
+
+    def write_background(self, path, writer):
+        """
+        Snapshot contents of the designer and write them to a file specified
+        by path on a background thread. Only the snapshot is taken on the
+        calling thread
+        :param path: Path to file to be written to
+        :param writer: :class:`BackgroundWriter` used to write the file
+        """
+        file_loader, options = self._format_options(path)
+        self.generate()
+        writer.submit(path, file_loader, self.root, **options)
+
+    def _format_options(self, path):
         file_loader = infer_format(path)
         pref = Preferences.acquire()
         pref_path = f"designer::{file_loader.name.lower()}"
         pref.set_default(pref_path, {})
-        # generate an upto-date tree first
-        self.generate()
-        content = file_loader(node=self.root).generate(**pref.get(pref_path))
-        with open(path, 'w') as dump:
-            dump.write(content)
+        return file_loader, pref.get(pref_path)
 
     def __eq__(self, other):
         if isinstance(other, DesignBuilder):
@@ -38,6 +38,7 @@ defaults = {
     "hotkeys": {},
     "designer": {
         "frame_skip": 4,
+        "autosave": True,
         "xml": {
             "pretty_print": True,
         },
@@ -157,6 +158,13 @@ templates = {
                 }
             },
         ),
+        "Recovery": (
+            {
+                "desc": "Keep a journal of unsaved changes to recover designs after a crash",
+                "path": "designer::autosave",
+                "element": Check,
+            },
+        ),
         "Naming options": (
             {
                 "desc": "Naming case",
@@ -0,0 +1,173 @@
+import os
+import random
+import tempfile
+import unittest
+
+from formation.formats import JSONFormat, Node, XMLFormat
+from studio.parsers.journal import Journal, apply_changes, diff_nodes
+
+
+def make_design():
+    root = Node(None, "tkinter.Frame", {"name": "root", "layout": {"width": "400"}})
+    for i in range(4):
+        frame = Node(root, "tkinter.Frame", {"name": "frame_{}".format(i), "layout": {"x": str(i)}})
+        for j in range(3):
+            Node(frame, "tkinter.Label", {"name": "label_{}_{}".format(i, j), "attr": {"text": "label"}})
+    return root
+
+
+def copy(node):
+    return JSONFormat(data=JSONFormat(node=node).generate()).load()
+
+
+def nodes(root):
+    return [node for event, node in root.iter_events() if event == "start"]
+
+
+class DiffTestCase(unittest.TestCase):
+
+    def assertTransforms(self, old, new):
+        changes = diff_nodes(old, new)
+        self.assertEqual(apply_changes(copy(old), changes), new)
+        return changes
+
+    def test_unchanged(self):
+        self.assertEqual(diff_nodes(make_design(), make_design()), [])
+
+    def test_attribute_change(self):
+        old, new = make_design(), make_design()
+        new.children[2].children[1]["attr"]["text"] = "changed"
+        changes = self.assertTransforms(old, new)
+        self.assertEqual(changes, [["set", [2, 1], "tkinter.Label", {"name": "label_2_1", "attr": {"text": "changed"}}]])
+
+    def test_structure_changes(self):
+        old, new = make_design(), make_design()
+        new.children.pop(1).parent = None
+        Node(new.children[0], "tkinter.Button", {"name": "button"})
+        new.children[2].children.reverse()
+        self.assertTransforms(old, new)
+
+    def test_random_changes(self):
+        rand = random.Random(42)
+        old = make_design()
+        for i in range(50):
+            new = copy(old)
+            node = rand.choice(nodes(new))
+            choice = rand.random()
+            if choice < 0.4:
+                node["layout"]["y"] = str(i)
+            elif choice < 0.7 and node.parent is not None:
+                node.parent.children.remove(node)
+                node.parent = None
+            else:
+                child = Node(None, "tkinter.Label", {"name": "new_{}".format(i)})
+                child.parent = node
+                node.children.insert(rand.randint(0, len(node)), child)
+            self.assertTransforms(old, new)
+            old = new
+
+
+class JournalTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.journals = os.path.join(self.directory, "journals")
+        self.path = os.path.join(self.directory, "design.xml")
+        self.saved = make_design()
+        with open(self.path, "w") as file:
+            file.write(XMLFormat(node=self.saved).generate())
+
+    def record_changes(self, journal, count):
+        state = self.saved
+        for i in range(count):
+            state = copy(state)
+            nodes(state)[i % 10 + 1]["attr"]["text"] = "change {}".format(i)
+            journal.record(state)
+        journal.flush()
+        return state
+
+    def test_recover(self):
+        journal = Journal(self.journals)
+        self.assertIsNone(Journal.recover(self.journals, self.path))
+        journal.start(self.path, self.saved)
+        journal.flush()
+        self.assertEqual(Journal.recover(self.journals, self.path), [])
+        state = self.record_changes(journal, 5)
+        changes = Journal.recover(self.journals, self.path)
+        self.assertEqual(apply_changes(XMLFormat(path=self.path).load(), changes), state)
+
+    def test_compaction(self):
+        journal = Journal(self.journals)
+        journal.compact_after = 4
+        journal.start(self.path, self.saved)
+        state = self.record_changes(journal, 10)
+        with open(journal.path) as file:
+            # header, compacted entry and the entries recorded after compaction
+            self.assertEqual(len(file.readlines()), 3)
+        changes = Journal.recover(self.journals, self.path)
+        self.assertEqual(apply_changes(XMLFormat(path=self.path).load(), changes), state)
+
+    def test_replace(self):
+        journal = Journal(self.journals)
+        state = copy(self.saved)
+        journal.start(self.path, self.saved, state)
+        # modify a single label
+        label = state.children[1].children[2]
+        new_label = Node(None, "tkinter.Label", {"name": "label_1_2", "attr": {"text": "changed"}})
+        # move a label to another frame reusing its node
+        old_frame, moved = state.children[3], state.children[0].children[0]
+        new_frame = Node(None, "tkinter.Frame", {"name": "frame_3", "layout": {"x": "3"}})
+        for child in [moved] + old_frame.children:
+            child.parent = new_frame
+            new_frame.children.append(child)
+        old_first = state.children[0]
+        new_first = Node(None, "tkinter.Frame", {"name": "frame_0", "layout": {"x": "0"}})
+        for child in old_first.children[1:]:
+            child.parent = new_first
+            new_first.children.append(child)
+        journal.replace([(label, new_label), (old_frame, new_frame), (old_first, new_first)])
+        journal.flush()
+        self.assertIs(state.children[1].children[2], new_label)
+        self.assertIs(state.children[0], new_first)
+        with open(journal.path) as file:
+            # header and a single entry
+            self.assertEqual(len(file.readlines()), 2)
+        changes = Journal.recover(self.journals, self.path)
+        self.assertEqual(apply_changes(XMLFormat(path=self.path).load(), changes), state)
+        self.assertEqual(len(nodes(state)), len(nodes(self.saved)))
+        # nodes no longer part of the journaled state cannot be replaced
+        with self.assertRaises(ValueError):
+            journal.replace([(label, Node(None, "tkinter.Label"))])
+
+    def test_incomplete_entry(self):
+        journal = Journal(self.journals)
+        journal.start(self.path, self.saved)
+        self.record_changes(journal, 3)
+        with open(journal.path, "a") as file:
+            file.write('[["set", [1]')
+        self.assertEqual(len(Journal.recover(self.journals, self.path)), 3)
+
+    def test_stale_journal(self):
+        journal = Journal(self.journals)
+        journal.start(self.path, self.saved)
+        self.record_changes(journal, 3)
+        with open(self.path, "a") as file:
+            file.write("\n")
+        self.assertIsNone(Journal.recover(self.journals, self.path))
+
+    def test_discard(self):
+        journal = Journal(self.journals)
+        journal.start(self.path, self.saved)
+        self.record_changes(journal, 3)
+        journal.stop(discard=True)
+        journal.flush()
+        self.assertIsNone(Journal.recover(self.journals, self.path))
+        self.assertEqual(os.listdir(self.journals), [])
+        # stopped journals ignore changes
+        journal.record(make_design())
+        journal.flush()
+        self.assertEqual(os.listdir(self.journals), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
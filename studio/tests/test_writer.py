@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from types import SimpleNamespace
+
+from formation.formats import Node, XMLFormat, JSONFormat, infer_format
+from studio.lib.pseudo import Container
+from studio.parsers.loader import BackgroundWriter, DesignBuilder, replace_file
+
+
+def make_node(name):
+    root = Node(None, "tkinter.Frame", {"name": name, "layout": {"width": "40"}})
+    for i in range(20):
+        Node(root, "tkinter.Label", {"name": "{}_{}".format(name, i), "attr": {"text": "label"}})
+    return root
+
+
+class BlockingFormat(XMLFormat):
+    # holds writes until released so coalescing can be observed
+    release = threading.Event()
+    written = []
+
+    def stream(self, file, events=None, **kw):
+        self.release.wait(5)
+        BlockingFormat.written.append(self.root["name"])
+        super().stream(file, events, **kw)
+
+
+class BackgroundWriterTestCase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "design.xml")
+        BlockingFormat.release.clear()
+        BlockingFormat.written = []
+
+    def test_write(self):
+        writer = BackgroundWriter()
+        node = make_node("root")
+        writer.submit(self.path, JSONFormat, node, pretty_print=True)
+        self.assertTrue(writer.wait(5))
+        self.assertFalse(writer.is_busy())
+        self.assertIsNone(writer.progress())
+        self.assertEqual(JSONFormat(path=self.path).load(), node)
+        self.assertEqual(os.listdir(self.directory), ["design.xml"])
+
+    def test_coalescing(self):
+        writer = BackgroundWriter()
+        writer.submit(self.path, BlockingFormat, make_node("first"))
+        while writer.progress() is None:
+            # wait for the first write to start
+            time.sleep(0.01)
+        for name in ("second", "third", "fourth"):
+            writer.submit(self.path, BlockingFormat, make_node(name))
+        BlockingFormat.release.set()
+        self.assertTrue(writer.wait(5))
+        # only the latest of the snapshots waiting is written
+        self.assertEqual(BlockingFormat.written, ["first", "fourth"])
+        self.assertEqual(XMLFormat(path=self.path).load(), make_node("fourth"))
+
+    def test_errors(self):
+        with open(self.path, "w") as file:
+            file.write("original")
+        writer = BackgroundWriter()
+        writer.submit(self.path, BrokenFormat, make_node("root"))
+        self.assertTrue(writer.wait(5))
+        errors = writer.errors()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], self.path)
+        self.assertEqual(writer.errors(), [])
+        # original is left untouched
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "original")
+        self.assertEqual(os.listdir(self.directory), ["design.xml"])
+
+
+class BrokenFormat(XMLFormat):
+
+    def stream(self, file, events=None, **kw):
+        file.write("partial")
+        raise ValueError("Cannot write design")
+
+
+class _Widget:
+    # stands in for a design widget generated as a copy of a node
+
+    def __init__(self, node):
+        self.node = node
+
+
+class _Container(Container, _Widget):
+
+    def __init__(self, node, children):
+        _Widget.__init__(self, node)
+        self._children = children
+
+
+class _NodeAdapter:
+
+    @staticmethod
+    def generate(widget, parent=None):
+        return Node(parent, widget.node.type, dict(widget.node.attrib))
+
+
+class _NodeBuilder(DesignBuilder):
+
+    def get_adapter(self, widget_class):
+        return _NodeAdapter
+
+    def _meta_to_tree(self, parent):
+        pass
+
+    def _variables_to_tree(self, parent):
+        pass
+
+    def _format_options(self, path):
+        return infer_format(path), {}
+
+
+def make_design():
+    frames = []
+    for i in range(3):
+        labels = [_Widget(Node(None, "tkinter.Label", {"name": "label_{}_{}".format(i, j), "attr": {"text": "label"}}))
+                  for j in range(3)]
+        frames.append(_Container(Node(None, "tkinter.Frame", {"name": "frame_{}".format(i)}), labels))
+    root = _Container(Node(None, "tkinter.Frame", {"name": "root", "layout": {"width": "40"}}), frames)
+    return _NodeBuilder(SimpleNamespace(root_obj=root))
+
+
+class DesignWriteTestCase(unittest.TestCase):
+
+    def test_formats(self):
+        directory = tempfile.mkdtemp()
+        builder = make_design()
+        builder.generate()
+        for ext in ("xml", "json", "fmb", "fmi"):
+            with self.subTest(ext=ext):
+                path = os.path.join(directory, "design." + ext)
+                make_design().write(path)
+                self.assertEqual(infer_format(path)(path=path).load(), builder.root)
+
+
+class ReplaceFileTestCase(unittest.TestCase):
+
+    def test_replace(self):
+        path = os.path.join(tempfile.mkdtemp(), "design.xml")
+        with open(path, "w") as file:
+            file.write("old")
+        os.chmod(path, 0o640)
+        with replace_file(path) as file:
+            file.write("new")
+            with open(path) as original:
+                self.assertEqual(original.read(), "old")
+        with open(path) as file:
+            self.assertEqual(file.read(), "new")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+
+
+if __name__ == '__main__':
+    unittest.main()
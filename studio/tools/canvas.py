@@ -992,7 +992,7 @@ class CanvasTool(BaseTool):
             self.studio.new_action(Action(
                 lambda _: self._update_stacking(canvas, prev_data, True),
                 lambda _: self._update_stacking(canvas, data, True)
-            ))
+            ), [canvas])
 
     def _get_routine(self, key):
         for routine in self.routines:
@@ -1019,7 +1019,7 @@ class CanvasTool(BaseTool):
             self.studio.new_action(Action(
                 lambda _: self.remove_items([item], silently=True),
                 lambda _: self.restore_items([item])
-            ))
+            ), [item.canvas])
         return item
 
     def remove_items(self, items, silently=False):
@@ -1037,7 +1037,7 @@ class CanvasTool(BaseTool):
             self.studio.new_action(Action(
                 lambda _: self.restore_items(items),
                 lambda _: self.remove_items(items, silently=True)
-            ))
+            ), [item.canvas for item in items])
 
     def restore_items(self, items):
         for item in items:
@@ -1084,7 +1084,7 @@ class CanvasTool(BaseTool):
             self.studio.new_action(Action(
                 lambda _: self.remove_items(items, silently=True),
                 lambda _: self.restore_items(items)
-            ))
+            ), [item.canvas for item in items])
 
     def delete_items(self):
         self.remove_items(list(self.selected_items))
@@ -1264,7 +1264,7 @@ class CanvasTool(BaseTool):
         self.studio.new_action(Action(
             lambda _: self.restore_layouts(prev_data),
             lambda _: self.restore_layouts(data)
-        ))
+        ), [item.canvas for item in data])
 
     def restore_layouts(self, data):
         for item in data:
@@ -172,7 +172,7 @@ class MenuEditor(BaseToolWindow):
         self._tree = MenuTree(self._pane, widget, menu)
         self._tree.allow_multi_select(True)
         self._tree.on_select(self._refresh_styles)
-        self._tree.on_structure_change(self._refresh_styles)
+        self._tree.on_structure_change(self._on_structure_change)
         self._prefs = get_active_pref(self)
         self._prefs.add_listener(
             "designer::descriptive_names",
@@ -266,18 +266,28 @@ class MenuEditor(BaseToolWindow):
             definition = menu_prop[key]
             self._add_menu_item(StyleItem(self._menu_styles, definition, self._on_menu_item_change))
 
+    def _design_changed(self):
+        # menus are saved as part of the design
+        self.widget.designer.context.on_design_change([self.widget])
+
+    def _on_structure_change(self):
+        self._refresh_styles()
+        self._design_changed()
+
     def _on_item_change(self, prop, value):
         # Called when the style of a menu item changes
         for node in self._tree.get():
             menu_config(node._menu, node.get_index(), **{prop: value})
             # For changes in label we need to change the label on the node as well node
             node.label = node._menu.entrycget(node.get_index(), 'label')
+        self._design_changed()
 
     def _on_menu_item_change(self, prop, value):
         nodes = self._tree.get()
         menus = {node._menu for node in nodes}
         for menu in menus:
             menu[prop] = value
+        self._design_changed()
 
     def _refresh_styles(self):
         # TODO Fix false value change when releasing ctrl key during multi-selecting
@@ -323,6 +333,7 @@ class MenuEditor(BaseToolWindow):
             self._tree.deselect(node)
             node.remove()
         self._refresh_styles()
+        self._design_changed()
 
     def add_item(self, _type):
         label = f"{_type.title()}"
@@ -337,6 +348,7 @@ class MenuEditor(BaseToolWindow):
         else:
             node._sub_menu.add(_type)
         node.add_menu_item(type=_type, label=label, index=tk.END)
+        self._design_changed()
 
     def load_menu(self, menu, node):
         # if the widget has a menu we need to populate the tree when the editor is created
@@ -3,7 +3,9 @@ import math
 from tkinter import ttk, TclError
 
 from hoverset.ui.icons import get_icon_image
-from hoverset.ui.widgets import Canvas, FontStyle, Frame, Entry, Button, Label, ScrollableInterface, EventMask
+from hoverset.ui.widgets import (
+    Canvas, FontStyle, Frame, Entry, Button, Label, ScrollableInterface, EventMask, ProgressBar
+)
 from studio.ui import geometry
 
 
@@ -23,6 +25,25 @@ class CoordinateIndicator(Frame):
         self._x['text'] = int(x)
 
 
+class SaveIndicator(Frame):
+
+    def __init__(self, master, **cnf):
+        super().__init__(master, **cnf)
+        self._label = Label(self, **self.style.text, anchor='e')
+        self._progress = ProgressBar(self, width=60)
+
+    def show(self, text, progress):
+        if not self._label.winfo_ismapped():
+            self._progress.pack(side='right', padx=2)
+            self._label.pack(side='right')
+        self._label['text'] = text
+        self._progress.set(progress)
+
+    def hide(self):
+        self._label.pack_forget()
+        self._progress.pack_forget()
+
+
 class CollapseFrame(Frame):
     __icons_loaded = False
     EXPAND = None